@@ -0,0 +1,54 @@
+"""Add todos listing indexes
+
+Revision ID: d4a86b0e3f57
+Revises: 9c1f3a7d5e21
+Create Date: 2026-10-18 11:04:27.530914
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "d4a86b0e3f57"
+down_revision: Union[str, None] = "9c1f3a7d5e21"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CONCURRENTLY keeps the todos table writable while the indexes build
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_todos_created_by_status_due_date",
+            "todos",
+            ["created_by", "status", "due_date"],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            "ix_todos_created_by_created_at_id",
+            "todos",
+            ["created_by", "created_at", "id"],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_todos_created_by_created_at_id",
+            table_name="todos",
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            "ix_todos_created_by_status_due_date",
+            table_name="todos",
+            postgresql_concurrently=True,
+        )
@@ -0,0 +1,42 @@
+"""Add todos due date index
+
+Revision ID: e7b3c1a9f402
+Revises: d4a86b0e3f57
+Create Date: 2026-10-18 21:40:12.318265
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "e7b3c1a9f402"
+down_revision: Union[str, None] = "d4a86b0e3f57"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CONCURRENTLY keeps the todos table writable while the index builds
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_todos_created_by_due_date_id",
+            "todos",
+            ["created_by", "due_date", "id"],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_todos_created_by_due_date_id",
+            table_name="todos",
+            postgresql_concurrently=True,
+        )
@@ -0,0 +1,142 @@
+"""
+Throughput of the /todo/bulk endpoints against the single-item routes.
+
+Creates, updates and deletes ``--items`` todos once item by item and once
+through the bulk endpoints (in batches of TODO_BULK_MAX_ITEMS), reporting
+items/sec for each.
+
+    python -m benchmarks.bulk_todos [--items 2000] [--async]
+"""
+
+import argparse
+import time
+
+from . import support
+
+
+def seed_user() -> str:
+    """Create the user the todos belong to and return its username."""
+    from src.config.database import SessionLocal
+    from src.models.user_model import User
+
+    with SessionLocal() as db:
+        db.add(User(username="bulk", email="bulk@example.com", hash_password="-"))
+        db.commit()
+    return "bulk"
+
+
+def timed(label: str, items: int, run) -> None:
+    started = time.perf_counter()
+    run()
+    elapsed = time.perf_counter() - started
+    print(f"{label:<28} {items / elapsed:>10,.0f} items/s {elapsed:>7.2f}s")
+
+
+def run(items: int, async_mode: bool) -> None:
+    support.configure(async_mode)
+    app = support.load_app()
+    support.quiet_engines()
+
+    from fastapi.testclient import TestClient
+
+    from src.config.settings import settings
+
+    username = seed_user()
+    print(f"{items} todos, {'async' if async_mode else 'sync'} session")
+    # One client for the whole run keeps a single event loop (and async pool)
+    with TestClient(app) as client:
+        measure(client, items, username, settings.TODO_BULK_MAX_ITEMS)
+
+
+def measure(client, items: int, username: str, batch: int) -> None:
+    from src.utils.auth import create_access_token
+
+    client.headers["Authorization"] = f"Bearer {create_access_token({'sub': username})}"
+    payloads = [
+        {"title": f"todo {i}", "description": "benchmark", "due_date": "2030-01-01"}
+        for i in range(items)
+    ]
+
+    def check(response, expected: int):
+        assert response.status_code == expected, response.text
+        return response.json() if response.content else None
+
+    ids = []
+    timed(
+        "POST /todo/ (single)",
+        items,
+        lambda: ids.extend(
+            check(client.post("/todo/", json=payload), 201)["id"]
+            for payload in payloads
+        ),
+    )
+    timed(
+        "PATCH /todo/{id} (single)",
+        items,
+        lambda: [
+            check(client.patch(f"/todo/{_id}", json={"status": "inprogress"}), 200)
+            for _id in ids
+        ],
+    )
+    timed(
+        "DELETE /todo/{id} (single)",
+        items,
+        lambda: [check(client.delete(f"/todo/{_id}"), 204) for _id in ids],
+    )
+
+    ids.clear()
+
+    def create_bulk():
+        for start in range(0, items, batch):
+            body = check(
+                client.post(
+                    "/todo/bulk", json={"items": payloads[start : start + batch]}
+                ),
+                201,
+            )
+            ids.extend(result["id"] for result in body["results"])
+
+    def update_bulk():
+        for start in range(0, items, batch):
+            check(
+                client.patch(
+                    "/todo/bulk",
+                    json={
+                        "items": [
+                            {"id": _id, "status": "inprogress"}
+                            for _id in ids[start : start + batch]
+                        ]
+                    },
+                ),
+                200,
+            )
+
+    def delete_bulk():
+        for start in range(0, items, batch):
+            check(
+                client.request(
+                    "DELETE", "/todo/bulk", json={"ids": ids[start : start + batch]}
+                ),
+                200,
+            )
+
+    timed("POST /todo/bulk", items, create_bulk)
+    timed("PATCH /todo/bulk", items, update_bulk)
+    timed("DELETE /todo/bulk", items, delete_bulk)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--items", type=int, default=2000)
+    parser.add_argument(
+        "--async",
+        dest="async_mode",
+        action="store_true",
+        help="serve requests through the AsyncSession repositories",
+    )
+    args = parser.parse_args()
+    run(args.items, args.async_mode)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Throughput of the GET /users/stream export.
+
+Seeds a throwaway SQLite database with ``--rows`` users, streams the whole
+table once per format and reports rows/sec, bytes and the number of chunks
+the response was sent in.
+
+    python -m benchmarks.export [--rows 100000] [--async]
+"""
+
+import argparse
+import asyncio
+import time
+import uuid
+from datetime import datetime
+
+from . import support
+
+FORMATS = {
+    "json": "application/json",
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+def seed(rows: int, batch_size: int = 10_000) -> None:
+    """Bulk insert ``rows`` users sharing one precomputed password hash."""
+    from sqlalchemy import insert
+
+    from src.config.database import engine
+    from src.models.user_model import User
+    from src.utils.password_helper import get_password_hash
+
+    hash_password = get_password_hash("B3nchmark!pass")
+    now = datetime.now()
+    with engine.begin() as conn:
+        for start in range(0, rows, batch_size):
+            conn.execute(
+                insert(User),
+                [
+                    {
+                        "id": uuid.uuid4(),
+                        "username": f"user{i}",
+                        "email": f"user{i}@example.com",
+                        "first_name": "Bench",
+                        "last_name": f"User {i}",
+                        "hash_password": hash_password,
+                        "bio": "Seeded by benchmarks.export",
+                        "last_login": now,
+                        "created_at": now,
+                    }
+                    for i in range(start, min(start + batch_size, rows))
+                ],
+            )
+
+
+async def measure(app, rows: int) -> None:
+    try:
+        await _measure_formats(app, rows)
+    finally:
+        await support.dispose_engines()
+
+
+async def _measure_formats(app, rows: int) -> None:
+    for name, media_type in FORMATS.items():
+        started = time.perf_counter()
+        status, chunks, size = await support.asgi_get(
+            app, "/users/stream", {"Accept": media_type}
+        )
+        elapsed = time.perf_counter() - started
+        assert status == 200, f"GET /users/stream answered {status}"
+        print(
+            f"{name:<7} {rows / elapsed:>12,.0f} rows/s "
+            f"{elapsed:>7.2f}s {size / 1e6:>8.1f} MB {chunks:>6} chunks"
+        )
+
+
+def run(rows: int, async_mode: bool) -> None:
+    support.configure(async_mode)
+    app = support.load_app()
+    support.quiet_engines()
+    seed(rows)
+
+    print(f"{rows} users, {'async' if async_mode else 'sync'} session")
+    asyncio.run(measure(app, rows))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument(
+        "--async",
+        dest="async_mode",
+        action="store_true",
+        help="serve requests through the AsyncSession repositories",
+    )
+    args = parser.parse_args()
+    run(args.rows, args.async_mode)
+
+
+if __name__ == "__main__":
+    main()
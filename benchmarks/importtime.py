@@ -0,0 +1,135 @@
+"""
+Cold start cost of importing the application.
+
+Imports ``src.main`` in fresh interpreters run with ``-X importtime`` and
+reports the median wall time over ``--runs``, the packages that took longest
+(cumulative, as the top-level package was first imported) and the time spent
+in the modules under ``src`` themselves.
+
+Modules only needed outside of serving requests, or only once it has
+started, are imported lazily; importing any of LAZY_MODULES fails the run,
+so an eager import creeping back shows up before it reaches production.
+
+    python -m benchmarks.importtime [--runs 5] [--top 15]
+                                    [--json results.json] [--compare baseline.json]
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+from datetime import datetime
+
+from . import support
+from .load import git_commit
+
+# Imported on first use (or in the lifespan) rather than with src.main
+LAZY_MODULES = (
+    "alembic",  # src/utils/alembic_upgrade.py
+    # Hashing runs in the password pool processes. bcrypt itself is loaded by
+    # jwt, whose algorithms import cryptography (ssh keys use bcrypt's kdf)
+    "passlib",
+    "jinja2",  # Templates are compiled in the lifespan
+    "uvicorn",  # Only the development server imports it
+    "faker",
+    "fakeredis",
+)
+
+
+def import_once() -> tuple[float, dict[str, int], int]:
+    """
+    Import src.main in a new interpreter. Returns the wall time in ms, the
+    cumulative microseconds of every imported module and the microseconds
+    spent in src modules themselves.
+    """
+    code = (
+        "import time; started = time.perf_counter(); import src.main; "
+        "print((time.perf_counter() - started) * 1000)"
+    )
+    output = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        env=os.environ,
+        capture_output=True,
+        check=True,
+        text=True,
+    )
+    modules = {}
+    own = 0
+    for line in output.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line.removeprefix("import time:").split("|")
+        name = name.strip()
+        modules[name] = int(cumulative_us)
+        if name.split(".")[0] == "src":
+            own += int(self_us)
+    return float(output.stdout.strip().splitlines()[-1]), modules, own
+
+
+def run(args) -> int:
+    support.configure()
+
+    runs = [import_once() for _ in range(args.runs)]
+    wall = statistics.median(wall for wall, _, _ in runs)
+    own = statistics.median(own for _, _, own in runs) / 1000
+    # A package's cumulative time includes the packages it imported first
+    packages = {
+        name: statistics.median(modules.get(name, 0) for _, modules, _ in runs) / 1000
+        for name in runs[0][1]
+        if "." not in name and name != "src"
+    }
+    slowest = dict(sorted(packages.items(), key=lambda item: -item[1])[: args.top])
+
+    print(f"import src.main: {wall:.0f}ms median of {args.runs}, {own:.0f}ms in src")
+    print(f"{'package':<28} {'ms':>8}")
+    for name, ms in slowest.items():
+        print(f"{name:<28} {ms:>8.1f}")
+
+    imported = {name.split(".")[0] for name in runs[0][1]}
+    eager = [module for module in LAZY_MODULES if module in imported]
+    for module in eager:
+        print(f"EAGER {module} is imported by src.main")
+
+    if args.compare:
+        with open(args.compare) as file:
+            baseline = json.load(file)
+        change = wall / baseline["import_ms"] - 1
+        print(
+            f"\nCompared with {baseline.get('commit') or args.compare}: "
+            f"{baseline['import_ms']:.0f}ms -> {wall:.0f}ms ({change:+.0%})"
+        )
+
+    if args.json:
+        with open(args.json, "w") as file:
+            json.dump(
+                {
+                    "commit": git_commit(),
+                    "created_at": datetime.now().isoformat(timespec="seconds"),
+                    "python": platform.python_version(),
+                    "runs": args.runs,
+                    "import_ms": wall,
+                    "src_ms": own,
+                    "packages_ms": slowest,
+                },
+                file,
+                indent=2,
+            )
+        print(f"Results written to {args.json}")
+    return len(eager)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--json")
+    parser.add_argument("--compare")
+    args = parser.parse_args()
+    sys.exit(1 if run(args) else 0)
+
+
+if __name__ == "__main__":
+    main()
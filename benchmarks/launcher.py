@@ -0,0 +1,155 @@
+"""
+Development launcher against the production one, over real HTTP.
+
+Starts the application as a separate server for every ``--modes`` entry and
+has ``--concurrency`` keep-alive clients send ``--requests`` requests each to
+GET /todo/{id} (authenticated, one SQL lookup) and GET / (static page):
+
+- uvicorn: one ``uvicorn src.main:app`` process, as ``python -m src.main``
+  and the old start.sh launched it (without --reload, whose file watcher
+  would only add noise)
+- gunicorn: ``gunicorn -c gunicorn.conf.py`` with ``--workers`` uvicorn
+  workers (one per CPU when not given), passed as WEB_CONCURRENCY so pools
+  and threadpools are sized to match
+
+Reports throughput and p50/p95/p99 latency per endpoint. The database is a
+throwaway SQLite file shared by every worker, so write-heavy endpoints are
+left out.
+
+    python -m benchmarks.launcher [--modes uvicorn,gunicorn] [--workers 4]
+                                  [--concurrency 64] [--requests 200]
+"""
+
+import argparse
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import time
+
+from . import support
+from .pool import seed
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def server_command(mode: str, port: int) -> list[str]:
+    if mode == "uvicorn":
+        return [sys.executable, "-m", "uvicorn", "src.main:app", "--port", str(port)]
+    command = [sys.executable, "-m", "gunicorn", "src.main:app"]
+    return command + ["-c", "gunicorn.conf.py", "--bind", f"127.0.0.1:{port}"]
+
+
+async def wait_ready(base_url: str, timeout: float = 60) -> None:
+    import httpx
+
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        while time.monotonic() < deadline:
+            try:
+                if (await client.get("/ready")).status_code == 200:
+                    return
+            except httpx.TransportError:
+                pass
+            await asyncio.sleep(0.2)
+    raise RuntimeError(f"Server at {base_url} did not become ready")
+
+
+async def load(base_url: str, path: str, headers: dict, concurrency: int, requests: int):
+    import httpx
+
+    latencies = []
+    errors = 0
+
+    async def client_loop():
+        nonlocal errors
+        # One keep-alive connection per client, as a browser or proxy would use
+        async with httpx.AsyncClient(base_url=base_url, headers=headers) as client:
+            for _ in range(requests):
+                started = time.perf_counter()
+                response = await client.get(path)
+                latencies.append(time.perf_counter() - started)
+                errors += response.status_code != 200
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client_loop() for _ in range(concurrency)))
+    return latencies, errors, time.perf_counter() - started
+
+
+def percentile(values: list[float], q: float) -> float:
+    values = sorted(values)
+    return values[min(int(len(values) * q), len(values) - 1)]
+
+
+async def measure(mode: str, args, endpoints: list[tuple[str, dict]]) -> None:
+    port = free_port()
+    env = os.environ | {"RATE_LIMIT_ENABLED": "false"}
+    env.pop("PROMETHEUS_MULTIPROC_DIR", None)
+    if mode == "gunicorn":
+        env["WEB_CONCURRENCY"] = str(args.workers)
+    server = subprocess.Popen(
+        server_command(mode, port),
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        await wait_ready(base_url)
+        for path, headers in endpoints:
+            # Warm up every worker's caches and connections
+            await load(base_url, path, headers, args.concurrency, 5)
+            latencies, errors, elapsed = await load(
+                base_url, path, headers, args.concurrency, args.requests
+            )
+            label = "/todo/{id}" if path.startswith("/todo/") else path
+            print(
+                f"{mode:<10} {label:<12} {len(latencies) / elapsed:>8.0f} "
+                f"{percentile(latencies, 0.50) * 1000:>8.2f} "
+                f"{percentile(latencies, 0.95) * 1000:>8.2f} "
+                f"{percentile(latencies, 0.99) * 1000:>8.2f} {errors:>7}"
+            )
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--modes", default="uvicorn,gunicorn")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+    args.workers = args.workers or len(os.sched_getaffinity(0))
+
+    support.configure()
+    support.load_app()
+    from src.utils.auth import create_access_token
+
+    todo_id = seed()
+    token = create_access_token({"sub": "pool"})
+    endpoints = [
+        (f"/todo/{todo_id}", {"Authorization": f"Bearer {token}"}),
+        ("/", {}),
+    ]
+
+    print(
+        f"{args.concurrency} keep-alive clients x {args.requests} requests, "
+        f"{args.workers} gunicorn workers"
+    )
+    print(
+        f"{'mode':<10} {'endpoint':<12} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} "
+        f"{'p99 ms':>8} {'errors':>7}"
+    )
+    for mode in args.modes.split(","):
+        asyncio.run(measure(mode, args, endpoints))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,593 @@
+"""
+Load test of every endpoint in the auth, user and todo routers.
+
+Seeds a throwaway SQLite database with ``--users`` fake users owning
+``--todos`` todos each, then sends ``--requests`` requests per endpoint from
+``--concurrency`` concurrent clients, in process through httpx. Reports
+throughput, p50/p95/p99 latency and the SQL statements per request (from
+the Server-Timing header) for each endpoint.
+
+    python -m benchmarks.load [--users 1000] [--todos 10] [--concurrency 20]
+                              [--requests 200] [--no-cache] [--async]
+                              [--json results.json] [--compare baseline.json]
+
+``--json`` writes the results with the commit they were measured on, and
+``--compare`` prints the change against such a file. Welcome emails are not
+sent, so the endpoints are measured without SMTP. GET /users/stream reports
+no statements: its header goes out before the body is queried.
+"""
+
+import argparse
+import asyncio
+import csv
+import io
+import json
+import logging
+import platform
+import random
+import re
+import subprocess
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from typing import Any, Callable, NamedTuple
+
+from . import support
+
+PASSWORD = "B3nchmark!pass"
+BATCH = 20  # Todos per bulk request
+IMPORT_BATCH = 5  # Users per import request
+
+SERVER_TIMING_QUERIES = re.compile(r'desc="(\d+) queries"')
+
+
+@dataclass
+class Result:
+    endpoint: str
+    requests: int = 0
+    errors: Counter = field(default_factory=Counter)  # By status code
+    elapsed: float = 0.0
+    latencies: list[float] = field(default_factory=list, repr=False)
+    statements: list[int] = field(default_factory=list, repr=False)
+
+    def summary(self) -> dict:
+        latencies = sorted(self.latencies)
+
+        def percentile(q: float) -> float:
+            return latencies[min(int(len(latencies) * q), len(latencies) - 1)] * 1000
+
+        return {
+            "endpoint": self.endpoint,
+            "requests": self.requests,
+            "errors": sum(self.errors.values()),
+            "error_statuses": {str(code): n for code, n in self.errors.items()},
+            "req_per_sec": self.requests / self.elapsed if self.elapsed else 0.0,
+            "p50_ms": percentile(0.50),
+            "p95_ms": percentile(0.95),
+            "p99_ms": percentile(0.99),
+            "sql_per_request": sum(self.statements) / len(self.statements),
+        }
+
+
+def seed(users: int, todos: int, batch_size: int = 5_000) -> None:
+    """Bulk insert fake users (one shared password hash) and their todos."""
+    import uuid
+
+    from faker import Faker
+    from sqlalchemy import insert
+
+    from src.config.constant import ToDoStatus
+    from src.config.database import engine
+    from src.models.todo_models import ToDo
+    from src.models.user_model import User
+    from src.utils.password_helper import get_password_hash
+
+    fake = Faker()
+    Faker.seed(0)
+    random.seed(0)
+    hash_password = get_password_hash(PASSWORD)
+    now = datetime.now()
+    today = date.today()
+
+    def user_row(i: int) -> dict:
+        username = f"{fake.user_name()}{i}"
+        return {
+            "id": uuid.uuid4(),
+            "username": username,
+            "email": f"{username}@{fake.free_email_domain()}",
+            "first_name": fake.first_name(),
+            "last_name": fake.last_name(),
+            "bio": fake.sentence(),
+            "hash_password": hash_password,
+            "role": "admin" if i == 0 else "user",
+            "last_login": now,
+            "created_at": now - timedelta(seconds=users - i),
+        }
+
+    def todo_row(user_id: uuid.UUID) -> dict:
+        return {
+            "title": fake.sentence(nb_words=4),
+            "description": fake.paragraph(),
+            "due_date": (
+                today + timedelta(days=random.randint(-30, 60))
+                if random.random() < 0.8
+                else None
+            ),
+            "status": random.choice(list(ToDoStatus)),
+            "created_by": user_id,
+        }
+
+    with engine.begin() as conn:
+        for start in range(0, users, batch_size):
+            rows = [user_row(i) for i in range(start, min(start + batch_size, users))]
+            conn.execute(insert(User), rows)
+            conn.execute(
+                insert(ToDo),
+                [todo_row(row["id"]) for row in rows for _ in range(todos)],
+            )
+
+
+def load_context(concurrency: int) -> dict:
+    """Tokens, ids and names the endpoint scenarios draw from."""
+    from sqlalchemy import select
+
+    from src.config.database import engine
+    from src.models.todo_models import ToDo
+    from src.models.user_model import User
+    from src.utils.auth import create_access_token, create_refresh_token
+
+    with engine.connect() as conn:
+        users = conn.execute(
+            select(User.id, User.username).order_by(User.created_at)
+        ).all()
+        clients = users[1 : concurrency + 1]
+        todos = {
+            user_id: conn.scalars(
+                select(ToDo.id).filter_by(created_by=user_id).order_by(ToDo.id)
+            ).all()
+            for user_id, _ in clients
+        }
+
+    def bearer(username: str) -> dict:
+        return {"Authorization": f"Bearer {create_access_token({'sub': username})}"}
+
+    return {
+        "admin": bearer(users[0].username),
+        "clients": [
+            {
+                "username": username,
+                "headers": bearer(username),
+                # Rotated by every refresh, each use needs the latest one
+                "refresh_token": create_refresh_token({"sub": username}),
+                "todos": list(todos[user_id]),
+                "created": [],
+                "bulk": [],
+            }
+            for user_id, username in clients
+        ],
+        "user_ids": [str(user.id) for user in users],
+        "usernames": [user.username for user in users],
+        "registered": [],
+        # Seeded users no client or lookup depends on, for DELETE /users/{id}
+        "victims": [str(user.id) for user in users[concurrency + 1 :]][::-1],
+    }
+
+
+def new_user(name: str) -> dict:
+    return {
+        "username": name,
+        "email": f"{name}@example.com",
+        "password": PASSWORD,
+        "confirm_password": PASSWORD,
+    }
+
+
+def import_file(prefix: str) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(["username", "email", "password", "first_name", "last_name"])
+    for k in range(IMPORT_BATCH):
+        writer.writerow(
+            [f"{prefix}{k}", f"{prefix}{k}@example.com", PASSWORD, "A", "B"]
+        )
+    return buffer.getvalue().encode()
+
+
+def todo_payload(i: int) -> dict:
+    return {
+        "title": f"Load test todo {i}",
+        "description": "Created by benchmarks.load",
+        "due_date": (date.today() + timedelta(days=i % 30)).isoformat(),
+    }
+
+
+def pick(items: list, i: int, default=0):
+    """Cycle through ``items``; ``default`` (a missing id) when there are none."""
+    return items[i % len(items)] if items else default
+
+
+def take(items: list, count: int = 1) -> list:
+    """Remove and return up to ``count`` items, for requests that consume ids."""
+    taken = items[-count:]
+    del items[-count:]
+    return taken
+
+
+class Endpoint(NamedTuple):
+    """
+    ``build(ctx, client, i)`` returns (method, url, httpx request kwargs) for
+    request number ``i``, ``client`` being the calling client's state;
+    ``record(ctx, client, body)`` keeps what later endpoints need from a
+    successful response. Endpoints that hash passwords get fewer requests.
+    """
+
+    label: str
+    build: Callable[[dict, dict, int], tuple[str, str, dict]]
+    record: Callable[[dict, dict, Any], None] | None = None
+    hashes: bool = False
+
+
+# In run order: writes that consume ids follow the requests creating them
+ENDPOINTS = [
+    Endpoint(
+        "POST /auth/token",
+        lambda ctx, client, i: (
+            "POST",
+            "/auth/token",
+            {"data": {"username": client["username"], "password": PASSWORD}},
+        ),
+        None,
+        hashes=True,
+    ),
+    Endpoint(
+        "POST /auth/refresh-token",
+        lambda ctx, client, i: (
+            "POST",
+            "/auth/refresh-token",
+            {"json": {"refresh_token": client["refresh_token"]}},
+        ),
+        lambda ctx, client, body: client.update(refresh_token=body["refresh_token"]),
+    ),
+    Endpoint(
+        "GET /users/",
+        lambda ctx, client, i: ("GET", f"/users/?page={i % 10 + 1}&limit=20", {}),
+        None,
+    ),
+    Endpoint(
+        "GET /users/ (cursor)",
+        lambda ctx, client, i: ("GET", "/users/?mode=cursor&limit=20&count=none", {}),
+        None,
+    ),
+    Endpoint("GET /users/all", lambda ctx, client, i: ("GET", "/users/all", {}), None),
+    Endpoint(
+        "GET /users/stream", lambda ctx, client, i: ("GET", "/users/stream", {}), None
+    ),
+    Endpoint("GET /users/me", lambda ctx, client, i: ("GET", "/users/me", {}), None),
+    Endpoint(
+        "GET /users/profile/{username}",
+        lambda ctx, client, i: (
+            "GET",
+            f"/users/profile/{pick(ctx['usernames'], i)}",
+            {},
+        ),
+        None,
+    ),
+    Endpoint(
+        "GET /users/{id}",
+        lambda ctx, client, i: (
+            "GET",
+            f"/users/{pick(ctx['user_ids'], i)}",
+            {},
+        ),
+        None,
+    ),
+    Endpoint(
+        "PATCH /users/me",
+        lambda ctx, client, i: ("PATCH", "/users/me", {"json": {"bio": f"bio {i}"}}),
+        None,
+    ),
+    Endpoint(
+        "POST /users",
+        lambda ctx, client, i: ("POST", "/users", {"json": new_user(f"signup{i}")}),
+        lambda ctx, client, body: ctx["registered"].append(body["id"]),
+        hashes=True,
+    ),
+    Endpoint(
+        "POST /users/import",
+        lambda ctx, client, i: (
+            "POST",
+            "/users/import",
+            {
+                "headers": ctx["admin"],
+                "json": {
+                    "users": [new_user(f"import{i}x{k}") for k in range(IMPORT_BATCH)]
+                },
+            },
+        ),
+        None,
+        hashes=True,
+    ),
+    Endpoint(
+        "POST /users/import/file",
+        lambda ctx, client, i: (
+            "POST",
+            "/users/import/file",
+            {
+                "headers": ctx["admin"],
+                "files": {"file": ("users.csv", import_file(f"file{i}x"), "text/csv")},
+            },
+        ),
+        None,
+        hashes=True,
+    ),
+    Endpoint(
+        "DELETE /users/{id}",
+        lambda ctx, client, i: (
+            "DELETE",
+            f"/users/{(take(ctx['registered']) or take(ctx['victims']))[0]}",
+            {"headers": ctx["admin"]},
+        ),
+        None,
+    ),
+    Endpoint(
+        "GET /todo/",
+        lambda ctx, client, i: ("GET", "/todo/?mode=cursor&limit=20&sort_by=due_date", {}),
+        None,
+    ),
+    Endpoint(
+        "GET /todo/ (filtered)",
+        lambda ctx, client, i: ("GET", "/todo/?mode=cursor&limit=20&status=pending", {}),
+        None,
+    ),
+    Endpoint(
+        "GET /todo/{id}",
+        lambda ctx, client, i: (
+            "GET",
+            f"/todo/{pick(client['todos'], i)}",
+            {},
+        ),
+        None,
+    ),
+    Endpoint(
+        "POST /todo/",
+        lambda ctx, client, i: ("POST", "/todo/", {"json": todo_payload(i)}),
+        lambda ctx, client, body: client["created"].append(body["id"]),
+    ),
+    Endpoint(
+        "PATCH /todo/{id}",
+        lambda ctx, client, i: (
+            "PATCH",
+            f"/todo/{pick(client['created'], i)}",
+            {"json": {"status": "inprogress"}},
+        ),
+        None,
+    ),
+    Endpoint(
+        "DELETE /todo/{id}",
+        lambda ctx, client, i: (
+            "DELETE",
+            f"/todo/{(take(client['created']) or take(client['todos']) or [0])[0]}",
+            {},
+        ),
+        None,
+    ),
+    Endpoint(
+        "POST /todo/bulk",
+        lambda ctx, client, i: (
+            "POST",
+            "/todo/bulk",
+            {"json": {"items": [todo_payload(i) for _ in range(BATCH)]}},
+        ),
+        lambda ctx, client, body: client["bulk"].extend(
+            result["id"] for result in body["results"]
+        ),
+    ),
+    Endpoint(
+        "PATCH /todo/bulk",
+        lambda ctx, client, i: (
+            "PATCH",
+            "/todo/bulk",
+            {
+                "json": {
+                    "items": [
+                        {"id": _id, "status": "completed"}
+                        for _id in client["bulk"][-BATCH:]
+                    ]
+                }
+            },
+        ),
+        None,
+    ),
+    Endpoint(
+        "DELETE /todo/bulk",
+        lambda ctx, client, i: (
+            "DELETE",
+            "/todo/bulk",
+            {
+                "json": {
+                    "ids": take(client["bulk"], BATCH) or take(client["todos"], BATCH)
+                }
+            },
+        ),
+        None,
+    ),
+]
+
+
+async def drive(app, ctx: dict, args) -> list[dict]:
+    import httpx
+
+    results = []
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://testserver", timeout=None
+        ) as http:
+            for label, build, record, hashes in ENDPOINTS:
+                if args.only and args.only not in label:
+                    continue
+                result = Result(label)
+                requests = args.hash_requests if hashes else args.requests
+                clients = ctx["clients"]
+
+                # Each client sends an equal share, so ids it created suffice
+                async def client_loop(index: int, client: dict):
+                    for i in range(index, requests, len(clients)):
+                        method, url, kwargs = build(ctx, client, i)
+                        headers = client["headers"] | kwargs.pop("headers", {})
+                        if args.no_cache and method == "GET":
+                            headers["Cache-Control"] = "no-store"
+
+                        started = time.perf_counter()
+                        response = await http.request(
+                            method, url, headers=headers, **kwargs
+                        )
+                        result.latencies.append(time.perf_counter() - started)
+
+                        match = SERVER_TIMING_QUERIES.search(
+                            response.headers.get("server-timing", "")
+                        )
+                        result.statements.append(int(match[1]) if match else 0)
+                        result.requests += 1
+                        if response.status_code >= 400:
+                            result.errors[response.status_code] += 1
+                        elif record is not None:
+                            record(ctx, client, response.json())
+
+                started = time.perf_counter()
+                await asyncio.gather(*map(client_loop, range(len(clients)), clients))
+                result.elapsed = time.perf_counter() - started
+                results.append(result.summary())
+                print_row(results[-1])
+    return results
+
+
+def print_row(row: dict, baseline: dict | None = None) -> None:
+    line = (
+        f"{row['endpoint']:<32} {row['req_per_sec']:>8.0f} {row['p50_ms']:>8.2f} "
+        f"{row['p95_ms']:>8.2f} {row['p99_ms']:>8.2f} {row['sql_per_request']:>6.1f}"
+    )
+    if row["errors"]:
+        statuses = ", ".join(f"{n}x{code}" for code, n in row["error_statuses"].items())
+        line += f"  errors: {statuses}"
+    if baseline:
+        rate = row["req_per_sec"] / baseline["req_per_sec"] - 1
+        p95 = row["p95_ms"] / baseline["p95_ms"] - 1
+        line += f"  req/s {rate:+.0%} p95 {p95:+.0%}"
+    print(line)
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            check=True,
+            text=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(args) -> None:
+    support.configure(args.async_mode)
+    app = support.load_app()
+    support.quiet_engines()
+
+    import src.service.users_services as users_services
+    from src.utils.log_queue import access_log
+
+    if not args.verbose:
+        # One access line per request, and slow query warnings under load
+        access_log.level = logging.ERROR
+
+    async def skip_email(*args, **kwargs):
+        pass
+
+    users_services.send_welcome_email = skip_email
+    users_services.send_welcome_emails = skip_email
+
+    started = time.perf_counter()
+    seed(args.users, args.todos)
+    ctx = load_context(args.concurrency)
+    print(
+        f"Seeded {args.users} users and {args.users * args.todos} todos in "
+        f"{time.perf_counter() - started:.1f}s; {args.concurrency} clients, "
+        f"{args.requests} requests per endpoint ({args.hash_requests} when "
+        f"hashing passwords), "
+        f"{'AsyncSession' if args.async_mode else 'sync Session'}"
+    )
+    print(
+        f"{'endpoint':<32} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} "
+        f"{'p99 ms':>8} {'SQL':>6}"
+    )
+    results = asyncio.run(drive(app, ctx, args))
+
+    if args.compare:
+        with open(args.compare) as file:
+            baseline = json.load(file)
+        previous = {row["endpoint"]: row for row in baseline["results"]}
+        print(f"\nCompared with {baseline.get('commit') or args.compare}")
+        for row in results:
+            if row["endpoint"] in previous:
+                print_row(row, previous[row["endpoint"]])
+
+    if args.json:
+        config = {
+            key: value
+            for key, value in vars(args).items()
+            if key not in ("json", "compare", "verbose")
+        }
+        with open(args.json, "w") as file:
+            json.dump(
+                {
+                    "commit": git_commit(),
+                    "created_at": datetime.now().isoformat(timespec="seconds"),
+                    "python": platform.python_version(),
+                    "config": config,
+                    "results": results,
+                },
+                file,
+                indent=2,
+            )
+        print(f"Results written to {args.json}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--todos", type=int, default=10, help="todos per user")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--requests", type=int, default=200, help="per endpoint")
+    parser.add_argument(
+        "--hash-requests",
+        type=int,
+        default=40,
+        help="per endpoint hashing passwords (login, registration, imports)",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="send Cache-Control: no-store, measuring cached GETs uncached",
+    )
+    parser.add_argument("--only", help="run endpoints whose label contains this")
+    parser.add_argument(
+        "--verbose", action="store_true", help="keep the access and SQL logs"
+    )
+    parser.add_argument("--json", help="write the results to this file")
+    parser.add_argument("--compare", help="results file to compare against")
+    parser.add_argument(
+        "--async",
+        dest="async_mode",
+        action="store_true",
+        help="serve requests through the AsyncSession repositories",
+    )
+    args = parser.parse_args()
+    if args.concurrency >= args.users:
+        parser.error("--users must be larger than --concurrency")
+    run(args)
+
+
+if __name__ == "__main__":
+    main()
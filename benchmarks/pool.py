@@ -0,0 +1,214 @@
+"""
+Connection pool load test.
+
+Starts the application in a fresh process for every ``--pool-sizes`` entry
+(``auto`` leaves DATABASE_POOL_SIZE unset, so the size is derived from
+DATABASE_MAX_CONNECTIONS, WEB_CONCURRENCY and THREADPOOL_SIZE) and has
+``--concurrency`` clients send ``--requests`` GET /todo/{id} each, in process
+through httpx. Reports throughput, latency percentiles, the 503s sent when
+the pool timed out and how long checkouts waited for a connection.
+
+    python -m benchmarks.pool [--pool-sizes 2,auto] [--concurrency 200]
+                              [--pool-timeout 10] [--pgbouncer] [--async]
+
+``--pgbouncer`` runs with DATABASE_PGBOUNCER (NullPool); against SQLite it
+only shows the cost of opening a connection per checkout, a real comparison
+needs DATABASE_URL pointing at PgBouncer.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+
+from . import support
+
+PASSWORD = "B3nchmark!pass"
+
+
+def seed() -> int:
+    """Create a user owning one todo and return the todo id."""
+    from src.config.database import SessionLocal
+    from src.models.todo_models import ToDo
+    from src.models.user_model import User
+    from src.utils.password_helper import get_password_hash
+
+    with SessionLocal() as db:
+        user = User(
+            username="pool",
+            email="pool@example.com",
+            hash_password=get_password_hash(PASSWORD),
+        )
+        db.add(user)
+        db.flush()
+        todo = ToDo(title="pool", description="seeded", created_by=user.id)
+        db.add(todo)
+        db.commit()
+        return todo.id
+
+
+def checkout_wait(pool: str) -> dict:
+    """Count, mean and bucketed p95 of db_pool_checkout_wait_seconds."""
+    from prometheus_client import REGISTRY
+
+    from src.utils.pool_metrics import DB_POOL_CHECKOUT_WAIT
+
+    labels = {"pool": pool}
+    name = "db_pool_checkout_wait_seconds"
+    count = REGISTRY.get_sample_value(f"{name}_count", labels) or 0
+    if not count:
+        return {"checkouts": 0, "wait_mean_ms": None, "wait_p95_ms": None}
+
+    p95 = None
+    for metric in DB_POOL_CHECKOUT_WAIT.collect():
+        for sample in metric.samples:
+            if (
+                sample.name == f"{name}_bucket"
+                and sample.labels["pool"] == pool
+                and sample.value >= 0.95 * count
+            ):
+                p95 = float(sample.labels["le"])
+                break
+    return {
+        "checkouts": int(count),
+        "wait_mean_ms": REGISTRY.get_sample_value(f"{name}_sum", labels) / count * 1000,
+        "wait_p95_ms": p95 * 1000,
+    }
+
+
+async def load(app, url: str, headers: dict, concurrency: int, requests: int):
+    import httpx
+
+    latencies = []
+    statuses = {}
+
+    async def client_loop(client: httpx.AsyncClient):
+        for _ in range(requests):
+            started = time.perf_counter()
+            response = await client.get(url, headers=headers)
+            latencies.append(time.perf_counter() - started)
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://testserver"
+        ) as client:
+            # Warm the principal cache so every request is one todo lookup
+            await client.get(url, headers=headers)
+            started = time.perf_counter()
+            await asyncio.gather(*(client_loop(client) for _ in range(concurrency)))
+            elapsed = time.perf_counter() - started
+    return latencies, statuses, elapsed
+
+
+def percentile(values: list[float], q: float) -> float:
+    values = sorted(values)
+    return values[min(int(len(values) * q), len(values) - 1)]
+
+
+def worker(args) -> None:
+    """Run one configuration and print its results as JSON."""
+    support.configure(args.async_mode)
+    app = support.load_app()
+    support.quiet_engines()
+
+    from src.config.database import default_pool_size
+    from src.config.settings import settings
+    from src.utils.auth import create_access_token
+
+    todo_id = seed()
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': 'pool'})}"}
+    latencies, statuses, elapsed = asyncio.run(
+        load(app, f"/todo/{todo_id}", headers, args.concurrency, args.requests)
+    )
+
+    result = {
+        "pool_size": (
+            "nullpool"
+            if settings.DATABASE_PGBOUNCER
+            else settings.DATABASE_POOL_SIZE or default_pool_size()
+        ),
+        "requests": len(latencies),
+        "req_per_sec": len(latencies) / elapsed,
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p95_ms": percentile(latencies, 0.95) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "status_503": statuses.get(503, 0),
+        "errors": sum(n for code, n in statuses.items() if code not in (200, 503)),
+    }
+    result |= checkout_wait("async" if args.async_mode else "sync")
+    print(json.dumps(result))
+
+
+def run(args) -> None:
+    mode = "AsyncSession" if args.async_mode else "sync Session"
+    print(
+        f"{args.concurrency} clients x {args.requests} GET /todo/{{id}}, {mode}, "
+        f"pool timeout {args.pool_timeout}s"
+    )
+    print(
+        f"{'pool':>13} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+        f"{'503s':>5} {'wait avg':>9} {'wait p95':>9}"
+    )
+    for size in args.pool_sizes.split(","):
+        env = os.environ | {
+            "DATABASE_POOL_TIMEOUT": str(args.pool_timeout),
+            "DATABASE_PGBOUNCER": "true" if args.pgbouncer else "false",
+        }
+        env.pop("DATABASE_POOL_SIZE", None)
+        if size != "auto":
+            env["DATABASE_POOL_SIZE"] = size
+
+        command = [sys.executable, "-m", "benchmarks.pool", "--worker"]
+        command += ["--concurrency", str(args.concurrency)]
+        command += ["--requests", str(args.requests)]
+        if args.async_mode:
+            command.append("--async")
+        output = subprocess.run(
+            command, env=env, check=True, capture_output=True, text=True
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+
+        def ms(value):
+            return "-" if value is None else f"{value:.2f}"
+
+        label = f"{size}={result['pool_size']}" if size == "auto" else size
+        print(
+            f"{label:>13} {result['req_per_sec']:>8.0f} {result['p50_ms']:>8.2f} "
+            f"{result['p95_ms']:>8.2f} {result['p99_ms']:>8.2f} "
+            f"{result['status_503']:>5} {ms(result['wait_mean_ms']):>9} "
+            f"{ms(result['wait_p95_ms']):>9}"
+        )
+        if result["errors"]:
+            print(f"              {result['errors']} unexpected responses")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--pool-sizes", default="2,auto")
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=20)
+    parser.add_argument("--pool-timeout", type=float, default=10)
+    parser.add_argument(
+        "--pgbouncer", action="store_true", help="run with DATABASE_PGBOUNCER"
+    )
+    parser.add_argument(
+        "--async",
+        dest="async_mode",
+        action="store_true",
+        help="serve requests through the AsyncSession repositories",
+    )
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.worker:
+        worker(args)
+    else:
+        run(args)
+
+
+if __name__ == "__main__":
+    main()
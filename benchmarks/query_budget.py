@@ -0,0 +1,221 @@
+"""
+SQL statement budget per endpoint.
+
+Drives every endpoint once through a TestClient against a seeded SQLite
+database and counts the statements each request executes. Any endpoint that
+goes over its budget fails the run, so a reintroduced exists-then-fetch
+round-trip (or an N+1) shows up before it reaches production.
+
+    python -m benchmarks.query_budget [--async]
+"""
+
+import argparse
+import sys
+
+from . import support
+
+PASSWORD = "B3nchmark!pass"
+
+
+def seed() -> dict:
+    """Create an admin, a regular user, a user to delete and a few todos."""
+    from src.config.database import SessionLocal
+    from src.models.todo_models import ToDo
+    from src.models.user_model import User
+    from src.utils.password_helper import get_password_hash
+
+    hash_password = get_password_hash(PASSWORD)
+    with SessionLocal() as db:
+        users = {
+            name: User(
+                username=name,
+                email=f"{name}@example.com",
+                hash_password=hash_password,
+                role=role,
+            )
+            for name, role in (("admin", "admin"), ("alice", "user"), ("bob", "user"))
+        }
+        db.add_all(users.values())
+        db.flush()
+        todos = [
+            ToDo(title=f"todo {i}", description="seeded", created_by=users["alice"].id)
+            for i in range(5)
+        ]
+        db.add_all(todos)
+        db.commit()
+        return {
+            "bob_id": str(users["bob"].id),
+            "alice_id": str(users["alice"].id),
+            "todo_id": todos[0].id,
+            "todo_to_delete_id": todos[1].id,
+        }
+
+
+def cases(ids: dict) -> list[tuple[str, str, str, str, int, dict]]:
+    """(caller, method, url, label, budget, request kwargs) in execution order."""
+    return [
+        ("alice", "GET", "/users/me", "GET /users/me", 1, {}),
+        ("alice", "PATCH", "/users/me", "PATCH /users/me", 1, {"json": {"bio": "hi"}}),
+        ("alice", "GET", "/users/?limit=2", "GET /users/", 2, {}),
+        ("alice", "GET", "/users/profile/bob", "GET /users/profile/{username}", 1, {}),
+        ("alice", "GET", f"/users/{ids['bob_id']}", "GET /users/{id}", 1, {}),
+        ("admin", "DELETE", f"/users/{ids['bob_id']}", "DELETE /users/{id}", 1, {}),
+        ("alice", "GET", "/todo/?mode=cursor&limit=3", "GET /todo/", 1, {}),
+        (
+            "alice",
+            "POST",
+            "/todo/",
+            "POST /todo/",
+            1,
+            {"json": {"title": "new", "description": "created by the benchmark"}},
+        ),
+        ("alice", "GET", f"/todo/{ids['todo_id']}", "GET /todo/{id}", 1, {}),
+        (
+            "alice",
+            "PATCH",
+            f"/todo/{ids['todo_id']}",
+            "PATCH /todo/{id}",
+            1,
+            {"json": {"status": "completed"}},
+        ),
+        (
+            "alice",
+            "DELETE",
+            f"/todo/{ids['todo_to_delete_id']}",
+            "DELETE /todo/{id}",
+            1,
+            {},
+        ),
+        (
+            "alice",
+            "POST",
+            "/todo/bulk",
+            "POST /todo/bulk (3 items)",
+            # SQLite cannot batch an ordered INSERT ... RETURNING, so this is
+            # one statement per item here and one per batch on Postgres
+            3,
+            {"json": {"items": [{"title": "bulk", "description": "-"}] * 3}},
+        ),
+        (
+            "alice",
+            "PATCH",
+            "/todo/bulk",
+            "PATCH /todo/bulk",
+            # The SELECT plus one executemany UPDATE per distinct field set
+            3,
+            {
+                "json": {
+                    "items": [
+                        {"id": ids["todo_id"], "title": "renamed"},
+                        {"id": ids["todo_id"] + 2, "status": "completed"},
+                        {"id": ids["todo_id"] + 3, "status": "completed"},
+                    ]
+                }
+            },
+        ),
+        (
+            "alice",
+            "DELETE",
+            "/todo/bulk",
+            "DELETE /todo/bulk",
+            1,
+            {"json": {"ids": [ids["todo_id"] + 2, ids["todo_id"] + 3, 999999]}},
+        ),
+        # Misses must stay single round-trips as well
+        ("alice", "GET", "/todo/999999", "GET /todo/{id} (missing)", 1, {}),
+        ("alice", "DELETE", "/todo/999999", "DELETE /todo/{id} (missing)", 1, {}),
+    ]
+
+
+def run(async_mode: bool) -> int:
+    support.configure(async_mode)
+    app = support.load_app()
+
+    from fastapi.testclient import TestClient
+
+    from src.utils.auth import create_access_token
+    from src.utils.password_pool import password_pool
+
+    ids = seed()
+    counter = support.StatementCounter(support.request_engine())
+    client = TestClient(app, raise_server_exceptions=False)
+    failures = []
+
+    def check(label: str, budget: int, response) -> None:
+        used = len(counter)
+        ok = used <= budget and response.status_code < 500
+        print(f"{'ok ' if ok else 'FAIL'} {label:<34} {used}/{budget} statements")
+        if not ok:
+            failures.append(label)
+            for statement in counter.statements:
+                print("       " + " ".join(statement.split()))
+
+    try:
+        with counter.count():
+            response = client.post(
+                "/auth/token", data={"username": "alice", "password": PASSWORD}
+            )
+        check("POST /auth/token", 2, response)
+        refresh_token = response.json()["refresh_token"]
+
+        with counter.count():
+            response = client.post(
+                "/auth/refresh-token", json={"refresh_token": refresh_token}
+            )
+        check("POST /auth/refresh-token", 0, response)
+
+        with counter.count():
+            response = client.post(
+                "/auth/logout", json={"refresh_token": response.json()["refresh_token"]}
+            )
+        check("POST /auth/logout", 0, response)
+
+        with counter.count():
+            response = client.post(
+                "/users",
+                json={
+                    "username": "carol",
+                    "email": "carol@example.com",
+                    "password": PASSWORD,
+                    "confirm_password": PASSWORD,
+                },
+            )
+        check("POST /users", 2, response)
+
+        headers = {
+            name: {"Authorization": f"Bearer {create_access_token({'sub': name})}"}
+            for name in ("admin", "alice")
+        }
+        for caller, method, url, label, budget, kwargs in cases(ids):
+            # Budgets cover the handler; authentication is served from the
+            # principal cache once warm (writes to a user drop its entry)
+            client.get("/users/me", headers=headers[caller])
+            with counter.count():
+                response = client.request(
+                    method, url, headers=headers[caller], **kwargs
+                )
+            check(label, budget, response)
+    finally:
+        password_pool.shutdown()
+
+    if failures:
+        print(f"{len(failures)} endpoint(s) over budget: {', '.join(failures)}")
+        return 1
+    print("All endpoints within budget")
+    return 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--async",
+        dest="async_mode",
+        action="store_true",
+        help="serve requests through the AsyncSession repositories",
+    )
+    args = parser.parse_args()
+    sys.exit(run(args.async_mode))
+
+
+if __name__ == "__main__":
+    main()
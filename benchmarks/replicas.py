@@ -0,0 +1,170 @@
+"""
+Read-replica routing check.
+
+Copies a seeded SQLite primary into two replica files, tags each copy with
+a marker user and then checks, through the repositories, that read-only
+calls alternate between the replicas, that a session reads from the primary
+once it has written, and that reads fall back to the primary (and skip the
+broken replica afterwards) when a replica cannot be opened.
+
+    python -m benchmarks.replicas [--async]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import sys
+
+from . import support
+
+MARKERS = ("replica0", "replica1")
+
+
+def seed() -> None:
+    from src.config.database import SessionLocal
+    from src.models.user_model import User
+
+    with SessionLocal() as db:
+        db.add(User(username="alice", email="alice@example.com", hash_password="-"))
+        db.commit()
+
+
+def tag_replica(path: str, marker: str) -> None:
+    """Add a user only this replica has, to tell where a read was served."""
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import Session
+
+    from src.models.user_model import User
+
+    replica = create_engine(f"sqlite:///{path}")
+    with Session(replica) as db:
+        db.add(User(username=marker, email=f"{marker}@example.com", hash_password="-"))
+        db.commit()
+    replica.dispose()
+
+
+async def source(repo) -> str:
+    """Which database answered a users listing: a replica marker or primary."""
+    usernames = {row.username for row in await repo.get_users_paginated(0, 100)}
+    return next((marker for marker in MARKERS if marker in usernames), "primary")
+
+
+async def checks(replica_paths: list[str]) -> list[str]:
+    from src.config.database import (
+        AsyncSessionLocal,
+        SessionLocal,
+        close_session,
+        replica_engines,
+    )
+    from src.config.settings import settings
+    from src.repository.base import build_repository
+    from src.repository.users_repository import AsyncUserRepository, UserRepository
+    from src.schemas.user_schema import UpdateUser
+
+    failures = []
+
+    def check(label: str, ok: bool, detail: str) -> None:
+        print(f"{'ok ' if ok else 'FAIL'} {label:<40} {detail}")
+        if not ok:
+            failures.append(label)
+
+    async def in_session(*steps):
+        db = AsyncSessionLocal() if settings.DATABASE_ASYNC else SessionLocal()
+        repo = build_repository(db, UserRepository, AsyncUserRepository)
+        try:
+            return [await step(repo) for step in steps]
+        finally:
+            await close_session(db)
+
+    seen = [(await in_session(source))[0] for _ in range(4)]
+    check("reads alternate between replicas", set(seen) == set(MARKERS), str(seen))
+
+    async def stream_source(repo):
+        usernames = set()
+        async for rows in repo.stream_user_rows(100):
+            usernames.update(row.username for row in rows)
+        return next((m for m in MARKERS if m in usernames), "primary")
+
+    seen = await in_session(stream_source)
+    check("streamed export reads a replica", seen[0] in MARKERS, seen[0])
+
+    async def write(repo):
+        user = await repo.update_user("alice", UpdateUser(bio="written"))
+        return user.bio
+
+    async def read_bio(repo):
+        row = await repo.get_user_by_username("alice")
+        return row.bio
+
+    seen = await in_session(source, write, source, read_bio)
+    check(
+        "reads after a write stick to primary",
+        seen[0] in MARKERS and seen[2] == "primary" and seen[3] == "written",
+        str(seen),
+    )
+
+    seen = (await in_session(source))[0]
+    check("next session reads a replica again", seen in MARKERS, seen)
+
+    # Replace replica0 with a directory SQLite cannot open
+    await asyncio.to_thread(replica_engines[0].dispose)
+    if settings.DATABASE_ASYNC:
+        from src.config.database import async_replica_engines
+
+        await async_replica_engines[0].dispose()
+    os.remove(replica_paths[0])
+    os.mkdir(replica_paths[0])
+
+    seen = [(await in_session(source))[0] for _ in range(4)]
+    check(
+        "broken replica falls back, then skipped",
+        "replica0" not in seen and seen.count("replica1") >= 3,
+        str(seen),
+    )
+    return failures
+
+
+def run(async_mode: bool) -> int:
+    database = support.configure(async_mode)
+    replica_paths = [str(database.with_name(f"{marker}.db")) for marker in MARKERS]
+    os.environ["DATABASE_REPLICA_URLS"] = json.dumps(
+        [f"sqlite:///{path}" for path in replica_paths]
+    )
+    support.load_app()
+    support.quiet_engines()
+
+    seed()
+    for path, marker in zip(replica_paths, MARKERS):
+        shutil.copy(database, path)
+        tag_replica(path, marker)
+
+    async def main():
+        try:
+            return await checks(replica_paths)
+        finally:
+            await support.dispose_engines()
+
+    failures = asyncio.run(main())
+    if failures:
+        print(f"{len(failures)} check(s) failed")
+        return 1
+    print("Replica routing OK")
+    return 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--async",
+        dest="async_mode",
+        action="store_true",
+        help="serve requests through the AsyncSession repositories",
+    )
+    args = parser.parse_args()
+    sys.exit(run(args.async_mode))
+
+
+if __name__ == "__main__":
+    main()
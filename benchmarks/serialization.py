@@ -0,0 +1,166 @@
+"""
+Per-request serialization cost of the list endpoints.
+
+Builds the content the services hand to the routers (ORM objects, or the
+page models built from them) and times turning it into a response body:
+
+- fastapi+json: FastAPI's response_model pass (validate, dump to Python
+  objects) rendered by the stdlib JSONResponse, as before
+- fastapi+orjson: the same pass rendered by ORJSONResponse, the default
+  response class now
+- ModelResponse: validated and dumped to bytes by pydantic-core in one go,
+  what the list endpoints return now
+
+No database is involved; ``--items`` sets the rows per response. The three
+bodies are checked to decode to the same JSON.
+
+    python -m benchmarks.serialization [--items 20,100,1000] [--repeat 200]
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+import uuid
+from datetime import date, datetime
+
+from . import support
+
+
+def payloads(items: int) -> list[tuple[str, object, object]]:
+    """(label, response_model, content) for each list endpoint."""
+    from src.config.constant import ToDoStatus
+    from src.models.todo_models import ToDo
+    from src.models.user_model import User
+    from src.schemas.pagination_schema import (
+        CursorPaginatedResponse,
+        PaginatedResponse,
+    )
+    from src.schemas.toso_shcema import TodoOutput
+    from src.schemas.user_schema import UserDetailedOutput, UserOutput
+
+    now = datetime.now()
+    users = [
+        User(
+            id=uuid.uuid4(),
+            username=f"user{i}",
+            email=f"user{i}@example.com",
+            first_name="Bench",
+            last_name=f"User {i}",
+            bio="Seeded by benchmarks.serialization",
+            role="user",
+            disable=False,
+            last_login=now,
+            created_at=now,
+            updated_at=now,
+        )
+        for i in range(items)
+    ]
+    todos = [
+        ToDo(
+            id=i,
+            title=f"todo {i}",
+            description="Seeded by benchmarks.serialization",
+            due_date=date.today(),
+            status=ToDoStatus.pending,
+            created_by=users[0].id,
+            created_at=now,
+            updated_at=now,
+        )
+        for i in range(items)
+    ]
+
+    user_page = PaginatedResponse[UserOutput | UserDetailedOutput]
+    todo_page = CursorPaginatedResponse[TodoOutput]
+    return [
+        (
+            "GET /users/ (admin page)",
+            user_page,
+            user_page(
+                total=items,
+                total_pages=1,
+                page=1,
+                size=items,
+                data=users,
+                has_next=False,
+                has_previous=False,
+            ),
+        ),
+        (
+            "GET /todo/ (page)",
+            todo_page,
+            todo_page(size=items, data=todos, has_next=False),
+        ),
+        ("GET /users/all (ORM rows)", list[UserOutput | UserDetailedOutput], users),
+    ]
+
+
+async def measure(repeat: int, render) -> float:
+    """Mean microseconds per call of the ``render`` coroutine function."""
+    await render()  # Warm up: builds the validators and serializers
+    started = time.perf_counter()
+    for _ in range(repeat):
+        await render()
+    return (time.perf_counter() - started) / repeat * 1_000_000
+
+
+async def run(items_list: list[int], repeat: int) -> int:
+    from fastapi.responses import JSONResponse, ORJSONResponse
+    from fastapi.routing import serialize_response
+    from fastapi.utils import create_model_field
+
+    from src.utils.responses import ModelResponse
+
+    def fastapi_render(response_class, field, content):
+        async def render():
+            body = await serialize_response(field=field, response_content=content)
+            return response_class(body).body
+
+        return render
+
+    def model_render(content, response_model):
+        async def render():
+            return ModelResponse(content, response_model).body
+
+        return render
+
+    mismatches = 0
+    print(
+        f"{'payload':<28} {'items':>6} {'fastapi+json':>14} {'fastapi+orjson':>15} "
+        f"{'ModelResponse':>14} {'bytes':>9}"
+    )
+    for items in items_list:
+        for label, response_model, content in payloads(items):
+            field = create_model_field("response", response_model)
+            renders = [
+                fastapi_render(JSONResponse, field, content),
+                fastapi_render(ORJSONResponse, field, content),
+                model_render(content, response_model),
+            ]
+            bodies = [json.loads(await render()) for render in renders]
+            if any(body != bodies[0] for body in bodies):
+                print(f"MISMATCH {label} ({items} items)")
+                mismatches += 1
+
+            timings = [await measure(repeat, render) for render in renders]
+            size = len(await renders[-1]())
+            print(
+                f"{label:<28} {items:>6} {timings[0]:>12.0f}us {timings[1]:>13.0f}us "
+                f"{timings[2]:>12.0f}us {size:>9,}"
+            )
+    return mismatches
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--items", default="20,100,1000")
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+    support.configure()
+    items_list = [int(items) for items in args.items.split(",")]
+    sys.exit(1 if asyncio.run(run(items_list, args.repeat)) else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+Local SMTP stand-in and email delivery benchmark.
+
+``SMTPSink`` accepts any login and message and only counts them, so the
+delivery worker can be exercised without a mail server. By default the
+script queues ``--messages`` welcome emails in a throwaway outbox and drains
+it against the sink, reporting throughput and how many SMTP connections the
+worker opened (one per drain when the connection is reused).
+
+    python -m benchmarks.smtp_sink [--messages 500] [--batch-size 50]
+    python -m benchmarks.smtp_sink --serve [--port 8025]
+
+``--serve`` only runs the sink, for a development server started with
+MAIL_SERVER=localhost, MAIL_PORT=8025 and MAIL_TLS=false.
+"""
+
+import argparse
+import asyncio
+import os
+import time
+
+from . import support
+
+
+class SMTPSink:
+    """Minimal SMTP server: AUTH, MAIL, RCPT and DATA all succeed."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, verbose: bool = False):
+        self.host = host
+        self.port = port
+        self.verbose = verbose
+        self.connections = 0
+        self.messages = 0
+        self._server: asyncio.Server | None = None
+
+    async def start(self) -> int:
+        """Start listening and return the bound port."""
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self.port
+
+    async def stop(self) -> None:
+        self._server.close()
+        await self._server.wait_closed()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.connections += 1
+
+        async def reply(line: str):
+            writer.write(line.encode() + b"\r\n")
+            await writer.drain()
+
+        await reply("220 smtp-sink ready")
+        try:
+            while line := await reader.readline():
+                command = line.decode(errors="replace").strip()
+                verb = command.split(" ", 1)[0].upper()
+                if verb == "EHLO":
+                    await reply("250-smtp-sink\r\n250-AUTH PLAIN LOGIN\r\n250 8BITMIME")
+                elif verb == "AUTH":
+                    await reply("235 2.7.0 Authentication successful")
+                elif verb == "DATA":
+                    await reply("354 End data with <CR><LF>.<CR><LF>")
+                    size = 0
+                    while (data := await reader.readline()) not in (b".\r\n", b""):
+                        size += len(data)
+                    self.messages += 1
+                    if self.verbose:
+                        print(f"message {self.messages}: {size:,} bytes")
+                    await reply("250 2.0.0 Ok: queued")
+                elif verb == "QUIT":
+                    await reply("221 2.0.0 Bye")
+                    break
+                elif verb in ("HELO", "MAIL", "RCPT", "RSET", "NOOP"):
+                    await reply("250 2.0.0 Ok")
+                else:
+                    await reply("502 5.5.2 Command not recognized")
+        finally:
+            writer.close()
+
+
+async def serve(port: int) -> None:
+    sink = SMTPSink(port=port, verbose=True)
+    await sink.start()
+    print(f"SMTP sink listening on 127.0.0.1:{sink.port}")
+    await asyncio.Event().wait()
+
+
+async def run(messages: int) -> None:
+    sink = SMTPSink()
+    os.environ["MAIL_SERVER"] = sink.host
+    os.environ["MAIL_PORT"] = str(await sink.start())
+    os.environ["MAIL_TLS"] = "false"
+    os.environ["MAIL_SSL"] = "false"
+
+    from src.utils.email import send_welcome_emails
+    from src.utils.email_queue import email_queue
+
+    started = time.perf_counter()
+    send_welcome_emails([(f"user{i}@example.com", f"user{i}") for i in range(messages)])
+    queued = time.perf_counter() - started
+
+    started = time.perf_counter()
+    await asyncio.to_thread(email_queue.drain)
+    delivered = time.perf_counter() - started
+    await sink.stop()
+
+    print(
+        f"Queued {messages} emails in {queued * 1000:.0f}ms; "
+        f"delivered {sink.messages} in {delivered:.2f}s "
+        f"({sink.messages / delivered:.0f}/s) over {sink.connections} SMTP connection(s)"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--messages", type=int, default=500)
+    parser.add_argument("--batch-size", type=int, default=50)
+    parser.add_argument("--serve", action="store_true")
+    parser.add_argument("--port", type=int, default=8025)
+    args = parser.parse_args()
+
+    if args.serve:
+        asyncio.run(serve(args.port))
+        return
+    support.configure()
+    os.environ["EMAIL_BATCH_SIZE"] = str(args.batch_size)
+    asyncio.run(run(args.messages))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+"""
+Shared setup for the scripts in this package.
+
+Each script runs against a throwaway SQLite database, so the environment has
+to be prepared before anything under ``src`` is imported (settings are read
+at import time).
+"""
+
+import asyncio
+import os
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Settings that have no default; real values are only needed when the
+# corresponding service (SMTP, Redis) is actually reached.
+BENCHMARK_ENVIRONMENT = {
+    "APP_NAME": "benchmark",
+    "PROJECT_DOMAIN": "http://localhost:8000",
+    "MAIL_USERNAME": "benchmark@example.com",
+    "MAIL_PASSWORD": "benchmark",
+    "MAIL_FROM": "benchmark@example.com",
+    "MAIL_PORT": "8025",
+    "MAIL_SERVER": "localhost",
+    "MAIL_TLS": "false",
+    "REDIS_HOST": "localhost",
+    "REDIS_PORT": "6379",
+    "REDIS_PASSWORD": "benchmark",
+    "REDIS_SSL": "false",
+    "SECRET_KEY": "benchmark-secret-key",
+}
+
+
+def configure(async_mode: bool = False) -> Path:
+    """
+    Point the application at a fresh SQLite database and return its path.
+    Values already present in the environment take precedence.
+    """
+    for name, value in BENCHMARK_ENVIRONMENT.items():
+        os.environ.setdefault(name, value)
+
+    database = Path(tempfile.mkdtemp(prefix="fastapi-bench-")) / "bench.db"
+    os.environ["DATABASE_URL"] = f"sqlite:///{database}"
+    os.environ["DATABASE_ASYNC"] = "true" if async_mode else "false"
+    os.environ["EMAIL_QUEUE_PATH"] = str(database.parent / "email_outbox.db")
+    return database
+
+
+@event.listens_for(Engine, "connect")
+def _sqlite_concat(dbapi_connection, connection_record):
+    # User.full_name compiles to concat(), which SQLite only gained in 3.44
+    if hasattr(dbapi_connection, "create_function"):
+        dbapi_connection.create_function(
+            "concat",
+            -1,
+            lambda *parts: "".join("" if part is None else str(part) for part in parts),
+        )
+
+
+def load_app(rate_limits: bool = False):
+    """
+    Import the application and create its tables. Rate limits are off unless
+    asked for, since every benchmark request comes from the same client.
+    """
+    from src.main import app
+    from src.utils.init_db import create_table
+    from src.utils.rate_limiter import limiter
+
+    limiter.enabled = rate_limits
+    create_table()
+    return app
+
+
+def quiet_engines() -> None:
+    """Turn off statement echo, which would dominate any timing."""
+    from src.config.database import async_engine, engine
+
+    engine.echo = False
+    if async_engine is not None:
+        async_engine.echo = False
+
+
+async def asgi_get(app, path: str, headers: dict[str, str] | None = None):
+    """
+    Issue a GET straight against the ASGI app and return the status, the
+    number of body messages it sent and the total body size. Unlike the
+    TestClient this observes how a streamed body is chunked.
+    """
+    messages = iter(
+        [
+            {"type": "http.request", "body": b"", "more_body": False},
+        ]
+    )
+    path, _, query = path.partition("?")
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": query.encode(),
+        "root_path": "",
+        "headers": [
+            (name.lower().encode(), value.encode())
+            for name, value in (headers or {}).items()
+        ],
+        "client": ("127.0.0.1", 50000),
+        "server": ("testserver", 80),
+    }
+    result = {"status": None, "chunks": 0, "size": 0}
+
+    response_complete = asyncio.Event()
+
+    async def receive():
+        message = next(messages, None)
+        if message is None:
+            # The client stays connected until the whole body has been sent
+            await response_complete.wait()
+            return {"type": "http.disconnect"}
+        return message
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            result["status"] = message["status"]
+        elif message["type"] == "http.response.body" and message.get("body"):
+            result["chunks"] += 1
+            result["size"] += len(message["body"])
+        if message["type"] == "http.response.body" and not message.get("more_body"):
+            response_complete.set()
+
+    await app(scope, receive, send)
+    return result["status"], result["chunks"], result["size"]
+
+
+async def dispose_engines() -> None:
+    """Close pooled connections; aiosqlite ones otherwise block interpreter exit."""
+    from src.config.database import dispose_engines
+
+    await dispose_engines()
+
+
+def request_engine() -> Engine:
+    """The engine request handlers execute on, for attaching event listeners."""
+    from src.config.database import async_engine, engine
+
+    return async_engine.sync_engine if async_engine is not None else engine
+
+
+class StatementCounter:
+    """Counts SQL statements executed on an engine while active."""
+
+    def __init__(self, engine: Engine):
+        self.engine = engine
+        self.statements: list[str] = []
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+    @contextmanager
+    def count(self):
+        self.statements = []
+        event.listen(self.engine, "before_cursor_execute", self._record)
+        try:
+            yield self
+        finally:
+            event.remove(self.engine, "before_cursor_execute", self._record)
+
+    def __len__(self) -> int:
+        return len(self.statements)
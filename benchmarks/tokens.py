@@ -0,0 +1,127 @@
+"""
+JWT sign and verify throughput.
+
+Runs each ``--algorithms`` entry in a fresh process (the keys are read from
+the settings at import) and reports operations per second for:
+
+- sign: create_access_token
+- decode: jwt.decode with the key and options passed on every call, as
+  verify_token did before
+- verify (first): verify_token on tokens it has not seen, a full verification
+- verify (repeat): verify_token on a token it already verified, the case of
+  a client reusing its access token, answered from the memoized claims
+
+RS256 and EdDSA keys are generated for the run and need the cryptography
+package (pyjwt[crypto]); without it only HS256 is measured.
+
+    python -m benchmarks.tokens [--algorithms HS256,RS256,EdDSA] [--tokens 2000]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+from . import support
+
+
+def generate_key(algorithm: str) -> str | None:
+    """A PEM private key for ``algorithm``, or None without cryptography."""
+    try:
+        from cryptography.hazmat.primitives import serialization
+        from cryptography.hazmat.primitives.asymmetric import ed25519, rsa
+    except ImportError:
+        return None
+
+    if algorithm == "EdDSA":
+        key = ed25519.Ed25519PrivateKey.generate()
+    else:
+        key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    return key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    ).decode()
+
+
+def per_second(count: int, call) -> float:
+    started = time.perf_counter()
+    call()
+    return count / (time.perf_counter() - started)
+
+
+def worker(args) -> None:
+    """Measure the configured algorithm and print the results as JSON."""
+    support.configure()
+
+    import jwt
+
+    from src.utils.auth import ALGORITHM, create_access_token, token_keys, verify_token
+
+    count = args.tokens
+    tokens = []
+    sign = per_second(
+        count,
+        lambda: tokens.extend(
+            create_access_token({"sub": f"user{i}", "role": "user"})
+            for i in range(count)
+        ),
+    )
+    key = token_keys()[1]
+    decode = per_second(
+        count,
+        lambda: [jwt.decode(token, key, algorithms=[ALGORITHM]) for token in tokens],
+    )
+    first = per_second(count, lambda: [verify_token(token) for token in tokens])
+    repeat = per_second(
+        count * 10, lambda: [verify_token(tokens[0]) for _ in range(count * 10)]
+    )
+    print(json.dumps({"sign": sign, "decode": decode, "first": first, "repeat": repeat}))
+
+
+def run(args) -> None:
+    print(f"{args.tokens} tokens, operations per second")
+    print(
+        f"{'algorithm':<10} {'sign':>10} {'decode':>10} {'verify (first)':>15} "
+        f"{'verify (repeat)':>16}"
+    )
+    for algorithm in args.algorithms.split(","):
+        env = os.environ | {"ALGORITHM": algorithm}
+        if not algorithm.startswith("HS"):
+            private_key = generate_key(algorithm)
+            if private_key is None:
+                print(f"{algorithm:<10} skipped, cryptography is not installed")
+                continue
+            env["JWT_PRIVATE_KEY"] = private_key
+
+        output = subprocess.run(
+            [sys.executable, "-m", "benchmarks.tokens", "--worker"]
+            + ["--tokens", str(args.tokens)],
+            env=env,
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        print(
+            f"{algorithm:<10} {result['sign']:>10,.0f} {result['decode']:>10,.0f} "
+            f"{result['first']:>15,.0f} {result['repeat']:>16,.0f}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--algorithms", default="HS256,RS256,EdDSA")
+    parser.add_argument("--tokens", type=int, default=2000)
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.worker:
+        worker(args)
+    else:
+        run(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Production server settings: gunicorn managing uvicorn workers.
+
+    uv run gunicorn src.main:app -c gunicorn.conf.py
+
+Every value can be overridden from the environment. The worker count is the
+application's own WEB_CONCURRENCY setting, so each worker sizes its share of
+the database connections (and its threadpool) from the same number, see
+src/config/database.py. start.sh sets it to the CPU count when neither the
+environment nor .env sets it.
+"""
+
+import os
+import shutil
+import tempfile
+
+from dotenv import dotenv_values
+
+from src.config.settings import settings
+
+
+def _setting(name: str, default):
+    """Environment first, then .env (as the application reads it), then default."""
+    value = os.environ.get(name) or dotenv_values(".env").get(name)
+    return type(default)(value) if value else default
+
+
+# One event loop per core; the bcrypt pool adds PASSWORD_HASH_WORKERS
+# processes to each worker. Pass WEB_CONCURRENCY rather than --workers, which
+# the workers' pool sizing would not see
+workers = settings.WEB_CONCURRENCY
+
+# uvloop and httptools (uvicorn[standard]) are picked up by loop="auto" and
+# http="auto"
+worker_class = "uvicorn_worker.UvicornWorker"
+bind = _setting("BIND", "0.0.0.0:8000")
+backlog = _setting("BACKLOG", 2048)
+
+# Idle keep-alive connections are held open behind a load balancer, whose own
+# idle timeout should be the shorter one
+keepalive = _setting("KEEPALIVE", 75)
+timeout = _setting("TIMEOUT", 60)
+graceful_timeout = _setting("GRACEFUL_TIMEOUT", 30)
+
+# Recycle workers to bound slow memory growth; the jitter keeps them from
+# restarting together
+max_requests = _setting("MAX_REQUESTS", 10_000)
+max_requests_jitter = _setting("MAX_REQUESTS_JITTER", 1_000)
+
+# The application writes its own access log (see src/utils/log_queue.py)
+accesslog = None
+errorlog = "-"
+
+# Each worker keeps its Prometheus samples in files that /metrics aggregates
+if "PROMETHEUS_MULTIPROC_DIR" not in os.environ:
+    os.environ["PROMETHEUS_MULTIPROC_DIR"] = tempfile.mkdtemp(prefix="prometheus-")
+
+
+def on_starting(server):
+    # Samples of a previous run would otherwise be added to this one's
+    directory = os.environ["PROMETHEUS_MULTIPROC_DIR"]
+    shutil.rmtree(directory, ignore_errors=True)
+    os.makedirs(directory, exist_ok=True)
+
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+
+    multiprocess.mark_process_dead(worker.pid)
@@ -10,3 +10,35 @@ class ToDoStatus(str, Enum):
     pending = "pending"
     inprogress = "inprogress"
     completed = "completed"
+
+
+class PaginationMode(str, Enum):
+    offset = "offset"
+    cursor = "cursor"
+
+
+class CountMode(str, Enum):
+    exact = "exact"
+    approximate = "approximate"
+    none = "none"
+
+
+class TodoListMode(str, Enum):
+    all = "all"
+    cursor = "cursor"
+
+
+class TodoSortField(str, Enum):
+    created_at = "created_at"
+    due_date = "due_date"
+
+
+class SortOrder(str, Enum):
+    asc = "asc"
+    desc = "desc"
+
+
+class ExportFormat(str, Enum):
+    json = "json"
+    ndjson = "ndjson"
+    csv = "csv"
@@ -1,23 +1,208 @@
+from uuid import uuid4
+
+import anyio
+import anyio.to_thread
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import NullPool
+from starlette.concurrency import run_in_threadpool
 
+from ..utils.pool_metrics import (
+    InstrumentedAsyncAdaptedQueuePool,
+    InstrumentedQueuePool,
+)
+from .routing import ReplicaSet, RoutingSession
 from .settings import settings
 
-engine = create_engine(
-    settings.DATABASE_URL,
-    echo=True,  # Enable SQL query logging
-    pool_size=3,  # 3 connections per worker → 4×3 = 12
-    max_overflow=1,  # Up to 1 extra per worker if needed → max 4 more = 16
-    pool_timeout=30,  # Wait time for a free connection
-    pool_pre_ping=True,  # Ensures stale connections are reused
+# asyncio drivers used when DATABASE_ASYNC is enabled
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+}
+
+
+# Threads per worker when THREADPOOL_SIZE is not set, anyio's own default
+MAX_THREADPOOL_SIZE = 40
+
+
+def default_pool_size() -> int:
+    """
+    Connections per worker when DATABASE_POOL_SIZE is not set: an even share
+    of DATABASE_MAX_CONNECTIONS between the WEB_CONCURRENCY workers, and no
+    more than the threadpool can use at once on the sync path.
+    """
+    share = max(settings.DATABASE_MAX_CONNECTIONS // settings.WEB_CONCURRENCY, 1)
+    if settings.DATABASE_ASYNC:
+        return share
+    return min(share, settings.THREADPOOL_SIZE or MAX_THREADPOOL_SIZE)
+
+
+def threadpool_size() -> int:
+    """
+    Threads per worker: THREADPOOL_SIZE, or on the sync path as many as the
+    pool has connections, up to MAX_THREADPOOL_SIZE. More threads would only
+    wait for a connection until DATABASE_POOL_TIMEOUT, while requests queued
+    for a thread wait without a deadline.
+    """
+    if settings.THREADPOOL_SIZE:
+        return settings.THREADPOOL_SIZE
+    if settings.DATABASE_ASYNC or settings.DATABASE_PGBOUNCER:
+        return MAX_THREADPOOL_SIZE
+    connections = (settings.DATABASE_POOL_SIZE or default_pool_size()) + (
+        settings.DATABASE_MAX_OVERFLOW or 0
+    )
+    return min(connections, MAX_THREADPOOL_SIZE)
+
+
+def engine_options(async_engine: bool = False, replica: int | None = None) -> dict:
+    """
+    create_engine / create_async_engine arguments for the configured pool.
+    ``replica`` is the index of the read replica the engine connects to.
+    """
+    name = "async" if async_engine else "sync"
+    if replica is not None:
+        name = f"{name}-replica{replica}"
+    options = dict(
+        echo=settings.DATABASE_ECHO,  # Log every statement, for debugging only
+        pool_pre_ping=True,  # Ensures stale connections are reused
+        pool_logging_name=name,  # Labels the pool metrics
+    )
+
+    if settings.DATABASE_PGBOUNCER:
+        # PgBouncer owns the pool; in transaction mode a server connection may
+        # change between statements, so prepared statements cannot be reused
+        options["poolclass"] = NullPool
+        if async_engine and settings.DATABASE_URL.startswith("postgresql"):
+            options["connect_args"] = {
+                "statement_cache_size": 0,
+                "prepared_statement_cache_size": 0,
+                "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+            }
+        return options
+
+    pool_size = settings.DATABASE_POOL_SIZE or default_pool_size()
+    max_overflow = settings.DATABASE_MAX_OVERFLOW
+    return options | dict(
+        poolclass=(
+            InstrumentedAsyncAdaptedQueuePool if async_engine else InstrumentedQueuePool
+        ),
+        pool_size=pool_size,
+        max_overflow=0 if max_overflow is None else max_overflow,
+        pool_timeout=settings.DATABASE_POOL_TIMEOUT,  # Then 503, see main
+        pool_recycle=settings.DATABASE_POOL_RECYCLE,
+    )
+
+
+DBSession = Session | AsyncSession
+
+
+def get_async_database_url(url: str) -> str:
+    """Map a sync database URL onto the matching asyncio driver."""
+    url = make_url(url)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No asyncio driver configured for '{backend}' databases")
+    return url.set(drivername=ASYNC_DRIVERS[backend]).render_as_string(
+        hide_password=False
+    )
+
+
+engine = create_engine(settings.DATABASE_URL, **engine_options())
+
+async_engine = (
+    create_async_engine(
+        settings.ASYNC_DATABASE_URL or get_async_database_url(settings.DATABASE_URL),
+        **engine_options(async_engine=True),
+    )
+    if settings.DATABASE_ASYNC
+    else None
+)
+
+replica_engines = [
+    create_engine(url, **engine_options(replica=index))
+    for index, url in enumerate(settings.DATABASE_REPLICA_URLS)
+]
+
+async_replica_engines = (
+    [
+        create_async_engine(
+            get_async_database_url(url),
+            **engine_options(async_engine=True, replica=index),
+        )
+        for index, url in enumerate(settings.DATABASE_REPLICA_URLS)
+    ]
+    if settings.DATABASE_ASYNC
+    else []
 )
 
 Base = declarative_base()
 
-SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
+# Objects are read after commit while building the response; expiring them
+# would cost a refresh SELECT per object (and blocking IO on an AsyncSession).
+# Reads of @read_only repository methods go to a replica, see RoutingSession
+SessionLocal = sessionmaker(
+    bind=engine,
+    class_=RoutingSession,
+    replicas=ReplicaSet(replica_engines, settings.DATABASE_REPLICA_RETRY_INTERVAL),
+    autoflush=False,
+    autocommit=False,
+    expire_on_commit=False,
+)
+
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    sync_session_class=RoutingSession,
+    replicas=ReplicaSet(
+        [replica.sync_engine for replica in async_replica_engines],
+        settings.DATABASE_REPLICA_RETRY_INTERVAL,
+    ),
+    autoflush=False,
+    expire_on_commit=False,
+)
+
+
+# Closing returns the connection to the pool, so it must not queue behind
+# threadpool workers that are blocked waiting for a connection themselves.
+_close_limiter: anyio.CapacityLimiter | None = None
+
+
+async def close_session(db: DBSession) -> None:
+    """Close a session of either flavour without blocking the event loop."""
+    global _close_limiter
+
+    if isinstance(db, AsyncSession):
+        await db.close()
+        return
+    if _close_limiter is None:
+        _close_limiter = anyio.CapacityLimiter(threadpool_size())
+    await anyio.to_thread.run_sync(db.close, limiter=_close_limiter)
+
+
+async def get_db():
+    """
+    Yield a request scoped session. An AsyncSession is used when
+    DATABASE_ASYNC is enabled, otherwise a sync Session whose repository
+    calls run on the threadpool.
+    """
+    if settings.DATABASE_ASYNC:
+        async with AsyncSessionLocal() as db:
+            yield db
+    else:
+        db = SessionLocal()
+        try:
+            yield db
+        finally:
+            await close_session(db)
 
 
-def get_db():
-    with SessionLocal() as db:
-        yield db
+async def dispose_engines() -> None:
+    """Close every pooled connection, at shutdown."""
+    for sync_engine in (engine, *replica_engines):
+        await run_in_threadpool(sync_engine.dispose)
+    if async_engine is not None:
+        await async_engine.dispose()
+    for replica in async_replica_engines:
+        await replica.dispose()
@@ -0,0 +1,184 @@
+import inspect
+import itertools
+import logging
+import time
+from functools import wraps
+
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import DBAPIError, InterfaceError, OperationalError
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.dml import UpdateBase
+
+logger = logging.getLogger(__name__)
+
+
+class ReplicaSet:
+    """
+    Read replicas handed out round-robin. A replica whose connection fails is
+    skipped for ``retry_interval`` seconds; pool_pre_ping catches the stale
+    connections of one that went away since.
+    """
+
+    def __init__(self, engines: list[Engine], retry_interval: float):
+        self.engines = engines
+        self.retry_interval = retry_interval
+
+        self._down_until = [0.0] * len(engines)
+        self._turn = itertools.count()
+
+    def pick(self) -> Engine | None:
+        """Return the next healthy replica, or None when every one is down."""
+        now = time.monotonic()
+        start = next(self._turn)
+        for offset in range(len(self.engines)):
+            index = (start + offset) % len(self.engines)
+            if now >= self._down_until[index]:
+                return self.engines[index]
+        return None
+
+    def mark_down(self, engine: Engine) -> None:
+        index = self.engines.index(engine)
+        self._down_until[index] = time.monotonic() + self.retry_interval
+        logger.warning(
+            "Replica %s failed, reading from primary for %ss",
+            engine.url.render_as_string(hide_password=True),
+            self.retry_interval,
+            exc_info=True,
+        )
+
+
+class RoutingSession(Session):
+    """
+    Session sending the reads of ``@read_only`` repository methods to a
+    replica, picked once per session. Anything else goes to the primary, and
+    so does every read after the session's first write, so a request always
+    sees its own writes.
+    """
+
+    def __init__(self, *args, replicas: ReplicaSet | None = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.replicas = replicas
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        primary = super().get_bind(mapper, clause=clause, **kwargs)
+        if not self.replicas or not self.replicas.engines:
+            return primary
+
+        if self._flushing or isinstance(clause, UpdateBase):
+            self.info["replica"] = False
+            return primary
+        if not self.info.get("read_only"):
+            return primary
+
+        replica = self.info.get("replica")
+        if replica is None:
+            replica = self.info["replica"] = self.replicas.pick() or False
+        return replica or primary
+
+
+def _replica_failed(db, exc: Exception) -> bool:
+    """
+    Whether ``exc`` is a lost connection to the replica ``db`` is reading
+    from, in which case the replica is marked down and reads move to primary.
+    """
+    session = getattr(db, "sync_session", db)  # AsyncSession wraps a RoutingSession
+    replica = session.info.get("replica")
+    if not replica or not isinstance(exc, DBAPIError):
+        return False
+    if not (
+        exc.connection_invalidated
+        or isinstance(exc, (OperationalError, InterfaceError))
+    ):
+        return False
+
+    session.info["replica"] = False
+    session.replicas.mark_down(replica)
+    return True
+
+
+def read_only(method):
+    """
+    Mark a repository method as safe to serve from a read replica. When the
+    replica cannot be reached, the call is retried once on the primary (for
+    generators, only before the first batch has been yielded).
+    """
+
+    def enter(db) -> bool:
+        previous = db.info.get("read_only", False)
+        db.info["read_only"] = True
+        return previous
+
+    if inspect.isasyncgenfunction(method):
+
+        @wraps(method)
+        async def wrapper(self, *args, **kwargs):
+            previous = enter(self.db)
+            try:
+                started = False
+                try:
+                    async for item in method(self, *args, **kwargs):
+                        started = True
+                        yield item
+                    return
+                except Exception as exc:
+                    if started or not _replica_failed(self.db, exc):
+                        raise
+                await self.db.rollback()
+                async for item in method(self, *args, **kwargs):
+                    yield item
+            finally:
+                self.db.info["read_only"] = previous
+
+    elif inspect.iscoroutinefunction(method):
+
+        @wraps(method)
+        async def wrapper(self, *args, **kwargs):
+            previous = enter(self.db)
+            try:
+                try:
+                    return await method(self, *args, **kwargs)
+                except Exception as exc:
+                    if not _replica_failed(self.db, exc):
+                        raise
+                await self.db.rollback()
+                return await method(self, *args, **kwargs)
+            finally:
+                self.db.info["read_only"] = previous
+
+    elif inspect.isgeneratorfunction(method):
+
+        @wraps(method)
+        def wrapper(self, *args, **kwargs):
+            previous = enter(self.db)
+            try:
+                started = False
+                try:
+                    for item in method(self, *args, **kwargs):
+                        started = True
+                        yield item
+                    return
+                except Exception as exc:
+                    if started or not _replica_failed(self.db, exc):
+                        raise
+                self.db.rollback()
+                yield from method(self, *args, **kwargs)
+            finally:
+                self.db.info["read_only"] = previous
+
+    else:
+
+        @wraps(method)
+        def wrapper(self, *args, **kwargs):
+            previous = enter(self.db)
+            try:
+                try:
+                    return method(self, *args, **kwargs)
+                except Exception as exc:
+                    if not _replica_failed(self.db, exc):
+                        raise
+                self.db.rollback()
+                return method(self, *args, **kwargs)
+            finally:
+                self.db.info["read_only"] = previous
+
+    return wrapper
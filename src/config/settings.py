@@ -24,18 +24,110 @@ class Settings(BaseSettings):
 
     # Database settings
     DATABASE_URL: str = "sqlite:///./sqlite.db" # Reading the database URL from environment
+    DATABASE_ASYNC: bool = False  # Serve requests through the AsyncSession repositories
+    ASYNC_DATABASE_URL: str | None = None  # Derived from DATABASE_URL when not set
+    DATABASE_ECHO: bool = False  # Log every SQL statement, for debugging only
+
+    # Connection pool settings, sizes derived from the concurrency when not set
+    WEB_CONCURRENCY: int = 1  # Worker processes, the variable gunicorn reads too
+    THREADPOOL_SIZE: int | None = None  # Threads per worker, matched to the pool when not set
+    DATABASE_MAX_CONNECTIONS: int = 100  # Connections the database allows all workers
+    DATABASE_POOL_SIZE: int | None = None  # Per worker
+    DATABASE_MAX_OVERFLOW: int | None = None  # Per worker, 0 when not set
+    DATABASE_POOL_TIMEOUT: float = 10  # Seconds to wait for a connection, then 503
+    DATABASE_POOL_RECYCLE: int = 1800  # Seconds before a connection is replaced
+    DATABASE_PGBOUNCER: bool = False  # NullPool and no prepared statements
+    DATABASE_REPLICA_URLS: list[str] = []  # Read replicas, as a JSON list
+    DATABASE_REPLICA_RETRY_INTERVAL: float = 5.0  # Seconds to skip a failed replica
+
+    # SQL instrumentation settings
+    SQL_SLOW_QUERY_MS: float = 100  # Statements slower than this may be logged
+    SQL_SLOW_QUERY_SAMPLE_RATE: float = 1.0  # Fraction of slow statements logged
+    SQL_N_PLUS_ONE_THRESHOLD: int = 5  # Runs of one statement per request flagged as N+1
+    SQL_SERVER_TIMING: bool = True  # Send per request DB totals as a Server-Timing header
 
     # redish settings
     REDIS_HOST: str
     REDIS_PORT: int
     REDIS_PASSWORD: str
     REDIS_SSL: bool
+    REDIS_MAX_CONNECTIONS: int = 20  # Pooled connections per worker
+    REDIS_POOL_TIMEOUT: float = 1.0  # Seconds to wait for a free pooled connection
+    REDIS_SOCKET_TIMEOUT: float = 0.5  # Seconds per command
+    REDIS_CONNECT_TIMEOUT: float = 0.5  # Seconds to open a connection
+    REDIS_HEALTH_CHECK_INTERVAL: int = 30  # Seconds before an idle connection is pinged
+    REDIS_RETRY_INTERVAL: float = 5.0  # Seconds Redis is skipped after a failure
+    REDIS_FAKE: bool = False  # In-process fakeredis (dev dependency), no server needed
+
+    # Authenticated-user cache settings
+    USER_CACHE_SIZE: int = 10_000  # Max users kept in the in-process tier
+    USER_CACHE_TTL: int = 30  # Seconds, bounds staleness when an invalidation is missed
+    USER_CACHE_REDIS: bool = True  # Share cached users and their invalidation between workers via Redis
+    USER_CACHE_UNSHARED_TTL: int = 2  # Seconds, caps USER_CACHE_TTL for several workers without Redis
+    USER_CACHE_REDIS_TTL: int = 300  # Seconds
+
+    # Response cache settings
+    RESPONSE_CACHE_ENABLED: bool = True
+    RESPONSE_CACHE_REDIS: bool = True  # Share cached responses and their invalidation between workers via Redis
+    RESPONSE_CACHE_TTL: int = 60  # Seconds a cached response is served as fresh
+    RESPONSE_CACHE_STALE_TTL: int = 30  # Extra seconds it is served while being refreshed
+    RESPONSE_CACHE_LOCAL_SIZE: int = 10_000  # Max responses kept in the in-process tier
+    RESPONSE_CACHE_LOCAL_TTL: int = 5  # Seconds a local copy of a Redis entry is trusted
+
+    # Rate limiting settings
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_REDIS: bool = True  # Share counters between workers via Redis
+    RATE_LIMIT_DEFAULT: str = "100/minute"  # Per client across the API, by default
+    RATE_LIMIT_ROLES: dict[str, str] = {  # Per role overrides of the default
+        "admin": "1000/minute",
+        "anonymous": "60/minute",
+    }
+    RATE_LIMIT_LOCAL_SIZE: int = 100_000  # Max clients tracked per worker without Redis
+
+    # Password hashing pool settings
+    PASSWORD_HASH_WORKERS: int = 2  # bcrypt worker processes per app worker
+    PASSWORD_HASH_QUEUE_SIZE: int = 32  # Jobs allowed to wait before answering 503
+
+    # Streaming export settings
+    EXPORT_BATCH_SIZE: int = 1000  # Rows fetched per server-side cursor round-trip
+    EXPORT_CHUNK_SIZE: int = 64 * 1024  # Bytes coalesced per streamed chunk
+
+    # Bulk user import
+    USER_IMPORT_MAX_ROWS: int = 5000  # Users accepted per import
+    USER_IMPORT_BATCH_SIZE: int = 500  # Users checked and inserted per statement
+
+    # Email delivery queue settings
+    EMAIL_QUEUE_PATH: Path | None = None  # SQLite outbox, BASE_DIR/email_outbox.db when not set
+    EMAIL_BATCH_SIZE: int = 50  # Messages claimed and sent per round over one SMTP connection
+    EMAIL_POLL_INTERVAL: float = 5.0  # Seconds between outbox checks when idle
+    EMAIL_LEASE: float = 300  # Seconds a claimed message is reserved for its worker
+    EMAIL_MAX_ATTEMPTS: int = 8  # Deliveries tried before a message is marked failed
+    EMAIL_RETRY_BASE: float = 30  # Seconds before the first retry, doubling after each
+    EMAIL_RETRY_MAX: float = 3600  # Longest wait between retries
+    EMAIL_SMTP_TIMEOUT: float = 10  # Seconds per SMTP command
+    EMAIL_SMTP_IDLE_TIMEOUT: float = 60  # Seconds an unused SMTP connection is kept open
+
+    # Health check settings
+    HEALTH_CHECK_INTERVAL: float = 10  # Seconds between readiness checks, probes read the last one
+    HEALTH_CHECK_TIMEOUT: float = 2  # Seconds each dependency check may take
+
+    # Template settings
+    TEMPLATE_CACHE_DIR: Path | None = None  # Compiled template cache, a temp dir when not set
+    TEMPLATE_AUTO_RELOAD: bool = False  # Check template files for changes, for development
+
+    # Bulk todo endpoints
+    TODO_BULK_MAX_ITEMS: int = 500  # Items accepted per /todo/bulk request
 
     # JWT Auth Settings
     SECRET_KEY: str
-    ALGORITHM: str = "HS256"
+    ALGORITHM: str = "HS256"  # HS256 signs with SECRET_KEY; RS256, ES256, EdDSA with the keys below
+    JWT_PRIVATE_KEY: str | None = None  # PEM, signs tokens with an asymmetric ALGORITHM
+    JWT_PUBLIC_KEY: str | None = None  # PEM, verifies them; derived from the private key when not set
+    TOKEN_CACHE_SIZE: int = 10_000  # Verified tokens whose claims are memoized, per worker
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     REFRESH_TOKEN_EXPIRE_MINUTES: int = 60
+    TOKEN_REVOCATION_REDIS: bool = True  # Share revoked refresh tokens between workers via Redis
+    TOKEN_REVOCATION_SWEEP_INTERVAL: int = 60  # Seconds between sweeps of the local revocation set
 
     # Model config
     model_config = {
@@ -44,7 +136,10 @@ class Settings(BaseSettings):
     }
 
 
-# Instantiate the settings
+# Instantiate the settings. Built on import on purpose: module level objects
+# across src (pools, caches, engines) are sized from them, and building them
+# only reads the environment and .env. The engines built from them open no
+# connection until first used.
 settings = Settings()
 
 # Absolute paths (These can be outside the BaseSettings class)
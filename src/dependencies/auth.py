@@ -1,28 +1,41 @@
 from typing import Annotated
 
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
 
-from ..config.database import get_db
+from ..config.database import DBSession, get_db
 from ..schemas.auth_schema import Token
 from ..schemas.user_schema import UserDetailedOutput
 from ..service.users_services import UserService
-from ..utils.auth import verify_token
+from ..utils.auth import REFRESH_TOKEN, verify_request_token
+from ..utils.user_cache import user_cache
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/token")
 
 
-def get_current_user_and_db(
+async def get_current_user_and_db(
+    request: Request,
     token: Annotated[Token, Depends(oauth2_scheme)],
-    db: Annotated[Session, Depends(get_db)],
-) -> tuple[UserDetailedOutput, Session]:
+    db: Annotated[DBSession, Depends(get_db)],
+) -> tuple[UserDetailedOutput, DBSession]:
 
-    payload = verify_token(token)
+    # Usually already decoded by the rate limiter
+    payload = verify_request_token(request, token)
+    if payload.get("type") == REFRESH_TOKEN:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
     username = payload.get("sub")
 
+    # Most requests are served from the cache without touching the database
+    user = await user_cache.get(username)
+    if user is not None:
+        return user, db
+
     user_service = UserService(db)
-    user = user_service.repository.get_user_all_detail_by_username(username)
+    user = await user_service.repository.get_user_all_detail_by_username(username)
 
     if user is None:
         raise HTTPException(
@@ -30,4 +43,7 @@ def get_current_user_and_db(
             detail="Could not validate credentials",
             headers={"WWW-Authenticate": "Bearer"},
         )
+
+    user = UserDetailedOutput.model_validate(user)
+    await user_cache.set(user)
     return user, db
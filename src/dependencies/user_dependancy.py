@@ -1,20 +1,20 @@
 from typing import Annotated
 
 from fastapi import Depends, HTTPException, status
-from sqlalchemy.orm import Session
 
 from ..config.constant import UserRole
+from ..config.database import DBSession
 from ..schemas.user_schema import UserDetailedOutput
 from .auth import get_current_user_and_db
 
 USER_DB_Dependancy = Annotated[
-    tuple[UserDetailedOutput, Session], Depends(get_current_user_and_db)
+    tuple[UserDetailedOutput, DBSession], Depends(get_current_user_and_db)
 ]
 
 
-def get_admin_user_and_db(
+async def get_admin_user_and_db(
     user_db: USER_DB_Dependancy,
-) -> tuple[UserDetailedOutput, Session]:
+) -> tuple[UserDetailedOutput, DBSession]:
 
     user, db = user_db
 
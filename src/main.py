@@ -1,21 +1,55 @@
-import logging
-import time
+import sys
 from contextlib import asynccontextmanager
 
-import uvicorn
-from fastapi import FastAPI, Request
+import anyio.to_thread
+from fastapi import FastAPI, Request, status
+from fastapi.responses import JSONResponse, ORJSONResponse
 from fastapi.staticfiles import StaticFiles
-from slowapi import _rate_limit_exceeded_handler
-from slowapi.errors import RateLimitExceeded
-from slowapi.middleware import SlowAPIMiddleware
-
-from src.config.settings import STATIC_DIR, settings
-from src.router import auth_router, template_routes, todo_router, user_router
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+from src.config.database import dispose_engines, threadpool_size
+from src.config.settings import STATIC_DIR
+from src.router import (
+    auth_router,
+    metrics_router,
+    template_routes,
+    todo_router,
+    user_router,
+)
+from src.utils.auth import token_keys
+from src.utils.email_queue import email_queue
+from src.utils.health import HealthMiddleware, readiness
 from src.utils.init_db import create_table
-from src.utils.intit_redish import startup
-from src.utils.rate_limiter import limiter
+from src.utils.intit_redish import shutdown, startup
+from src.utils.log_queue import access_log
+from src.utils.metrics import MetricsMiddleware
+from src.utils.password_pool import password_pool
+from src.utils.rate_limiter import RateLimitMiddleware, limiter
+from src.utils.sql_metrics import QueryStatsMiddleware
+from src.utils.template_engine import precompile_templates
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    access_log.start()
+    # Bounds the sync repository calls, and with them the connections they use
+    anyio.to_thread.current_default_thread_limiter().total_tokens = (
+        threadpool_size()
+    )
+    token_keys()  # Fails on a missing or invalid JWT key
+    await startup()  # Call the startup function
+    precompile_templates()
+    password_pool.start()
+    email_queue.start()
+    await readiness.start()
+    yield
+    await readiness.stop()
+    email_queue.stop()
+    password_pool.shutdown()
+    await shutdown()
+    await dispose_engines()
+    access_log.stop()
 
-from src.utils.alembic_upgrade import run_alembic_migrations
 
 app = FastAPI(
     title="FastAPI Project - User & Todo Management",
@@ -66,6 +100,8 @@ app = FastAPI(
         },
     ],
     version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
 
@@ -73,53 +109,82 @@ app = FastAPI(
 if STATIC_DIR.exists():
     app.mount("/static", StaticFiles(directory=STATIC_DIR), name="static")
 
-# run_alembic_migrations()
-@asynccontextmanager
-async def lifespan(app: FastAPI):
-
-
-    await startup()  # Call the startup function
-    yield
-    # Add any cleanup logic here if needed
-
-
 app.include_router(auth_router.router)
 app.include_router(user_router.router)
 app.include_router(todo_router.router)
 
 app.include_router(template_routes.router)
+app.include_router(metrics_router.router)
 
-# Register rate limiter middleware and error handler
-app.state.limiter = limiter
-app.add_middleware(SlowAPIMiddleware)
-app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
-
-# Configure logger only if needed (optional)
-logger = logging.getLogger("process_time")
-logger.setLevel(logging.INFO)
-
+@app.exception_handler(PoolTimeoutError)
+async def pool_timeout_handler(request: Request, exc: PoolTimeoutError):
+    # Every connection stayed busy for DATABASE_POOL_TIMEOUT seconds
+    return JSONResponse(
+        {"detail": "Server is busy, please retry shortly."},
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        headers={"Retry-After": "1"},
+    )
 
-# Function-based middleware: fastest way
-@app.middleware("http")
-async def process_time_middleware(request: Request, call_next):
-    start = time.perf_counter()
 
-    response = await call_next(request)
+# Register rate limiter middleware
+app.add_middleware(RateLimitMiddleware, limiter=limiter)
 
-    duration_ms = round((time.perf_counter() - start) * 1000, 2)
-    response.headers["X-Process-Time"] = f"{duration_ms} ms"
+app.add_middleware(QueryStatsMiddleware)
 
-    # Logging optional: comment out to save performance
-    print("-------------------------------------------------------")
-    print(f"{request.method} {request.url.path} - {duration_ms} ms")
-    logger.info(f"{request.method} {request.url.path} - {duration_ms} ms")
+# Outermost, so rejected and failed requests are measured too
+app.add_middleware(MetricsMiddleware)
 
-    return response
+# Probes are answered ahead of every other middleware
+app.add_middleware(HealthMiddleware)
 
 
 def main():
-    uvicorn.run(app, port=8000, reload=True)
+    """Development server; production runs gunicorn with gunicorn.conf.py."""
+    import uvicorn
+
+    uvicorn.run("src.main:app", port=8000, reload=True)
+
+
+def import_users(argv: list[str] | None = None):
+    """Bulk import users from a CSV or JSON file: python -m src.main import-users FILE"""
+    import argparse
+    import asyncio
+    from pathlib import Path
+
+    from fastapi import HTTPException
+    from fastapi.exceptions import RequestValidationError
+
+    from src.service.users_services import import_users_file
+
+    parser = argparse.ArgumentParser(
+        prog="python -m src.main import-users",
+        description="Create users from a CSV or JSON file. "
+        "PASSWORD_HASH_WORKERS sets how many processes hash passwords.",
+    )
+    parser.add_argument("file", type=Path, help="CSV or JSON file of users")
+    parser.add_argument(
+        "--no-email", action="store_true", help="do not send welcome emails"
+    )
+    args = parser.parse_args(argv)
+
+    try:
+        result = asyncio.run(import_users_file(args.file, not args.no_email))
+    except RequestValidationError as exc:
+        for error in exc.errors():
+            print(f"row {error['loc'][0]}: {'.'.join(map(str, error['loc'][1:]))}: {error['msg']}")
+        sys.exit(1)
+    except HTTPException as exc:
+        print(exc.detail)
+        sys.exit(1)
+
+    for row in result.results:
+        if row.status_code >= 400:
+            print(f"row {row.index}: {row.username}: {row.detail}")
+    print(f"{result.created} users created, {result.failed} skipped")
 
 
 if __name__ == "__main__":
-    main()
+    if sys.argv[1:2] == ["import-users"]:
+        import_users(sys.argv[2:])
+    else:
+        main()
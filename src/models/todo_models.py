@@ -1,4 +1,4 @@
-from datetime import datetime
+from datetime import date, datetime
 
 from sqlalchemy import (
     UUID,
@@ -7,10 +7,11 @@ from sqlalchemy import (
     DateTime,
     Enum,
     ForeignKey,
+    Index,
     Integer,
     String,
     Text,
-    func,
+    bindparam,
 )
 from sqlalchemy.ext.hybrid import hybrid_property
 from sqlalchemy.orm import relationship
@@ -20,9 +21,24 @@ from ..config.database import Base
 from ..models.user_model import User
 
 
+def _today() -> date:
+    # The app host's date, on both sides of is_overdue
+    return datetime.now().date()
+
+
 class ToDo(Base):
 
     __tablename__ = "todos"
+    __table_args__ = (
+        # Filtered listing of GET /todo
+        Index(
+            "ix_todos_created_by_status_due_date", "created_by", "status", "due_date"
+        ),
+        # Default keyset order of GET /todo
+        Index("ix_todos_created_by_created_at_id", "created_by", "created_at", "id"),
+        # Due date order of GET /todo, NULLs last as sorted
+        Index("ix_todos_created_by_due_date_id", "created_by", "due_date", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String(100), nullable=False)
@@ -31,8 +47,8 @@ class ToDo(Base):
 
     status = Column(Enum(ToDoStatus), default=ToDoStatus.pending, nullable=False)
 
-    created_at = Column(DateTime, default=datetime.now())
-    updated_at = Column(DateTime, default=datetime.now, onupdate=datetime.now())
+    created_at = Column(DateTime, default=datetime.now)
+    updated_at = Column(DateTime, default=datetime.now, onupdate=datetime.now)
 
     created_by = Column(UUID, ForeignKey(User.id, ondelete="CASCADE"), nullable=False)
 
@@ -44,11 +60,16 @@ class ToDo(Base):
         if (
             self.status != ToDoStatus.completed
             and self.due_date
-            and self.due_date < datetime.now().date()
+            and self.due_date < _today()
         ):
             return True
         return False
 
-    @is_overdue.expression
-    def check_is_over_due(cls):
-        return (cls.status != ToDoStatus.completed) & (cls.due_date < func.now())
+    # Must reuse the attribute name, otherwise SQLAlchemy 2.0 keeps the
+    # expression on a copy and ToDo.is_overdue has no SQL form
+    @is_overdue.inplace.expression
+    @classmethod
+    def _is_overdue_expression(cls):
+        # Bound when the statement runs, rather than the database's CURRENT_DATE
+        today = bindparam(None, callable_=_today, type_=Date)
+        return (cls.status != ToDoStatus.completed) & (cls.due_date < today)
@@ -1,10 +1,11 @@
 from datetime import datetime
 
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from ..models.user_model import User
-from ..schemas.user_schema import UserDetailedOutput, UserLogin
-from ..utils.password_helper import verify_password
+from ..schemas.user_schema import UserDetailedOutput
 
 
 class AuthRepository:
@@ -16,10 +17,43 @@ class AuthRepository:
     def __init__(self, db: Session):
         self.db = db
 
-    def authenticate_user(self, data: UserLogin) -> UserDetailedOutput | bool:
-        user = self.db.query(User).filter_by(username=data.username).first()
-        if not user or not verify_password(data.password, user.hash_password):
-            return False
+    def get_login_user(self, _username: str) -> UserDetailedOutput | None:
+        """
+        Retrieve the user logging in, then end the read transaction so no
+        connection is held while the password is verified.
+        """
+
+        user = self.db.query(User).filter_by(username=_username).first()
+        self.db.commit()
+        return user
+
+    def record_login(self, user: UserDetailedOutput) -> None:
+        """Set the last login time of a verified user, in its own transaction."""
+
         user.last_login = datetime.now()
         self.db.commit()
+
+
+class AsyncAuthRepository:
+    """
+    Asyncio counterpart of AuthRepository, backed by an AsyncSession.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_login_user(self, _username: str) -> UserDetailedOutput | None:
+        """
+        Retrieve the user logging in, then end the read transaction so no
+        connection is held while the password is verified.
+        """
+
+        user = await self.db.scalar(select(User).filter_by(username=_username))
+        await self.db.commit()
         return user
+
+    async def record_login(self, user: UserDetailedOutput) -> None:
+        """Set the last login time of a verified user, in its own transaction."""
+
+        user.last_login = datetime.now()
+        await self.db.commit()
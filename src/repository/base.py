@@ -0,0 +1,48 @@
+import inspect
+from functools import wraps
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import iterate_in_threadpool, run_in_threadpool
+
+from ..config.database import DBSession
+
+
+class ThreadpoolRepository:
+    """
+    Exposes a sync repository through the awaitable interface of the async
+    repositories. Every call runs on the threadpool, which keeps the sync
+    Session path available to benchmark against the AsyncSession one.
+    """
+
+    def __init__(self, repository):
+        self._repository = repository
+
+    def __getattr__(self, name):
+        attr = getattr(self._repository, name)
+
+        if inspect.isgeneratorfunction(attr):
+
+            @wraps(attr)
+            def iterate(*args, **kwargs):
+                return iterate_in_threadpool(attr(*args, **kwargs))
+
+            return iterate
+
+        if callable(attr):
+
+            @wraps(attr)
+            async def call(*args, **kwargs):
+                return await run_in_threadpool(attr, *args, **kwargs)
+
+            return call
+
+        return attr
+
+
+def build_repository(db: DBSession, sync_repository: type, async_repository: type):
+    """
+    Pick the repository implementation matching the session handed out by get_db.
+    """
+    if isinstance(db, AsyncSession):
+        return async_repository(db)
+    return ThreadpoolRepository(sync_repository(db))
@@ -1,8 +1,103 @@
 from pydantic import UUID4
+from sqlalchemy import (
+    ColumnElement,
+    Select,
+    and_,
+    delete,
+    insert,
+    not_,
+    or_,
+    select,
+    tuple_,
+    update,
+)
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
+from ..config.constant import SortOrder, TodoSortField
+from ..config.routing import read_only
 from ..models.todo_models import ToDo
-from ..schemas.toso_shcema import TodoInput, TodoOutput, TodoUpdate
+from ..schemas.toso_shcema import (
+    TodoBulkUpdateItem,
+    TodoInput,
+    TodoListParams,
+    TodoOutput,
+    TodoUpdate,
+)
+from ..utils.cache import response_cache, todos_namespace
+
+def _after_due_date(order: SortOrder, after_value, after_id: int) -> ColumnElement:
+    """
+    Rows following (after_value, after_id) in due date order, with todos
+    without a due date last in ascending order (first in descending). Row
+    value comparison cannot express where NULLs go, hence the spelled out
+    conditions.
+    """
+
+    if order == SortOrder.asc:
+        if after_value is None:
+            return and_(ToDo.due_date.is_(None), ToDo.id > after_id)
+        return or_(
+            ToDo.due_date > after_value,
+            and_(ToDo.due_date == after_value, ToDo.id > after_id),
+            ToDo.due_date.is_(None),
+        )
+    if after_value is None:
+        return or_(
+            and_(ToDo.due_date.is_(None), ToDo.id < after_id),
+            ToDo.due_date.is_not(None),
+        )
+    return or_(
+        ToDo.due_date < after_value,
+        and_(ToDo.due_date == after_value, ToDo.id < after_id),
+    )
+
+
+def todos_page_query(
+    created_by: UUID4, params: TodoListParams, after: tuple | None, limit: int | None
+) -> Select:
+    """
+    Build the filtered keyset query behind GET /todo. ``after`` is the
+    (sort value, id) pair of the last row of the previous page; without a
+    ``limit`` every matching todo is selected.
+    """
+
+    stmt = select(ToDo).filter(ToDo.created_by == created_by)
+
+    if params.status is not None:
+        stmt = stmt.filter(ToDo.status == params.status)
+    if params.due_after is not None:
+        stmt = stmt.filter(ToDo.due_date >= params.due_after)
+    if params.due_before is not None:
+        stmt = stmt.filter(ToDo.due_date <= params.due_before)
+    if params.is_overdue is True:
+        stmt = stmt.filter(ToDo.is_overdue)
+    elif params.is_overdue is False:
+        stmt = stmt.filter(or_(ToDo.due_date.is_(None), not_(ToDo.is_overdue)))
+
+    if after is not None:
+        after_value, after_id = after
+        key = tuple_(ToDo.created_at, ToDo.id)
+        if params.sort_by == TodoSortField.due_date:
+            stmt = stmt.filter(_after_due_date(params.order, after_value, after_id))
+        elif params.order == SortOrder.asc:
+            stmt = stmt.filter(key > (after_value, after_id))
+        else:
+            stmt = stmt.filter(key < (after_value, after_id))
+
+    # On the raw columns, so (created_by, due_date, id) and (created_by,
+    # created_at, id) serve the order, read backwards for desc
+    if params.sort_by == TodoSortField.due_date:
+        if params.order == SortOrder.asc:
+            stmt = stmt.order_by(ToDo.due_date.asc().nulls_last(), ToDo.id)
+        else:
+            stmt = stmt.order_by(ToDo.due_date.desc().nulls_first(), ToDo.id.desc())
+    elif params.order == SortOrder.asc:
+        stmt = stmt.order_by(ToDo.created_at, ToDo.id)
+    else:
+        stmt = stmt.order_by(ToDo.created_at.desc(), ToDo.id.desc())
+
+    return stmt.limit(limit)
 
 
 class TodoRepository:
@@ -21,9 +116,68 @@ class TodoRepository:
         todo = ToDo(**data.model_dump(), created_by=user_id)
         self.db.add(todo)
         self.db.commit()
-        self.db.refresh(todo)
+        response_cache.invalidate_sync(todos_namespace(user_id))
         return todo
 
+    def create_many(self, user_id: UUID4, items: list[TodoInput]) -> list[TodoOutput]:
+        """
+        Insert several ToDo items in one INSERT ... RETURNING (batched by the
+        driver) and return them in input order.
+        """
+
+        todos = self.db.scalars(
+            insert(ToDo).returning(ToDo, sort_by_parameter_order=True),
+            [dict(item.model_dump(), created_by=user_id) for item in items],
+        ).all()
+        self.db.commit()
+        response_cache.invalidate_sync(todos_namespace(user_id))
+        return todos
+
+    def update_many(
+        self, user_id: UUID4, items: list[TodoBulkUpdateItem]
+    ) -> dict[int, TodoOutput]:
+        """
+        Apply several partial updates to the user's todos. The owned rows are
+        loaded with one SELECT and flushed as executemany UPDATEs; returns the
+        updated todos by ID, missing or foreign IDs are left out.
+        """
+
+        todos = {
+            todo.id: todo
+            for todo in self.db.scalars(
+                select(ToDo).filter(
+                    ToDo.id.in_([item.id for item in items]),
+                    ToDo.created_by == user_id,
+                )
+            )
+        }
+        for item in items:
+            if item.id in todos:
+                for field, value in item.model_dump(
+                    exclude_unset=True, exclude={"id"}
+                ).items():
+                    setattr(todos[item.id], field, value)
+        self.db.commit()
+        response_cache.invalidate_sync(todos_namespace(user_id))
+        return todos
+
+    def delete_many(self, user_id: UUID4, ids: list[int]) -> set[int]:
+        """
+        Delete the user's todos among ``ids`` in one statement and return the
+        IDs that were actually deleted.
+        """
+
+        stmt = delete(ToDo).filter(ToDo.id.in_(ids), ToDo.created_by == user_id)
+        if self.db.get_bind().dialect.delete_returning:
+            deleted = set(self.db.scalars(stmt.returning(ToDo.id)))
+        else:
+            deleted = set(self.db.scalars(select(ToDo.id).filter(stmt.whereclause)))
+            self.db.execute(stmt)
+        self.db.commit()
+        response_cache.invalidate_sync(todos_namespace(user_id))
+        return deleted
+
+    @read_only
     def get_todos_by_created_user(self, _created_by: UUID4) -> list[TodoOutput]:
         """
         Retrieve a list of todos created by a specific user.
@@ -31,6 +185,24 @@ class TodoRepository:
 
         return self.db.query(ToDo).filter_by(created_by=_created_by).all()
 
+    @read_only
+    def get_todos_page_by_created_user(
+        self,
+        _created_by: UUID4,
+        params: TodoListParams,
+        after: tuple | None,
+        limit: int | None,
+    ) -> list[TodoOutput]:
+        """
+        Retrieve one filtered, sorted keyset page of a user's todos, or all
+        of them without a ``limit``.
+        """
+
+        return self.db.scalars(
+            todos_page_query(_created_by, params, after, limit)
+        ).all()
+
+    @read_only
     def get_todos(self) -> list[TodoOutput]:
         """
         Retrieve all todo items from the database.
@@ -45,6 +217,17 @@ class TodoRepository:
 
         return self.db.query(ToDo).filter_by(id=_id).first()
 
+    def get_todo_by_id_user(self, user_id: UUID4, _id: int) -> TodoOutput | None:
+        """
+        Retrieve a todo item by ID only if it belongs to the given user.
+        """
+
+        return (
+            self.db.query(ToDo)
+            .filter(ToDo.id == _id, ToDo.created_by == user_id)
+            .first()
+        )
+
     def exists_todo_by_id_user(self, user_id: UUID4, _id: int) -> bool:
         """
         Checks if a ToDo item exists for a given user ID and ToDo ID.
@@ -57,22 +240,227 @@ class TodoRepository:
             is not None
         )
 
-    def delete_todo_by_id(self, _id: int) -> None:
+    def delete_todo_by_id_user(self, user_id: UUID4, _id: int) -> bool:
         """
-        Deletes a ToDo item from the database by its ID.
+        Deletes a ToDo item owned by the given user, returning whether it existed.
         """
 
-        self.db.query(ToDo).filter_by(id=_id).delete()
+        result = self.db.execute(
+            delete(ToDo).filter(ToDo.id == _id, ToDo.created_by == user_id)
+        )
         self.db.commit()
-        return None
+        response_cache.invalidate_sync(todos_namespace(user_id))
+        return result.rowcount > 0
 
-    def update_todo_by_id(self, _id: int, data: TodoUpdate) -> TodoOutput:
+    def update_todo_by_id_user(
+        self, user_id: UUID4, _id: int, data: TodoUpdate
+    ) -> TodoOutput | None:
         """
-        Update a todo item by its ID with the provided data.
+        Update a todo item owned by the given user and return it, or None when
+        it does not exist. Uses a single UPDATE ... RETURNING where supported.
         """
 
-        todo = self.db.query(ToDo).filter_by(id=_id)
-        data = data.model_dump(exclude_unset=True)
-        todo.update(data)
+        values = data.model_dump(exclude_unset=True)
+        if not values:
+            return self.get_todo_by_id_user(user_id, _id)
+
+        stmt = (
+            update(ToDo)
+            .filter(ToDo.id == _id, ToDo.created_by == user_id)
+            .values(**values)
+        )
+        if self.db.get_bind().dialect.update_returning:
+            todo = self.db.scalars(stmt.returning(ToDo)).first()
+        elif self.db.execute(stmt).rowcount:
+            todo = self.get_todo_by_id_user(user_id, _id)
+        else:
+            todo = None
         self.db.commit()
-        return todo.first()
+        response_cache.invalidate_sync(todos_namespace(user_id))
+        return todo
+
+
+class AsyncTodoRepository:
+    """
+    Asyncio counterpart of TodoRepository, backed by an AsyncSession.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def create(self, user_id: UUID4, data: TodoInput) -> TodoOutput:
+        """
+        Creates a new ToDo item for the specified user and returns the created item.
+        """
+
+        todo = ToDo(**data.model_dump(), created_by=user_id)
+        self.db.add(todo)
+        await self.db.commit()
+        await response_cache.invalidate(todos_namespace(user_id))
+        return todo
+
+    async def create_many(
+        self, user_id: UUID4, items: list[TodoInput]
+    ) -> list[TodoOutput]:
+        """
+        Insert several ToDo items in one INSERT ... RETURNING (batched by the
+        driver) and return them in input order.
+        """
+
+        todos = (
+            await self.db.scalars(
+                insert(ToDo).returning(ToDo, sort_by_parameter_order=True),
+                [dict(item.model_dump(), created_by=user_id) for item in items],
+            )
+        ).all()
+        await self.db.commit()
+        await response_cache.invalidate(todos_namespace(user_id))
+        return todos
+
+    async def update_many(
+        self, user_id: UUID4, items: list[TodoBulkUpdateItem]
+    ) -> dict[int, TodoOutput]:
+        """
+        Apply several partial updates to the user's todos. The owned rows are
+        loaded with one SELECT and flushed as executemany UPDATEs; returns the
+        updated todos by ID, missing or foreign IDs are left out.
+        """
+
+        todos = {
+            todo.id: todo
+            for todo in await self.db.scalars(
+                select(ToDo).filter(
+                    ToDo.id.in_([item.id for item in items]),
+                    ToDo.created_by == user_id,
+                )
+            )
+        }
+        for item in items:
+            if item.id in todos:
+                for field, value in item.model_dump(
+                    exclude_unset=True, exclude={"id"}
+                ).items():
+                    setattr(todos[item.id], field, value)
+        await self.db.commit()
+        await response_cache.invalidate(todos_namespace(user_id))
+        return todos
+
+    async def delete_many(self, user_id: UUID4, ids: list[int]) -> set[int]:
+        """
+        Delete the user's todos among ``ids`` in one statement and return the
+        IDs that were actually deleted.
+        """
+
+        stmt = delete(ToDo).filter(ToDo.id.in_(ids), ToDo.created_by == user_id)
+        if self.db.get_bind().dialect.delete_returning:
+            deleted = set(await self.db.scalars(stmt.returning(ToDo.id)))
+        else:
+            deleted = set(
+                await self.db.scalars(select(ToDo.id).filter(stmt.whereclause))
+            )
+            await self.db.execute(stmt)
+        await self.db.commit()
+        await response_cache.invalidate(todos_namespace(user_id))
+        return deleted
+
+    @read_only
+    async def get_todos_by_created_user(self, _created_by: UUID4) -> list[TodoOutput]:
+        """
+        Retrieve a list of todos created by a specific user.
+        """
+
+        return (
+            await self.db.scalars(select(ToDo).filter_by(created_by=_created_by))
+        ).all()
+
+    @read_only
+    async def get_todos_page_by_created_user(
+        self,
+        _created_by: UUID4,
+        params: TodoListParams,
+        after: tuple | None,
+        limit: int | None,
+    ) -> list[TodoOutput]:
+        """
+        Retrieve one filtered, sorted keyset page of a user's todos, or all
+        of them without a ``limit``.
+        """
+
+        return (
+            await self.db.scalars(todos_page_query(_created_by, params, after, limit))
+        ).all()
+
+    @read_only
+    async def get_todos(self) -> list[TodoOutput]:
+        """
+        Retrieve all todo items from the database.
+        """
+
+        return (await self.db.scalars(select(ToDo))).all()
+
+    async def get_single_todo(self, _id: int) -> TodoOutput:
+        """
+        Retrieve a single todo item by its ID.
+        """
+
+        return await self.db.scalar(select(ToDo).filter_by(id=_id))
+
+    async def get_todo_by_id_user(self, user_id: UUID4, _id: int) -> TodoOutput | None:
+        """
+        Retrieve a todo item by ID only if it belongs to the given user.
+        """
+
+        return await self.db.scalar(
+            select(ToDo).filter(ToDo.id == _id, ToDo.created_by == user_id)
+        )
+
+    async def exists_todo_by_id_user(self, user_id: UUID4, _id: int) -> bool:
+        """
+        Checks if a ToDo item exists for a given user ID and ToDo ID.
+        """
+
+        return (
+            await self.db.scalar(
+                select(ToDo.id).filter(ToDo.id == _id, ToDo.created_by == user_id)
+            )
+            is not None
+        )
+
+    async def delete_todo_by_id_user(self, user_id: UUID4, _id: int) -> bool:
+        """
+        Deletes a ToDo item owned by the given user, returning whether it existed.
+        """
+
+        result = await self.db.execute(
+            delete(ToDo).filter(ToDo.id == _id, ToDo.created_by == user_id)
+        )
+        await self.db.commit()
+        await response_cache.invalidate(todos_namespace(user_id))
+        return result.rowcount > 0
+
+    async def update_todo_by_id_user(
+        self, user_id: UUID4, _id: int, data: TodoUpdate
+    ) -> TodoOutput | None:
+        """
+        Update a todo item owned by the given user and return it, or None when
+        it does not exist. Uses a single UPDATE ... RETURNING where supported.
+        """
+
+        values = data.model_dump(exclude_unset=True)
+        if not values:
+            return await self.get_todo_by_id_user(user_id, _id)
+
+        stmt = (
+            update(ToDo)
+            .filter(ToDo.id == _id, ToDo.created_by == user_id)
+            .values(**values)
+        )
+        if self.db.get_bind().dialect.update_returning:
+            todo = (await self.db.scalars(stmt.returning(ToDo))).first()
+        elif (await self.db.execute(stmt)).rowcount:
+            todo = await self.get_todo_by_id_user(user_id, _id)
+        else:
+            todo = None
+        await self.db.commit()
+        await response_cache.invalidate(todos_namespace(user_id))
+        return todo
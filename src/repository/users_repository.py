@@ -1,12 +1,41 @@
-from typing import Annotated, Generator, List
+import uuid
+from typing import Annotated, AsyncGenerator, Generator, List
 
 from pydantic import UUID4
-from sqlalchemy import select
+from sqlalchemy import (
+    Row,
+    delete,
+    func,
+    insert,
+    or_,
+    select,
+    text,
+    tuple_,
+    update,
+)
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
+from ..config.routing import read_only
 from ..models.user_model import User
 from ..schemas.user_schema import UpdateUser, UserDetailedOutput, UserInput, UserOutput
-from ..utils.password_helper import get_password_hash
+from ..utils.cache import USERS_NAMESPACE, response_cache, todos_namespace
+from ..utils.user_cache import user_cache
+
+# Planner estimate of the users row count, -1 until the table is analyzed
+USERS_ROW_ESTIMATE = text(
+    "SELECT reltuples::bigint FROM pg_class WHERE oid = 'users'::regclass"
+)
+
+# Public columns of GET /users/stream, in output order
+USER_EXPORT_QUERY = select(
+    User.username,
+    User.email,
+    User.bio,
+    User.full_name.label("full_name"),
+    User.last_login,
+)
+USER_EXPORT_COLUMNS = tuple(column.key for column in USER_EXPORT_QUERY.selected_columns)
 
 
 class UserRepository:
@@ -18,18 +47,19 @@ class UserRepository:
     def __init__(self, db: Session):
         self.db = db
 
-    def create(self, data: UserInput) -> UserDetailedOutput:
+    def create(self, data: UserInput, hash_password: str) -> UserDetailedOutput:
         """Creates a new user in the database and returns the detailed user output."""
 
         user = User(
             **data.model_dump(exclude={"password", "confirm_password"}),
-            hash_password=get_password_hash(data.password),
+            hash_password=hash_password,
         )
         self.db.add(user)
         self.db.commit()
-        self.db.refresh(user)
+        response_cache.invalidate_sync(USERS_NAMESPACE)
         return user
 
+    @read_only
     def get_all_users_admin(self) -> list[UserDetailedOutput]:
         """
         Retrieves a list of all users with detailed information for admin purposes.
@@ -37,6 +67,7 @@ class UserRepository:
 
         return self.db.query(User).all()
 
+    @read_only
     def get_all_users(self) -> list[UserOutput]:
         """
         Retrieve a list of all users with their details.
@@ -48,24 +79,80 @@ class UserRepository:
             User.username, User.email, User.bio, User.full_name, User.last_login
         ).all()
 
+    @read_only
     def get_total_user_count(self) -> int:
-        return self.db.query(User).count()
+        return self.db.query(func.count(User.id)).scalar()
+
+    @read_only
+    def get_approximate_user_count(self) -> int:
+        """
+        Estimate the user count from planner statistics on PostgreSQL, falling
+        back to an exact count on other backends or before the first ANALYZE.
+        """
+
+        if self.db.get_bind().dialect.name == "postgresql":
+            estimate = self.db.execute(USERS_ROW_ESTIMATE).scalar()
+            if estimate is not None and estimate >= 0:
+                return estimate
+        return self.get_total_user_count()
 
+    @read_only
     def get_users_paginated_admin(
         self, skip: int, limit: int
     ) -> list[UserDetailedOutput]:
-        return self.db.query(User).offset(skip).limit(limit).all()
+        return (
+            self.db.query(User)
+            .order_by(User.created_at, User.id)
+            .offset(skip)
+            .limit(limit)
+            .all()
+        )
 
+    @read_only
     def get_users_paginated(self, skip: int, limit: int) -> list[UserOutput]:
         return (
             self.db.query(
                 User.username, User.email, User.bio, User.full_name, User.last_login
             )
+            .order_by(User.created_at, User.id)
             .offset(skip)
             .limit(limit)
             .all()
         )
 
+    @read_only
+    def get_users_after_admin(
+        self, after: tuple | None, limit: int
+    ) -> list[UserDetailedOutput]:
+        """
+        Retrieve the users following the (created_at, id) keyset ``after``.
+        """
+
+        query = self.db.query(User).order_by(User.created_at, User.id)
+        if after is not None:
+            query = query.filter(tuple_(User.created_at, User.id) > after)
+        return query.limit(limit).all()
+
+    @read_only
+    def get_users_after(self, after: tuple | None, limit: int) -> list[UserOutput]:
+        """
+        Retrieve the users following the (created_at, id) keyset ``after``,
+        with the keyset columns included for building the next cursor.
+        """
+
+        query = self.db.query(
+            User.username,
+            User.email,
+            User.bio,
+            User.full_name,
+            User.last_login,
+            User.created_at,
+            User.id,
+        ).order_by(User.created_at, User.id)
+        if after is not None:
+            query = query.filter(tuple_(User.created_at, User.id) > after)
+        return query.limit(limit).all()
+
     def get_user(self, _id: UUID4) -> UserDetailedOutput | None:
         """
         Retrieve a user by their unique ID.
@@ -73,22 +160,22 @@ class UserRepository:
 
         return self.db.query(User).filter_by(id=_id).first()
 
-    def stream_all_users(self) -> Generator[UserOutput, None, None]:
-        query = self.db.query(
-            User.username, User.email, User.bio, User.full_name, User.last_login
-        ).yield_per(
-            1000
-        )  # Stream in batches of 100
-
-        for row in query:
-            yield UserOutput(
-                username=row.username,
-                email=row.email,
-                bio=row.bio,
-                full_name=row.full_name,
-                last_login=row.last_login,
+    @read_only
+    def stream_user_rows(self, batch_size: int) -> Generator[list[Row], None, None]:
+        """
+        Yield the public user columns in batches of plain rows, read through a
+        server-side cursor where the driver supports one.
+        """
+
+        result = self.db.execute(
+            USER_EXPORT_QUERY.execution_options(
+                stream_results=True, yield_per=batch_size
             )
+        )
+        for partition in result.partitions():
+            yield partition
 
+    @read_only
     def get_user_by_username(self, _username: str) -> UserOutput | None:
         """
         Retrieve a user's details by their username.
@@ -124,6 +211,50 @@ class UserRepository:
             .first()
         )
 
+    def end_read(self) -> None:
+        """
+        End the current read transaction, returning its connection to the
+        pool before passwords are hashed.
+        """
+
+        self.db.commit()
+
+    def get_taken_usernames_and_emails(
+        self, usernames: list[str], emails: list[str]
+    ) -> tuple[set[str], set[str]]:
+        """
+        Return which of the given usernames and emails are already registered,
+        using a single query.
+        """
+
+        rows = self.db.execute(
+            select(User.username, User.email).filter(
+                or_(User.username.in_(usernames), User.email.in_(emails))
+            )
+        ).all()
+        return {row.username for row in rows}, {row.email for row in rows}
+
+    def create_many(
+        self, users: list[UserInput], hashes: list[str]
+    ) -> list[uuid.UUID]:
+        """
+        Insert several users, with their password hashes, in one batched
+        INSERT. Returns the new IDs in input order.
+        """
+
+        rows = [
+            dict(
+                user.model_dump(exclude={"password", "confirm_password"}),
+                id=uuid.uuid4(),
+                hash_password=password_hash,
+            )
+            for user, password_hash in zip(users, hashes)
+        ]
+        self.db.execute(insert(User), rows)
+        self.db.commit()
+        response_cache.invalidate_sync(USERS_NAMESPACE)
+        return [row["id"] for row in rows]
+
     def user_exists_by_username(self, username: str) -> bool:
         """
         Checks if a user with the given username exists in the database.
@@ -140,23 +271,309 @@ class UserRepository:
 
     def delete_user(self, _id: UUID4) -> bool:
         """
-        Deletes a user from the database by their unique ID.
+        Deletes a user from the database by their unique ID, returning whether
+        the user existed.
         """
 
-        user = self.db.query(User).filter_by(id=_id).first()
-        self.db.delete(user)
+        stmt = delete(User).filter_by(id=_id)
+        if self.db.get_bind().dialect.delete_returning:
+            username = self.db.scalar(stmt.returning(User.username))
+        else:
+            username = self.db.scalar(select(User.username).filter_by(id=_id))
+            self.db.execute(stmt)
         self.db.commit()
+        if username is None:
+            return False
+        user_cache.invalidate_sync(username)
+        response_cache.invalidate_sync(USERS_NAMESPACE, todos_namespace(_id))
         return True
 
     def update_user(self, _username: str, data: UpdateUser) -> UserDetailedOutput:
         """Update an existing user's details in the database."""
 
-        user_query = self.db.query(User).filter_by(username=_username)
-        user = user_query.first()
-
         update_data = data.model_dump(exclude_unset=True)
-        user_query.update(update_data)
+        if not update_data:
+            return self.get_user_all_detail_by_username(_username)
+
+        stmt = update(User).filter_by(username=_username).values(**update_data)
+        if self.db.get_bind().dialect.update_returning:
+            user = self.db.scalars(stmt.returning(User)).first()
+        else:
+            self.db.execute(stmt)
+            user = self.get_user_all_detail_by_username(_username)
         self.db.commit()
+        user_cache.invalidate_sync(_username)
+        response_cache.invalidate_sync(USERS_NAMESPACE)
+        return user
+
+
+class AsyncUserRepository:
+    """
+    Asyncio counterpart of UserRepository, backed by an AsyncSession.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def create(self, data: UserInput, hash_password: str) -> UserDetailedOutput:
+        """Creates a new user in the database and returns the detailed user output."""
+
+        user = User(
+            **data.model_dump(exclude={"password", "confirm_password"}),
+            hash_password=hash_password,
+        )
+        self.db.add(user)
+        await self.db.commit()
+        await response_cache.invalidate(USERS_NAMESPACE)
+        return user
+
+    @read_only
+    async def get_all_users_admin(self) -> list[UserDetailedOutput]:
+        """
+        Retrieves a list of all users with detailed information for admin purposes.
+        """
+
+        return (await self.db.scalars(select(User))).all()
+
+    @read_only
+    async def get_all_users(self) -> list[UserOutput]:
+        """
+        Retrieve a list of all users with their details.
+        """
+
+        result = await self.db.execute(
+            select(User.username, User.email, User.bio, User.full_name, User.last_login)
+        )
+        return result.all()
+
+    @read_only
+    async def get_total_user_count(self) -> int:
+        return await self.db.scalar(select(func.count(User.id)))
+
+    @read_only
+    async def get_approximate_user_count(self) -> int:
+        """
+        Estimate the user count from planner statistics on PostgreSQL, falling
+        back to an exact count on other backends or before the first ANALYZE.
+        """
+
+        if self.db.get_bind().dialect.name == "postgresql":
+            estimate = await self.db.scalar(USERS_ROW_ESTIMATE)
+            if estimate is not None and estimate >= 0:
+                return estimate
+        return await self.get_total_user_count()
+
+    @read_only
+    async def get_users_paginated_admin(
+        self, skip: int, limit: int
+    ) -> list[UserDetailedOutput]:
+        return (
+            await self.db.scalars(
+                select(User)
+                .order_by(User.created_at, User.id)
+                .offset(skip)
+                .limit(limit)
+            )
+        ).all()
+
+    @read_only
+    async def get_users_paginated(self, skip: int, limit: int) -> list[UserOutput]:
+        result = await self.db.execute(
+            select(User.username, User.email, User.bio, User.full_name, User.last_login)
+            .order_by(User.created_at, User.id)
+            .offset(skip)
+            .limit(limit)
+        )
+        return result.all()
+
+    @read_only
+    async def get_users_after_admin(
+        self, after: tuple | None, limit: int
+    ) -> list[UserDetailedOutput]:
+        """
+        Retrieve the users following the (created_at, id) keyset ``after``.
+        """
+
+        stmt = select(User).order_by(User.created_at, User.id)
+        if after is not None:
+            stmt = stmt.filter(tuple_(User.created_at, User.id) > after)
+        return (await self.db.scalars(stmt.limit(limit))).all()
 
-        self.db.refresh(user)
+    @read_only
+    async def get_users_after(
+        self, after: tuple | None, limit: int
+    ) -> list[UserOutput]:
+        """
+        Retrieve the users following the (created_at, id) keyset ``after``,
+        with the keyset columns included for building the next cursor.
+        """
+
+        stmt = select(
+            User.username,
+            User.email,
+            User.bio,
+            User.full_name,
+            User.last_login,
+            User.created_at,
+            User.id,
+        ).order_by(User.created_at, User.id)
+        if after is not None:
+            stmt = stmt.filter(tuple_(User.created_at, User.id) > after)
+        return (await self.db.execute(stmt.limit(limit))).all()
+
+    async def get_user(self, _id: UUID4) -> UserDetailedOutput | None:
+        """
+        Retrieve a user by their unique ID.
+        """
+
+        return await self.db.get(User, _id)
+
+    @read_only
+    async def stream_user_rows(
+        self, batch_size: int
+    ) -> AsyncGenerator[list[Row], None]:
+        """
+        Yield the public user columns in batches of plain rows, read through a
+        server-side cursor where the driver supports one.
+        """
+
+        result = await self.db.stream(
+            USER_EXPORT_QUERY.execution_options(yield_per=batch_size)
+        )
+        async for partition in result.partitions():
+            yield partition
+
+    @read_only
+    async def get_user_by_username(self, _username: str) -> UserOutput | None:
+        """
+        Retrieve a user's details by their username.
+        """
+
+        result = await self.db.execute(
+            select(
+                User.username, User.email, User.bio, User.full_name, User.last_login
+            ).filter_by(username=_username)
+        )
+        return result.first()
+
+    async def get_user_all_detail_by_username(
+        self, _username: str
+    ) -> UserDetailedOutput | None:
+        """
+        Retrieve detailed information of a user by their username.
+        """
+
+        return await self.db.scalar(select(User).filter_by(username=_username))
+
+    async def get_user_by_username_or_email(
+        self, _username: str, _email: str
+    ) -> UserOutput | None:
+        """
+        Retrieve a user by matching username or email.
+        """
+
+        return await self.db.scalar(
+            select(User)
+            .filter((User.username == _username) | (User.email == _email))
+            .limit(1)
+        )
+
+    async def end_read(self) -> None:
+        """
+        End the current read transaction, returning its connection to the
+        pool before passwords are hashed.
+        """
+
+        await self.db.commit()
+
+    async def get_taken_usernames_and_emails(
+        self, usernames: list[str], emails: list[str]
+    ) -> tuple[set[str], set[str]]:
+        """
+        Return which of the given usernames and emails are already registered,
+        using a single query.
+        """
+
+        rows = (
+            await self.db.execute(
+                select(User.username, User.email).filter(
+                    or_(User.username.in_(usernames), User.email.in_(emails))
+                )
+            )
+        ).all()
+        return {row.username for row in rows}, {row.email for row in rows}
+
+    async def create_many(
+        self, users: list[UserInput], hashes: list[str]
+    ) -> list[uuid.UUID]:
+        """
+        Insert several users, with their password hashes, in one batched
+        INSERT. Returns the new IDs in input order.
+        """
+
+        rows = [
+            dict(
+                user.model_dump(exclude={"password", "confirm_password"}),
+                id=uuid.uuid4(),
+                hash_password=password_hash,
+            )
+            for user, password_hash in zip(users, hashes)
+        ]
+        await self.db.execute(insert(User), rows)
+        await self.db.commit()
+        await response_cache.invalidate(USERS_NAMESPACE)
+        return [row["id"] for row in rows]
+
+    async def user_exists_by_username(self, username: str) -> bool:
+        """
+        Checks if a user with the given username exists in the database.
+        """
+
+        return (
+            await self.db.scalar(select(User.id).filter_by(username=username))
+            is not None
+        )
+
+    async def user_exists_by_id(self, _id: UUID4) -> bool:
+        """
+        Check if a user exists in the database by their unique ID.
+        """
+
+        return await self.db.scalar(select(User.id).filter_by(id=_id)) is not None
+
+    async def delete_user(self, _id: UUID4) -> bool:
+        """
+        Deletes a user from the database by their unique ID, returning whether
+        the user existed.
+        """
+
+        stmt = delete(User).filter_by(id=_id)
+        if self.db.get_bind().dialect.delete_returning:
+            username = await self.db.scalar(stmt.returning(User.username))
+        else:
+            username = await self.db.scalar(select(User.username).filter_by(id=_id))
+            await self.db.execute(stmt)
+        await self.db.commit()
+        if username is None:
+            return False
+        await user_cache.invalidate(username)
+        await response_cache.invalidate(USERS_NAMESPACE, todos_namespace(_id))
+        return True
+
+    async def update_user(self, _username: str, data: UpdateUser) -> UserDetailedOutput:
+        """Update an existing user's details in the database."""
+
+        update_data = data.model_dump(exclude_unset=True)
+        if not update_data:
+            return await self.get_user_all_detail_by_username(_username)
+
+        stmt = update(User).filter_by(username=_username).values(**update_data)
+        if self.db.get_bind().dialect.update_returning:
+            user = (await self.db.scalars(stmt.returning(User))).first()
+        else:
+            await self.db.execute(stmt)
+            user = await self.get_user_all_detail_by_username(_username)
+        await self.db.commit()
+        await user_cache.invalidate(_username)
+        await response_cache.invalidate(USERS_NAMESPACE)
         return user
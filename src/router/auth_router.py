@@ -1,8 +1,8 @@
 from typing import Annotated
 
 from fastapi import APIRouter, Depends, Form, status
-from sqlalchemy.orm import Session
 
+from ..config.database import DBSession
 from ..dependencies import get_current_user_and_db, get_db
 from ..schemas.auth_schema import RefreshToken, Token
 from ..schemas.user_schema import UserLogin, UserOutput
@@ -10,9 +10,9 @@ from ..service.auth_services import AuthService
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 
-DB_Dependency = Annotated[Session, Depends(get_db)]
+DB_Dependency = Annotated[DBSession, Depends(get_db)]
 USER_DB_Dependency = Annotated[
-    tuple[UserOutput, Session], Depends(get_current_user_and_db)
+    tuple[UserOutput, DBSession], Depends(get_current_user_and_db)
 ]
 
 
@@ -32,9 +32,9 @@ USER_DB_Dependency = Annotated[
 - **401**: Invalid credentials.
 """,
 )
-def login_user(data: Annotated[UserLogin, Form()], db: DB_Dependency):
+async def login_user(data: Annotated[UserLogin, Form()], db: DB_Dependency):
     _service = AuthService(db)
-    return _service.login_for_token(data)
+    return await _service.login_for_token(data)
 
 
 @router.post(
@@ -49,8 +49,25 @@ def login_user(data: Annotated[UserLogin, Form()], db: DB_Dependency):
 
 ### Response Codes
 - **200**: New access token successfully generated.
+- **401**: Invalid or expired refresh token, or one that was already used.
+""",
+)
+async def refresh_access_token(token: RefreshToken):
+    return await AuthService.refresh_access_token(token.refresh_token)
+
+
+@router.post(
+    "/logout",
+    status_code=status.HTTP_204_NO_CONTENT,
+    summary="Revoke Refresh Token",
+    description="""
+    Revoke a refresh token, so that it can no longer be used to obtain access
+    tokens. Access tokens already issued stay valid until they expire.
+
+### Response Codes
+- **204**: Refresh token revoked.
 - **401**: Invalid or expired refresh token.
 """,
 )
-def refresh_access_token(token: RefreshToken):
-    return AuthService.refresh_access_token(token.refresh_token)
+async def logout(token: RefreshToken):
+    await AuthService.revoke_refresh_token(token.refresh_token)
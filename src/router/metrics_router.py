@@ -0,0 +1,30 @@
+import os
+
+from fastapi import APIRouter, Response
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    generate_latest,
+    multiprocess,
+)
+
+router = APIRouter(tags=["Monitoring"])
+
+
+def metrics_registry() -> CollectorRegistry:
+    """
+    The registry to expose: the process registry, or the metrics aggregated
+    from every worker when PROMETHEUS_MULTIPROC_DIR is set (gunicorn).
+    """
+    if "PROMETHEUS_MULTIPROC_DIR" not in os.environ:
+        return REGISTRY
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return registry
+
+
+@router.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Expose process metrics in the Prometheus text format."""
+    return Response(generate_latest(metrics_registry()), media_type=CONTENT_TYPE_LATEST)
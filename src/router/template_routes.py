@@ -2,13 +2,13 @@ from fastapi import APIRouter, Request
 from fastapi.responses import FileResponse, HTMLResponse
 
 from ..config.settings import settings
-from ..utils.template_engine import templates
+from ..utils.template_engine import StaticPage
 
 router = APIRouter(tags=["Templates"])
 
+index_page = StaticPage("index.html", PROJECT_DOMAIN=settings.PROJECT_DOMAIN)
+
 
 @router.get("/", response_class=HTMLResponse)
 async def welcome(request: Request):
-    return templates.TemplateResponse(
-        "index.html", {"request": request, "PROJECT_DOMAIN": settings.PROJECT_DOMAIN}
-    )
+    return index_page.response(request)
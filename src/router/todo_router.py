@@ -1,20 +1,94 @@
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Body, Depends, Request, status
 
+from ..config.database import DBSession
 from ..dependencies import get_current_user_and_db
-from ..schemas.toso_shcema import TodoInput, TodoOutput, TodoUpdate
+from ..schemas.pagination_schema import CursorPaginatedResponse
+from ..schemas.toso_shcema import (
+    TodoBulkCreate,
+    TodoBulkDelete,
+    TodoBulkResponse,
+    TodoBulkUpdate,
+    TodoInput,
+    TodoListParams,
+    TodoOutput,
+    TodoUpdate,
+)
 from ..schemas.user_schema import UserDetailedOutput
 from ..service.todo_services import TodoServices
+from ..utils.cache import response_cache, todos_namespace
+from ..utils.responses import ModelResponse
 
 USER_DB_Dependancy = Annotated[
-    tuple[UserDetailedOutput, Session], Depends(get_current_user_and_db)
+    tuple[UserDetailedOutput, DBSession], Depends(get_current_user_and_db)
 ]
 
 router = APIRouter(prefix="/todo", tags=["Todo"])
 
 
+# Registered ahead of the /{id} routes, which would otherwise match "bulk"
+@router.post(
+    "/bulk",
+    response_model=TodoBulkResponse,
+    status_code=status.HTTP_201_CREATED,
+    summary="Create TODOs in bulk",
+    description=(
+        "Create up to TODO_BULK_MAX_ITEMS TODO items for the authenticated user "
+        "in one transaction. The whole batch is validated before anything is written."
+    ),
+    response_description="One result per item, in request order.",
+)
+async def create_bulk(
+    data: TodoBulkCreate, user_db: USER_DB_Dependancy
+) -> ModelResponse:
+    user, db = user_db
+    _services = TodoServices(db)
+    return ModelResponse(
+        await _services.create_many(user.id, data),
+        TodoBulkResponse,
+        status_code=status.HTTP_201_CREATED,
+    )
+
+
+@router.patch(
+    "/bulk",
+    response_model=TodoBulkResponse,
+    status_code=status.HTTP_200_OK,
+    summary="Update TODOs in bulk",
+    description=(
+        "Apply partial updates to several TODO items of the authenticated user in "
+        "one transaction. Items that do not exist get a 404 result of their own."
+    ),
+    response_description="One result per item, in request order.",
+)
+async def update_bulk(
+    data: TodoBulkUpdate, user_db: USER_DB_Dependancy
+) -> ModelResponse:
+    user, db = user_db
+    _services = TodoServices(db)
+    return ModelResponse(await _services.update_many(user.id, data), TodoBulkResponse)
+
+
+@router.delete(
+    "/bulk",
+    response_model=TodoBulkResponse,
+    status_code=status.HTTP_200_OK,
+    summary="Delete TODOs in bulk",
+    description=(
+        "Delete several TODO items of the authenticated user with one statement. "
+        "Items that do not exist get a 404 result of their own."
+    ),
+    response_description="One result per item, in request order.",
+)
+async def delete_bulk(
+    data: Annotated[TodoBulkDelete, Body()], user_db: USER_DB_Dependancy
+) -> ModelResponse:
+    user, db = user_db
+    _services = TodoServices(db)
+    return ModelResponse(await _services.delete_many(user.id, data), TodoBulkResponse)
+
+
 @router.get(
     "/{id}",
     response_model=TodoOutput,
@@ -23,24 +97,36 @@ router = APIRouter(prefix="/todo", tags=["Todo"])
     description="Retrieve a specific TODO item by its ID for the authenticated user.",
     response_description="The requested TODO item.",
 )
-def get_single_todo(id: int, user_db: USER_DB_Dependancy) -> TodoOutput:
+async def get_single_todo(id: int, user_db: USER_DB_Dependancy) -> TodoOutput:
     user, db = user_db
     _services = TodoServices(db)
-    return _services.get_single_todo_by_user(user.id, id)
+    return await _services.get_single_todo_by_user(user.id, id)
 
 
 @router.get(
     "/",
-    response_model=list[TodoOutput],
+    response_model=list[TodoOutput] | CursorPaginatedResponse[TodoOutput],
     status_code=status.HTTP_200_OK,
-    summary="List all TODOs",
-    description="Fetch all TODO items created by the authenticated user.",
-    response_description="A list of TODO items.",
+    summary="List TODOs",
+    description=(
+        "Fetch the TODO items created by the authenticated user, filtered by status, "
+        "due date range and overdue state, and sorted. Returns every match as a "
+        "list, or with mode=cursor a page of `limit` items and a cursor."
+    ),
+    response_description="The TODO items, or a page of them in cursor mode.",
+)
+@response_cache(
+    namespace=lambda user: todos_namespace(user.id),
+    response_model=list[TodoOutput] | CursorPaginatedResponse[TodoOutput],
 )
-def list_of_todo(user_db: USER_DB_Dependancy) -> list[TodoOutput]:
+async def list_of_todo(
+    request: Request,
+    user_db: USER_DB_Dependancy,
+    params: TodoListParams = Depends(),
+) -> list[TodoOutput] | CursorPaginatedResponse[TodoOutput]:
     user, db = user_db
     _services = TodoServices(db)
-    return _services.get_list_of_todo_by_user(user.id)
+    return await _services.get_list_of_todo_by_user(request, user.id, params)
 
 
 @router.post(
@@ -51,10 +137,10 @@ def list_of_todo(user_db: USER_DB_Dependancy) -> list[TodoOutput]:
     description="Create a new TODO item for the authenticated user.",
     response_description="The created TODO item.",
 )
-def create(data: TodoInput, user_db: USER_DB_Dependancy) -> TodoOutput:
+async def create(data: TodoInput, user_db: USER_DB_Dependancy) -> TodoOutput:
     user, db = user_db
     _services = TodoServices(db)
-    return _services.create_todo_for__user(user.id, data)
+    return await _services.create_todo_for__user(user.id, data)
 
 
 @router.patch(
@@ -65,10 +151,10 @@ def create(data: TodoInput, user_db: USER_DB_Dependancy) -> TodoOutput:
     description="Update an existing TODO item by ID for the authenticated user.",
     response_description="The updated TODO item.",
 )
-def update_todo(id: int, data: TodoUpdate, user_db: USER_DB_Dependancy):
+async def update_todo(id: int, data: TodoUpdate, user_db: USER_DB_Dependancy):
     user, db = user_db
     _services = TodoServices(db)
-    return _services.update_todo(user.id, id, data)
+    return await _services.update_todo(user.id, id, data)
 
 
 @router.delete(
@@ -79,7 +165,7 @@ def update_todo(id: int, data: TodoUpdate, user_db: USER_DB_Dependancy):
     description="Delete a TODO item by its ID for the authenticated user.",
     response_description="No content returned after successful deletion.",
 )
-def delete_todo(id: int, user_db: USER_DB_Dependancy):
+async def delete_todo(id: int, user_db: USER_DB_Dependancy):
     user, db = user_db
     _services = TodoServices(db)
-    return _services.delete_todo(user.id, id)
+    return await _services.delete_todo(user.id, id)
@@ -1,30 +1,47 @@
-import json
 from typing import Annotated
 
-from fastapi import APIRouter, BackgroundTasks, Body, Depends, Query, Request, status
+from fastapi import (
+    APIRouter,
+    BackgroundTasks,
+    Body,
+    Depends,
+    Query,
+    Request,
+    UploadFile,
+    status,
+)
 from fastapi.responses import JSONResponse, StreamingResponse
-from fastapi_cache.decorator import cache
 from pydantic import UUID4
-from sqlalchemy.orm import Session
 
+from ..config.database import DBSession, close_session
 from ..dependencies import get_admin_user_and_db, get_current_user_and_db, get_db
 from ..schemas.auth_schema import Token
 from ..schemas.pagination_schema import PaginatedResponse, PaginationParams
-from ..schemas.user_schema import UpdateUser, UserDetailedOutput, UserInput, UserOutput
+from ..schemas.user_schema import (
+    UpdateUser,
+    UserBulkImport,
+    UserDetailedOutput,
+    UserImportResponse,
+    UserInput,
+    UserOutput,
+)
 from ..service.users_services import UserService
-from ..utils.cache import url_key_builder, user_aware_key_builder
+from ..utils.cache import USERS_NAMESPACE, response_cache
+from ..utils.export import EXPORT_MEDIA_TYPES, negotiate_export_format
 from ..utils.rate_limiter import limiter
+from ..utils.responses import ModelResponse
+from ..utils.user_import import read_user_rows, validate_user_rows
 
 router = APIRouter(prefix="/users", tags=["Users"])
 
-DB_Depndancy = Annotated[Session, Depends(get_db)]
+DB_Depndancy = Annotated[DBSession, Depends(get_db)]
 
 USER_DB_Dependancy = Annotated[
-    tuple[UserDetailedOutput, Session], Depends(get_current_user_and_db)
+    tuple[UserDetailedOutput, DBSession], Depends(get_current_user_and_db)
 ]
 
 ADMIN_USER_DB_Dependancy = Annotated[
-    tuple[UserDetailedOutput, Session], Depends(get_admin_user_and_db)
+    tuple[UserDetailedOutput, DBSession], Depends(get_admin_user_and_db)
 ]
 
 
@@ -39,7 +56,7 @@ PAGINATION_QUERY_PARAM = Annotated[PaginationParams, Query()]
     description="Creates a new user account with the provided user input.",
     response_description="Details of the newly created user.",
 )
-def create_user(
+async def create_user(
     data: Annotated[
         UserInput,
         Body(
@@ -51,7 +68,63 @@ def create_user(
     backgroundtask: BackgroundTasks,
 ):
     _service = UserService(db, backgroundtask)
-    return _service.create(data)
+    return await _service.create(data)
+
+
+@router.post(
+    "/import",
+    status_code=status.HTTP_201_CREATED,
+    response_model=UserImportResponse,
+    summary="Import users in bulk",
+    description=(
+        "Create many users at once. Only accessible to admins. Usernames and "
+        "emails are checked with one query per batch, passwords are hashed in "
+        "parallel and rows that already exist are reported without failing "
+        "the import."
+    ),
+    response_description="One result per user, in request order.",
+)
+async def import_users(
+    data: UserBulkImport,
+    user_db: ADMIN_USER_DB_Dependancy,
+    backgroundtask: BackgroundTasks,
+):
+    _, db = user_db
+    _service = UserService(db, backgroundtask)
+    return ModelResponse(
+        await _service.import_users(data.users),
+        UserImportResponse,
+        status_code=status.HTTP_201_CREATED,
+    )
+
+
+@router.post(
+    "/import/file",
+    status_code=status.HTTP_201_CREATED,
+    response_model=UserImportResponse,
+    summary="Import users from a file",
+    description=(
+        "Same as POST /users/import, reading the users from an uploaded CSV "
+        "(username, email, password, first_name, last_name, bio, role columns) "
+        "or JSON file. Only accessible to admins."
+    ),
+    response_description="One result per row, in file order.",
+)
+async def import_users_file(
+    file: UploadFile,
+    user_db: ADMIN_USER_DB_Dependancy,
+    backgroundtask: BackgroundTasks,
+):
+    _, db = user_db
+    users = validate_user_rows(
+        read_user_rows(await file.read(), file.filename, file.content_type)
+    )
+    _service = UserService(db, backgroundtask)
+    return ModelResponse(
+        await _service.import_users(users),
+        UserImportResponse,
+        status_code=status.HTTP_201_CREATED,
+    )
 
 
 @router.get(
@@ -62,8 +135,11 @@ def create_user(
     description="Fetch a paginated list of all users. Accessible based on user role.",
     response_description="A paginated list of users.",
 )
-# @cache(expire=60 , namespace="user-list" , key_builder= url_key_builder)
 @limiter.limit("20/minute")
+@response_cache(
+    namespace=USERS_NAMESPACE,
+    response_model=PaginatedResponse[UserOutput | UserDetailedOutput],
+)
 async def get_paginated_users(
     # user_db: USER_DB_Dependancy,
     db: DB_Depndancy,
@@ -72,11 +148,14 @@ async def get_paginated_users(
 ):
     # user, db = user_db
     _service = UserService(db)
-    return _service.get_all_by_page(
+    return await _service.get_all_by_page(
         request=request,
         user_role="user",
         page=pagination.page,
         limit=pagination.limit,
+        mode=pagination.mode,
+        cursor=pagination.cursor,
+        count=pagination.count,
     )
 
 
@@ -89,33 +168,40 @@ async def get_paginated_users(
     response_description="A list of users.",
     deprecated=True,
 )
-def get_users(user_db: USER_DB_Dependancy):
+async def get_users(user_db: USER_DB_Dependancy):
     user, db = user_db
     _service = UserService(db)
-    return _service.get_all(user.role)
+    return ModelResponse(
+        await _service.get_all(user.role), list[UserOutput | UserDetailedOutput]
+    )
 
 
 @router.get(
     "/stream",
     status_code=status.HTTP_200_OK,
     summary="Stream all users",
-    description="Efficiently stream all users in a JSON array.",
-    response_description="A JSON array of users.",
+    description=(
+        "Efficiently stream all users. The format follows the Accept header: "
+        "a JSON array by default, `application/x-ndjson` for one JSON object "
+        "per line or `text/csv`."
+    ),
+    response_description="All users in the negotiated format.",
 )
-def get_users(db: DB_Depndancy):
+async def get_users(db: DB_Depndancy, request: Request):
+    export_format = negotiate_export_format(request.headers.get("accept"))
     service = UserService(db)
 
-    def user_generator():
-        yield "["
-        first = True
-        for user_obj in service.get_all_stream():
-            if not first:
-                yield ","
-            yield json.dumps(user_obj.dict())
-            first = False
-        yield "]"
+    async def user_generator():
+        try:
+            async for chunk in service.export_all(export_format):
+                yield chunk
+        finally:
+            # get_db has already exited by the time the body is streamed
+            await close_session(db)
 
-    return StreamingResponse(user_generator(), media_type="application/json")
+    return StreamingResponse(
+        user_generator(), media_type=EXPORT_MEDIA_TYPES[export_format]
+    )
 
 
 @router.patch(
@@ -126,10 +212,10 @@ def get_users(db: DB_Depndancy):
     description="Update the profile details of the currently authenticated user.",
     response_description="Updated user profile information.",
 )
-def update_user(data: UpdateUser, user_db: USER_DB_Dependancy):
+async def update_user(data: UpdateUser, user_db: USER_DB_Dependancy):
     user, db = user_db
     _service = UserService(db)
-    return _service.update_user(user.username, data=data)
+    return await _service.update_user(user.username, data=data)
 
 
 @router.get(
@@ -140,11 +226,10 @@ def update_user(data: UpdateUser, user_db: USER_DB_Dependancy):
     description="Retrieve the profile information of the currently authenticated user.",
     response_description="Detailed user profile.",
 )
-def get_profile_details(user_db: USER_DB_Dependancy):
+async def get_profile_details(user_db: USER_DB_Dependancy):
     user, db = user_db
     _service = UserService(db)
-    print(user.id)
-    return _service.get(user.id)
+    return await _service.get(user.id)
 
 
 @router.get(
@@ -155,10 +240,15 @@ def get_profile_details(user_db: USER_DB_Dependancy):
     description="Fetch a user's profile by their username. Access depends on requester’s role.",
     response_description="User profile matching the given username.",
 )
-def get_user_username(username: str, user_db: USER_DB_Dependancy):
+@response_cache(
+    namespace=USERS_NAMESPACE, response_model=UserDetailedOutput | UserOutput
+)
+async def get_user_username(
+    username: str, request: Request, user_db: USER_DB_Dependancy
+):
     user, db = user_db
     _service = UserService(db)
-    return _service.get_by_username(user.role, username)
+    return await _service.get_by_username(user.role, username)
 
 
 @router.get(
@@ -170,10 +260,10 @@ def get_user_username(username: str, user_db: USER_DB_Dependancy):
     response_description="User details for the given ID.",
     deprecated=True,
 )
-def get_user_by_id(id: UUID4, user_db: USER_DB_Dependancy):
+async def get_user_by_id(id: UUID4, user_db: USER_DB_Dependancy):
     _, db = user_db
     _service = UserService(db)
-    return _service.get(id)
+    return await _service.get(id)
 
 
 @router.delete(
@@ -184,7 +274,7 @@ def get_user_by_id(id: UUID4, user_db: USER_DB_Dependancy):
     description="Deletes a user by ID. Only accessible to admins.",
     response_description="No content returned after successful deletion.",
 )
-def delete_user(id: UUID4, user_db: ADMIN_USER_DB_Dependancy):
+async def delete_user(id: UUID4, user_db: ADMIN_USER_DB_Dependancy):
     _, db = user_db
     _service = UserService(db)
-    return _service.delete_user(id)
+    return await _service.delete_user(id)
@@ -2,19 +2,30 @@ from typing import Generic, TypeVar
 
 from pydantic import BaseModel, Field
 
+from ..config.constant import CountMode, PaginationMode
+
 DataT = TypeVar("DataT")
 
 
 class PaginatedResponse[DataT](BaseModel):
-    total: int  # Total number of items
-    total_pages: int  # Total number of pages
-    page: int  # Current page number
+    total: int | None  # Total number of items, None when not counted
+    total_pages: int | None  # Total number of pages, None when not counted
+    page: int | None  # Current page number, None in cursor mode
     size: int  # Items per page
     data: list[DataT]  # Actual items for this page
     has_next: bool  # Indicates if there is a next page
     has_previous: bool  # Indicates if there is a previous page
     next_page_url: str | None = None  # URL of the next page or None
     previous_page_url: str | None = None  # URL of the previous page or None
+    next_cursor: str | None = None  # Cursor of the next page in cursor mode
+
+
+class CursorPaginatedResponse[DataT](BaseModel):
+    size: int  # Items per page
+    data: list[DataT]  # Actual items for this page
+    has_next: bool  # Indicates if there is a next page
+    next_cursor: str | None = None  # Cursor of the next page or None
+    next_page_url: str | None = None  # URL of the next page or None
 
 
 class PaginationParams(BaseModel):
@@ -22,3 +33,14 @@ class PaginationParams(BaseModel):
     limit: int = Field(
         10, ge=1, le=100, description="Number of items per page, max 100"
     )
+    mode: PaginationMode = Field(
+        PaginationMode.offset,
+        description="'cursor' pages by keyset using next_cursor instead of page",
+    )
+    cursor: str | None = Field(
+        None, description="Opaque next_cursor of the previous page (cursor mode)"
+    )
+    count: CountMode = Field(
+        CountMode.exact,
+        description="How total is computed: 'exact', 'approximate' or 'none'",
+    )
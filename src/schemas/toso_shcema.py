@@ -1,9 +1,10 @@
 from datetime import date, datetime
 from uuid import UUID
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
 
-from ..config.constant import ToDoStatus  # Assuming this is your Enum
+from ..config.constant import SortOrder, TodoListMode, TodoSortField, ToDoStatus
+from ..config.settings import settings
 
 
 class Todo(BaseModel):
@@ -62,7 +63,7 @@ class TodoOutput(Todo):
     id: int
     title: str
     description: str
-    due_date: date
+    due_date: date | None
     status: ToDoStatus
 
     is_overdue: bool = Field(
@@ -102,3 +103,107 @@ class TodoUpdate(Todo):
         description="Updated task status (optional).",
         example="inprogress",
     )
+
+
+class TodoListParams(BaseModel):
+    """Query parameters for listing, filtering and sorting todo items."""
+
+    mode: TodoListMode = Field(
+        TodoListMode.all,
+        description="all: every matching todo as a list; cursor: keyset pages.",
+    )
+    limit: int = Field(
+        10, ge=1, le=100, description="Number of items per page in cursor mode, max 100"
+    )
+    cursor: str | None = Field(
+        None, description="Opaque next_cursor of the previous page, cursor mode only."
+    )
+    status: ToDoStatus | None = Field(None, description="Only todos in this status.")
+    due_after: date | None = Field(
+        None, description="Only todos due on or after this date."
+    )
+    due_before: date | None = Field(
+        None, description="Only todos due on or before this date."
+    )
+    is_overdue: bool | None = Field(
+        None, description="Only overdue (true) or not overdue (false) todos."
+    )
+    sort_by: TodoSortField = Field(
+        TodoSortField.created_at,
+        description="Sort field; todos without a due date sort last (first when desc).",
+    )
+    order: SortOrder = Field(SortOrder.asc, description="Sort direction.")
+
+
+def _reject_duplicate_ids(ids: list[int]) -> None:
+    if len(set(ids)) != len(ids):
+        raise ValueError("Each todo id may only appear once per request.")
+
+
+class TodoBulkCreate(Todo):
+    """Payload for creating several todo items at once."""
+
+    items: list[TodoInput] = Field(
+        ...,
+        min_length=1,
+        max_length=settings.TODO_BULK_MAX_ITEMS,
+        description="Todo items to create, in order.",
+    )
+
+
+class TodoBulkUpdateItem(TodoUpdate):
+    """A partial update of one todo item, addressed by ID."""
+
+    id: int = Field(..., title="ID", description="ID of the todo to update.")
+
+
+class TodoBulkUpdate(Todo):
+    """Payload for updating several todo items at once."""
+
+    items: list[TodoBulkUpdateItem] = Field(
+        ...,
+        min_length=1,
+        max_length=settings.TODO_BULK_MAX_ITEMS,
+        description="Partial updates, each addressed by todo ID.",
+    )
+
+    @model_validator(mode="after")
+    def check_unique_ids(self):
+        _reject_duplicate_ids([item.id for item in self.items])
+        return self
+
+
+class TodoBulkDelete(Todo):
+    """Payload for deleting several todo items at once."""
+
+    ids: list[int] = Field(
+        ...,
+        min_length=1,
+        max_length=settings.TODO_BULK_MAX_ITEMS,
+        description="IDs of the todos to delete.",
+    )
+
+    @model_validator(mode="after")
+    def check_unique_ids(self):
+        _reject_duplicate_ids(self.ids)
+        return self
+
+
+class TodoBulkItemResult(Todo):
+    """Outcome of one item of a bulk request."""
+
+    index: int = Field(..., description="Position of the item in the request.")
+    id: int | None = Field(None, description="ID of the affected todo.")
+    status_code: int = Field(..., description="HTTP status of this item alone.")
+    detail: str | None = Field(None, description="Error message for failed items.")
+    todo: TodoOutput | None = Field(
+        None, description="The created or updated todo, when there is one."
+    )
+
+
+class TodoBulkResponse(Todo):
+    """Per-item results of a bulk request."""
+
+    succeeded: int
+    failed: int
+    results: list[TodoBulkItemResult]
@@ -4,6 +4,7 @@ from uuid import UUID
 from pydantic import BaseModel, EmailStr, Field, field_validator, model_validator
 
 from ..config.constant import UserRole
+from ..config.settings import settings
 from ..utils.password_helper import validate_password
 
 
@@ -131,11 +132,14 @@ class UserOutput(User):
         description="Username of the user.",
         example="johndoe_123",
     )
-    email: EmailStr = Field(
+    # Validated as EmailStr on the way in; checking it again for every row
+    # of a listing is most of the response validation cost
+    email: str = Field(
         ...,
         title="Email Address",
         description="Email address of the user.",
         example="johndoe@example.com",
+        json_schema_extra={"format": "email"},
     )
     full_name: str | None = Field(
         None,
@@ -195,3 +199,32 @@ class UpdateUser(User):
         description="Updated bio (optional).",
         example="Full-stack developer based in NY.",
     )
+
+
+class UserBulkImport(User):
+    """Payload for importing many users at once."""
+
+    users: list[UserInput] = Field(
+        ...,
+        min_length=1,
+        max_length=settings.USER_IMPORT_MAX_ROWS,
+        description="Users to create, in order.",
+    )
+
+
+class UserImportResult(User):
+    """Outcome of one row of a user import."""
+
+    index: int = Field(..., description="Position of the row in the import.")
+    username: str
+    id: UUID | None = Field(None, description="ID of the created user.")
+    status_code: int = Field(..., description="HTTP status of this row alone.")
+    detail: str | None = Field(None, description="Error message for failed rows.")
+
+
+class UserImportResponse(User):
+    """Per-row results of a user import."""
+
+    created: int
+    failed: int
+    results: list[UserImportResult]
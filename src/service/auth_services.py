@@ -1,10 +1,28 @@
 from fastapi import HTTPException, status
-from sqlalchemy.orm import Session
 
-from ..repository.auth_repository import AuthRepository
-from ..schemas.auth_schema import RefreshToken, Token
+from ..config.database import DBSession
+from ..repository.auth_repository import AsyncAuthRepository, AuthRepository
+from ..repository.base import build_repository
+from ..schemas.auth_schema import Token
 from ..schemas.user_schema import UserLogin as AuthInput
-from ..utils.auth import create_access_token, create_refresh_token, verify_token
+from ..utils.auth import (
+    REFRESH_TOKEN,
+    create_access_token,
+    create_refresh_token,
+    verify_token,
+)
+from ..utils.password_pool import password_pool
+from ..utils.token_store import refresh_tokens
+
+
+def _refresh_token_payload(token: str) -> dict:
+    """Verify a token and check that it is a refresh token with a jti."""
+    payload = verify_token(token=token)
+    if payload.get("type") != REFRESH_TOKEN or "jti" not in payload:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token"
+        )
+    return payload
 
 
 class AuthService:
@@ -12,39 +30,56 @@ class AuthService:
     AuthService class provides authentication-related services, including user login and token management.
     """
 
-    def __init__(self, db: Session):
-        self.repository = AuthRepository(db)
+    def __init__(self, db: DBSession):
+        self.repository = build_repository(db, AuthRepository, AsyncAuthRepository)
 
-    def login_for_token(self, data: AuthInput) -> Token:
+    async def login_for_token(self, data: AuthInput) -> Token:
         """Authenticate user and generate tokens."""
 
-        user = self.repository.authenticate_user(data)
-        if not user:
+        # bcrypt runs between two short transactions, never inside one
+        user = await self.repository.get_login_user(data.username)
+        if not user or not await password_pool.averify(
+            data.password, user.hash_password
+        ):
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Username or password is incorrect.",
             )
-        access_token = create_access_token(data={"sub": user.username})
-        refresh_token = create_refresh_token(data={"sub": user.username})
-
-        # Store the refresh token in the database
-        # self.repository.store_refresh_token(user, refresh_token)
+        await self.repository.record_login(user)
+        # The role claim picks the rate limit tier without a user lookup
+        claims = {"sub": user.username, "role": user.role}
+        access_token = create_access_token(data=claims)
+        refresh_token = create_refresh_token(data=claims)
 
         return Token(
             access_token=access_token, refresh_token=refresh_token, token_type="Bearer"
         )
 
     @staticmethod
-    def refresh_access_token(_token: RefreshToken) -> RefreshToken:
+    async def refresh_access_token(_token: str) -> Token:
         """
         Refreshes the access token and generates a new refresh token using the provided refresh token.
+        The refresh token is rotated: it is revoked here, so a second use is rejected.
         """
 
-        payload = verify_token(token=_token)
+        payload = _refresh_token_payload(_token)
+        if not await refresh_tokens.revoke(payload["jti"], payload["exp"]):
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Refresh token has already been used",
+            )
 
-        access_token = create_access_token(data=payload)
-        refresh_token = create_refresh_token(data=payload)
+        claims = {"sub": payload["sub"], "role": payload.get("role")}
+        access_token = create_access_token(data=claims)
+        refresh_token = create_refresh_token(data=claims)
 
         return Token(
             access_token=access_token, refresh_token=refresh_token, token_type="Bearer"
         )
+
+    @staticmethod
+    async def revoke_refresh_token(_token: str) -> None:
+        """Revoke a refresh token, on logout. Revoking it again is not an error."""
+
+        payload = _refresh_token_payload(_token)
+        await refresh_tokens.revoke(payload["jti"], payload["exp"])
@@ -1,49 +1,191 @@
-from fastapi import HTTPException, status
+from datetime import date, datetime
+
+from fastapi import HTTPException, Request, status
 from pydantic import UUID4
-from sqlalchemy.orm import Session
 
-from ..repository.todo_repository import TodoRepository
-from ..schemas.toso_shcema import TodoInput, TodoOutput, TodoUpdate
+from ..config.constant import SortOrder, TodoListMode, TodoSortField
+from ..config.database import DBSession
+from ..repository.base import build_repository
+from ..repository.todo_repository import AsyncTodoRepository, TodoRepository
+from ..schemas.pagination_schema import CursorPaginatedResponse
+from ..schemas.toso_shcema import (
+    TodoBulkCreate,
+    TodoBulkDelete,
+    TodoBulkItemResult,
+    TodoBulkResponse,
+    TodoBulkUpdate,
+    TodoInput,
+    TodoListParams,
+    TodoOutput,
+    TodoUpdate,
+)
+from ..utils.pagination import decode_cursor, encode_cursor
+
+TODO_NOT_FOUND = "Todo does not exists"
+
+SORT_VALUE_PARSERS = {
+    TodoSortField.created_at: datetime.fromisoformat,
+    TodoSortField.due_date: lambda value: value and date.fromisoformat(value),
+}
 
 
 class TodoServices:
     """Service layer for handling Todo-related business logic."""
 
-    def __init__(self, db: Session):
-        self.repository = TodoRepository(db)
+    def __init__(self, db: DBSession):
+        self.repository = build_repository(db, TodoRepository, AsyncTodoRepository)
 
-    def create_todo_for__user(self, _created_by: UUID4, data: TodoInput) -> TodoOutput:
+    async def create_todo_for__user(
+        self, _created_by: UUID4, data: TodoInput
+    ) -> TodoOutput:
         """Create a new todo item for the specified user."""
-        return self.repository.create(_created_by, data)
+        return await self.repository.create(_created_by, data)
+
+    async def get_list_of_todo_by_user(
+        self, request: Request, _created_by: UUID4, params: TodoListParams
+    ) -> list[TodoOutput] | CursorPaginatedResponse[TodoOutput]:
+        """
+        Retrieve a user's filtered, sorted todos: all of them by default, or
+        one keyset page in cursor mode.
+        """
+        if params.mode == TodoListMode.all:
+            return await self.repository.get_todos_page_by_created_user(
+                _created_by, params, None, None
+            )
+
+        after = None
+        if params.cursor:
+            sort_by, order, *after = decode_cursor(
+                params.cursor,
+                TodoSortField,
+                SortOrder,
+                SORT_VALUE_PARSERS[params.sort_by],
+                int,
+            )
+            if (sort_by, order) != (params.sort_by, params.order):
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Cursor does not match the requested sort",
+                )
+
+        # One extra row tells whether a next page exists
+        todos = await self.repository.get_todos_page_by_created_user(
+            _created_by, params, after, params.limit + 1
+        )
+        has_next = len(todos) > params.limit
+        todos = todos[: params.limit]
+
+        next_cursor = None
+        next_page_url = None
+        if has_next:
+            last = todos[-1]
+            sort_value = getattr(last, params.sort_by.value)
+            next_cursor = encode_cursor(
+                params.sort_by.value,
+                params.order.value,
+                sort_value and sort_value.isoformat(),
+                last.id,
+            )
+            next_page_url = str(request.url.include_query_params(cursor=next_cursor))
 
-    def get_list_of_todo_by_user(self, _created_by: UUID4) -> list[TodoOutput]:
-        """Retrieve a list of todos created by a specific user."""
-        return self.repository.get_todos_by_created_user(_created_by)
+        return CursorPaginatedResponse[TodoOutput](
+            size=params.limit,
+            data=todos,
+            has_next=has_next,
+            next_cursor=next_cursor,
+            next_page_url=next_page_url,
+        )
 
-    def get_single_todo(self, _id: UUID4) -> TodoOutput:
+    async def get_single_todo(self, _id: UUID4) -> TodoOutput:
         """Retrieve a single todo by its ID."""
-        return self.repository.get_single_todo(_id)
+        return await self.repository.get_single_todo(_id)
 
-    def get_single_todo_by_user(self, user_id, _id: UUID4) -> TodoOutput:
+    async def get_single_todo_by_user(self, user_id, _id: UUID4) -> TodoOutput:
         """Retrieve a single todo by ID and verify ownership by user."""
-        if not self.repository.exists_todo_by_id_user(user_id, _id):
+        todo = await self.repository.get_todo_by_id_user(user_id, _id)
+        if todo is None:
             raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND, detail="Todo does not exists"
+                status_code=status.HTTP_404_NOT_FOUND, detail=TODO_NOT_FOUND
             )
-        return self.repository.get_single_todo(_id)
+        return todo
 
-    def delete_todo(self, user_id, _id: UUID4) -> None:
+    async def delete_todo(self, user_id, _id: UUID4) -> None:
         """Delete a todo if it exists and belongs to the user."""
-        if not self.repository.exists_todo_by_id_user(user_id, _id):
+        if not await self.repository.delete_todo_by_id_user(user_id, _id):
             raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND, detail="Todo does not exists"
+                status_code=status.HTTP_404_NOT_FOUND, detail=TODO_NOT_FOUND
             )
-        return self.repository.delete_todo_by_id(_id)
+        return None
 
-    def update_todo(self, user_id, _id: UUID4, data: TodoUpdate) -> None:
+    async def update_todo(self, user_id, _id: UUID4, data: TodoUpdate) -> TodoOutput:
         """Update a todo if it exists and belongs to the user."""
-        if not self.repository.exists_todo_by_id_user(user_id, _id):
+        todo = await self.repository.update_todo_by_id_user(user_id, _id, data)
+        if todo is None:
             raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND, detail="Todo does not exists"
+                status_code=status.HTTP_404_NOT_FOUND, detail=TODO_NOT_FOUND
             )
-        return self.repository.update_todo_by_id(_id, data)
+        return todo
+
+    async def create_many(
+        self, user_id: UUID4, data: TodoBulkCreate
+    ) -> TodoBulkResponse:
+        """Create every item in one transaction."""
+        todos = await self.repository.create_many(user_id, data.items)
+        return _bulk_response(
+            TodoBulkItemResult(
+                index=index, id=todo.id, status_code=status.HTTP_201_CREATED, todo=todo
+            )
+            for index, todo in enumerate(todos)
+        )
+
+    async def update_many(
+        self, user_id: UUID4, data: TodoBulkUpdate
+    ) -> TodoBulkResponse:
+        """Update the items that exist and belong to the user, 404 the rest."""
+        todos = await self.repository.update_many(user_id, data.items)
+        return _bulk_response(
+            (
+                TodoBulkItemResult(
+                    index=index,
+                    id=item.id,
+                    status_code=status.HTTP_200_OK,
+                    todo=todos[item.id],
+                )
+                if item.id in todos
+                else _not_found(index, item.id)
+            )
+            for index, item in enumerate(data.items)
+        )
+
+    async def delete_many(
+        self, user_id: UUID4, data: TodoBulkDelete
+    ) -> TodoBulkResponse:
+        """Delete the items that exist and belong to the user, 404 the rest."""
+        deleted = await self.repository.delete_many(user_id, data.ids)
+        return _bulk_response(
+            (
+                TodoBulkItemResult(
+                    index=index, id=_id, status_code=status.HTTP_204_NO_CONTENT
+                )
+                if _id in deleted
+                else _not_found(index, _id)
+            )
+            for index, _id in enumerate(data.ids)
+        )
+
+
+def _not_found(index: int, _id: int) -> TodoBulkItemResult:
+    return TodoBulkItemResult(
+        index=index,
+        id=_id,
+        status_code=status.HTTP_404_NOT_FOUND,
+        detail=TODO_NOT_FOUND,
+    )
+
+
+def _bulk_response(results) -> TodoBulkResponse:
+    results = list(results)
+    failed = sum(result.status_code >= 400 for result in results)
+    return TodoBulkResponse(
+        succeeded=len(results) - failed, failed=failed, results=results
+    )
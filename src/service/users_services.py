@@ -1,107 +1,323 @@
-from typing import Generator
+import asyncio
+from contextlib import asynccontextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import AsyncIterator
+from uuid import UUID
 
 from fastapi import BackgroundTasks, HTTPException, Request, status
 from pydantic import UUID4
-from sqlalchemy.orm import Session
 
-from ..repository.users_repository import UserRepository
+from ..config.constant import CountMode, ExportFormat, PaginationMode
+from ..config.database import DBSession, dispose_engines, get_db
+from ..config.settings import settings
+from ..repository.base import build_repository
+from ..repository.users_repository import (
+    USER_EXPORT_COLUMNS,
+    AsyncUserRepository,
+    UserRepository,
+)
 from ..schemas.pagination_schema import PaginatedResponse, PaginationParams
 from ..schemas.user_schema import (
     UpdateUser,
     UserDetailedOutput,
+    UserImportResponse,
+    UserImportResult,
     UserInput,
     UserOutput,
     UserRole,
 )
-from ..utils.email import send_welcome_email
+from ..utils.email import send_welcome_email, send_welcome_emails
+from ..utils.email_queue import email_queue
+from ..utils.export import encode_export
+from ..utils.pagination import decode_cursor, encode_cursor
+from ..utils.password_pool import password_pool
+from ..utils.user_import import read_user_rows, validate_user_rows
+
+USER_EXISTS = "User aleredy exists with this username or email"
 
 
 class UserService:
     """Service layer for handling user-related business logic."""
 
-    def __init__(self, db: Session, backroundtask: BackgroundTasks = None):
-        self.repository = UserRepository(db)
+    def __init__(self, db: DBSession, backroundtask: BackgroundTasks = None):
+        self.repository = build_repository(db, UserRepository, AsyncUserRepository)
         self.backroundtask = backroundtask
 
-    def create(self, data: UserInput) -> UserOutput:
+    async def create(self, data: UserInput) -> UserOutput:
         """Create a new user if username or email doesn't already exist."""
-        if self.repository.get_user_by_username_or_email(data.username, data.email):
+        if await self.repository.get_user_by_username_or_email(
+            data.username, data.email
+        ):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
-                detail="User aleredy exists with this username or email",
+                detail=USER_EXISTS,
             )
-        result = self.repository.create(data)
+        # Hash with no transaction open, so no pooled connection waits on bcrypt
+        await self.repository.end_read()
+        hash_password = await password_pool.ahash(data.password)
+        result = await self.repository.create(data, hash_password)
         self.backroundtask.add_task(send_welcome_email, result.email, result.username)
         return result
 
-    def get_all_by_page(
-        self, request: Request, user_role: UserRole, page: int, limit: int
+    async def import_users(self, users: list[UserInput]) -> UserImportResponse:
+        """
+        Create many users at once. Rows whose username or email is taken, in
+        the database or earlier in the import, get a 409 result instead of
+        failing the import. When the password pool turns a batch away after
+        earlier ones were created, that batch and the rest get a 503 result.
+        Welcome emails go out as one batched task.
+        """
+        results = []
+        created = []
+        seen_usernames, seen_emails = set(), set()
+        batch_size = settings.USER_IMPORT_BATCH_SIZE
+
+        for start in range(0, len(users), batch_size):
+            batch = users[start : start + batch_size]
+            taken_usernames, taken_emails = (
+                await self.repository.get_taken_usernames_and_emails(
+                    [user.username for user in batch], [user.email for user in batch]
+                )
+            )
+            # Earlier rows of the import count as taken too
+            taken_usernames |= seen_usernames
+            taken_emails |= seen_emails
+
+            new_users = []
+            for index, user in enumerate(batch, start):
+                if user.username in taken_usernames or user.email in taken_emails:
+                    results.append(
+                        UserImportResult(
+                            index=index,
+                            username=user.username,
+                            status_code=status.HTTP_409_CONFLICT,
+                            detail=USER_EXISTS,
+                        )
+                    )
+                    continue
+                taken_usernames.add(user.username)
+                taken_emails.add(user.email)
+                new_users.append((index, user))
+
+            seen_usernames |= taken_usernames
+            seen_emails |= taken_emails
+
+            if not new_users:
+                continue
+            await self.repository.end_read()
+            try:
+                hashes = await password_pool.ahash_many(
+                    [user.password for _, user in new_users]
+                )
+            except HTTPException as exc:
+                if not created:
+                    # Nothing imported yet, the whole import can be retried
+                    raise
+                # Earlier batches are committed: report this one and the rest
+                # as not imported rather than failing the whole response
+                remaining = new_users + list(
+                    enumerate(users[start + batch_size :], start + batch_size)
+                )
+                results.extend(
+                    UserImportResult(
+                        index=index,
+                        username=user.username,
+                        status_code=exc.status_code,
+                        detail=exc.detail,
+                    )
+                    for index, user in remaining
+                )
+                break
+            ids = await self.repository.create_many(
+                [user for _, user in new_users], hashes
+            )
+            for (index, user), _id in zip(new_users, ids):
+                results.append(
+                    UserImportResult(
+                        index=index,
+                        username=user.username,
+                        id=_id,
+                        status_code=status.HTTP_201_CREATED,
+                    )
+                )
+                created.append((user.email, user.username))
+
+        if created and self.backroundtask is not None:
+            self.backroundtask.add_task(send_welcome_emails, created)
+
+        results.sort(key=lambda result: result.index)
+        return UserImportResponse(
+            created=len(created), failed=len(results) - len(created), results=results
+        )
+
+    async def get_all_by_page(
+        self,
+        request: Request,
+        user_role: UserRole,
+        page: int,
+        limit: int,
+        mode: PaginationMode = PaginationMode.offset,
+        cursor: str | None = None,
+        count: CountMode = CountMode.exact,
     ) -> PaginatedResponse[UserOutput | UserDetailedOutput]:
         """Retrieve all users, with extra details if the requester is an admin."""
+        total = None
+        total_pages = None
+        if count == CountMode.exact:
+            total = await self.repository.get_total_user_count()
+        elif count == CountMode.approximate:
+            total = await self.repository.get_approximate_user_count()
+        if total is not None:
+            total_pages = (total + limit - 1) // limit
+
+        if mode == PaginationMode.cursor:
+            return await self._get_page_after_cursor(
+                request, user_role, limit, cursor, total, total_pages
+            )
+
         skip = (page - 1) * limit
-        total = self.repository.get_total_user_count()
         users = None
-        total_pages = (total + limit - 1) // limit
 
         def build_url(new_page: int) -> str:
             return str(request.url.include_query_params(page=new_page, limit=limit))
 
+        # One extra row tells whether a next page exists without a count
         if user_role == UserRole.admin:
-            users = self.repository.get_users_paginated_admin(skip=skip, limit=limit)
+            users = await self.repository.get_users_paginated_admin(
+                skip=skip, limit=limit + 1
+            )
         else:
-            users = self.repository.get_users_paginated(skip=skip, limit=limit)
+            users = await self.repository.get_users_paginated(
+                skip=skip, limit=limit + 1
+            )
+        has_next = len(users) > limit
 
         return PaginatedResponse[UserDetailedOutput | UserOutput](
             total=total,
             total_pages=total_pages,
             page=page,
             size=limit,
-            data=users,
-            has_next=page < total_pages,
+            data=users[:limit],
+            has_next=has_next,
             has_previous=page > 1,
-            next_page_url=build_url(page + 1) if page < total_pages else None,
+            next_page_url=build_url(page + 1) if has_next else None,
             previous_page_url=build_url(page - 1) if page > 1 else None,
         )
 
-    def get_all(self, user_role: UserRole) -> list[UserOutput | UserDetailedOutput]:
+    async def _get_page_after_cursor(
+        self,
+        request: Request,
+        user_role: UserRole,
+        limit: int,
+        cursor: str | None,
+        total: int | None,
+        total_pages: int | None,
+    ) -> PaginatedResponse[UserOutput | UserDetailedOutput]:
+        """Keyset page over (created_at, id), following ``cursor`` when given."""
+        after = None
+        if cursor:
+            after = decode_cursor(cursor, datetime.fromisoformat, UUID)
+
+        if user_role == UserRole.admin:
+            users = await self.repository.get_users_after_admin(after, limit + 1)
+        else:
+            users = await self.repository.get_users_after(after, limit + 1)
+
+        has_next = len(users) > limit
+        users = users[:limit]
+
+        next_cursor = None
+        next_page_url = None
+        if has_next:
+            next_cursor = encode_cursor(
+                users[-1].created_at.isoformat(), str(users[-1].id)
+            )
+            next_page_url = str(
+                request.url.remove_query_params("page").include_query_params(
+                    mode=PaginationMode.cursor.value, cursor=next_cursor, limit=limit
+                )
+            )
+
+        return PaginatedResponse[UserDetailedOutput | UserOutput](
+            total=total,
+            total_pages=total_pages,
+            page=None,
+            size=limit,
+            data=users,
+            has_next=has_next,
+            has_previous=after is not None,
+            next_page_url=next_page_url,
+            next_cursor=next_cursor,
+        )
+
+    async def get_all(
+        self, user_role: UserRole
+    ) -> list[UserOutput | UserDetailedOutput]:
         """Retrieve all users, with extra details if the requester is an admin."""
         if user_role == UserRole.admin:
-            return self.repository.get_all_users_admin()
-        return self.repository.get_all_users()
+            return await self.repository.get_all_users_admin()
+        return await self.repository.get_all_users()
 
-    def get_all_stream(self) -> Generator[UserOutput, None, None]:
-        return self.repository.stream_all_users()
+    def export_all(self, export_format: ExportFormat) -> AsyncIterator[bytes]:
+        """Stream every user's public profile, encoded in ``export_format``."""
+        return encode_export(
+            export_format,
+            USER_EXPORT_COLUMNS,
+            self.repository.stream_user_rows(settings.EXPORT_BATCH_SIZE),
+            settings.EXPORT_CHUNK_SIZE,
+        )
 
-    def get(self, _id: UUID4) -> UserDetailedOutput:
+    async def get(self, _id: UUID4) -> UserDetailedOutput:
         """Get user details by ID if the user exists."""
-        if not self.repository.user_exists_by_id(_id):
+        user = await self.repository.get_user(_id)
+        if user is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND, detail="User not exists"
             )
+        return user
 
-        return self.repository.get_user(_id)
-
-    def get_by_username(
+    async def get_by_username(
         self, current_user_role: UserRole, _username: str
     ) -> UserOutput | UserDetailedOutput:
         """Get user details by username with different views for admin and normal users."""
-        if not self.repository.user_exists_by_username(_username):
+        if current_user_role == UserRole.admin:
+            user = await self.repository.get_user_all_detail_by_username(_username)
+        else:
+            user = await self.repository.get_user_by_username(_username)
+
+        if user is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND, detail="User not exists"
             )
+        return user
 
-        if current_user_role == UserRole.admin:
-            return self.repository.get_user_all_detail_by_username(_username)
-        return self.repository.get_user_by_username(_username)
-
-    def delete_user(self, _id: UUID4) -> bool:
+    async def delete_user(self, _id: UUID4) -> bool:
         """Delete a user by ID if the user exists."""
-        if not self.repository.user_exists_by_id(_id):
+        if not await self.repository.delete_user(_id):
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND, detail="User not exists"
             )
-        return self.repository.delete_user(_id)
+        return True
 
-    def update_user(self, _username: str, data: UpdateUser) -> UserDetailedOutput:
+    async def update_user(self, _username: str, data: UpdateUser) -> UserDetailedOutput:
         """Update user details using their username."""
-        return self.repository.update_user(_username, data)
+        return await self.repository.update_user(_username, data)
+
+
+async def import_users_file(path: Path, send_emails: bool = True) -> UserImportResponse:
+    """Import a CSV or JSON users file outside of a request, as the CLI does."""
+    users = validate_user_rows(read_user_rows(path.read_bytes(), path.name))
+    tasks = BackgroundTasks()
+    try:
+        async with asynccontextmanager(get_db)() as db:
+            result = await UserService(db, tasks).import_users(users)
+    finally:
+        password_pool.shutdown()
+        # Pooled aiosqlite connections would otherwise keep the process alive
+        await dispose_engines()
+    if send_emails:
+        await tasks()
+        # No server may be running to pick the queued emails up
+        await asyncio.to_thread(email_queue.drain)
+    return result
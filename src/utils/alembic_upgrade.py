@@ -1,10 +1,9 @@
-import os
-from alembic.config import Config
-from alembic import command
-
 from ..config.settings import settings
 
 def run_alembic_migrations():
+    # Imported here, alembic is not needed to serve requests
+    from alembic import command
+    from alembic.config import Config
 
     # Create alembic config object and load .env values
     alembic_cfg = Config("alembic.ini")
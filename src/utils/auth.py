@@ -1,9 +1,15 @@
-from datetime import datetime, timedelta
+import hashlib
+import time
+from functools import cache
+from typing import Any
+from uuid import uuid4
 
 import jwt
-from fastapi import HTTPException
+from fastapi import HTTPException, Request
+from jwt.algorithms import get_default_algorithms
 
 from ..config.settings import settings
+from .cache_backend import LocalCache
 
 SECRET_KEY = settings.SECRET_KEY
 ALGORITHM = settings.ALGORITHM
@@ -11,14 +17,61 @@ ACCESS_TOKEN_EXPIRE_MINUTES = settings.ACCESS_TOKEN_EXPIRE_MINUTES
 REFRESH_TOKEN_EXPIRE_MINUTES = settings.REFRESH_TOKEN_EXPIRE_MINUTES
 
 
-def _genrate_token(data: dict, expires_time: int = 10):
+ACCESS_TOKEN = "access"
+REFRESH_TOKEN = "refresh"
+
+# Every token must carry an expiry
+_jwt = jwt.PyJWT(options={"require": ["exp"]})
+
+# Claims of tokens that verified, keyed by a hash of the token, until their exp
+_verified_tokens = LocalCache(settings.TOKEN_CACHE_SIZE)
+
+
+@cache
+def token_keys() -> tuple[Any, Any]:
+    """
+    The (signing, verification) keys for ALGORITHM, parsed once. HS*
+    algorithms use SECRET_KEY for both. Asymmetric ones (RS256, ES256,
+    EdDSA...) sign with JWT_PRIVATE_KEY and verify with JWT_PUBLIC_KEY, or
+    the public half of the private key; a service that only verifies tokens
+    needs the public key alone. Called in the lifespan, so a missing or
+    invalid key stops the startup instead of failing requests.
+    """
+    if ALGORITHM.startswith("HS"):
+        return SECRET_KEY.encode(), SECRET_KEY.encode()
+
+    algorithm = get_default_algorithms().get(ALGORITHM)
+    if algorithm is None:
+        raise RuntimeError(
+            f"ALGORITHM {ALGORITHM} requires the cryptography package (pyjwt[crypto])"
+        )
+    private_key = (
+        algorithm.prepare_key(settings.JWT_PRIVATE_KEY)
+        if settings.JWT_PRIVATE_KEY
+        else None
+    )
+    if settings.JWT_PUBLIC_KEY:
+        public_key = algorithm.prepare_key(settings.JWT_PUBLIC_KEY)
+    elif private_key is not None:
+        public_key = private_key.public_key()
+    else:
+        raise RuntimeError(f"ALGORITHM {ALGORITHM} needs JWT_PUBLIC_KEY or JWT_PRIVATE_KEY")
+    return private_key, public_key
+
+
+def _genrate_token(data: dict, expires_time: int = 10, token_type: str = ACCESS_TOKEN):
     to_encode = data.copy()
 
-    # Fixing the datetime call and converting to a Unix timestamp
-    expire = datetime.now() + timedelta(minutes=expires_time)
-    to_encode.update({"exp": int(expire.timestamp())})  # Convert to Unix timestamp
+    # Unix timestamps, independent of the server's time zone
+    now = int(time.time())
+    to_encode.update({"iat": now, "exp": now + expires_time * 60})
+    # The jti identifies a refresh token in the revocation set
+    to_encode.update({"jti": uuid4().hex, "type": token_type})
 
-    encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+    signing_key = token_keys()[0]
+    if signing_key is None:
+        raise RuntimeError("JWT_PRIVATE_KEY is required to issue tokens")
+    encoded_jwt = jwt.encode(to_encode, signing_key, algorithm=ALGORITHM)
 
     return encoded_jwt
 
@@ -28,14 +81,57 @@ def create_access_token(data: dict):
 
 
 def create_refresh_token(data: dict):
-    return _genrate_token(data, REFRESH_TOKEN_EXPIRE_MINUTES)
+    return _genrate_token(data, REFRESH_TOKEN_EXPIRE_MINUTES, REFRESH_TOKEN)
 
 
 def verify_token(token: str):
+    """
+    Verify a token and return its claims. Clients reuse an access token for
+    many requests, so the claims of a valid token are memoized until it
+    expires; invalid tokens are not remembered.
+    """
+    key = hashlib.blake2b(token.encode(), digest_size=16).digest()
+    payload = _verified_tokens.get(key)
+    if payload is not None:
+        return dict(payload)
+
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        return payload
+        payload = _jwt.decode(token, token_keys()[1], algorithms=[ALGORITHM])
     except jwt.ExpiredSignatureError:
         raise HTTPException(status_code=401, detail="Token has expired")
     except jwt.InvalidTokenError:
         raise HTTPException(status_code=401, detail="Invalid token")
+
+    ttl = payload["exp"] - time.time()
+    if ttl > 0:
+        _verified_tokens.set(key, payload, ttl)
+    return dict(payload)
+
+
+def verify_request_token(request: Request, token: str) -> dict:
+    """
+    verify_token memoized on the request, so the rate limiter and the auth
+    dependency decode the JWT only once.
+    """
+    verified = getattr(request.state, "verified_token", None)
+    if verified is None or verified[0] != token:
+        try:
+            verified = (token, verify_token(token))
+        except HTTPException as exc:
+            verified = (token, exc)
+        request.state.verified_token = verified
+
+    if isinstance(verified[1], HTTPException):
+        raise verified[1]
+    return verified[1]
+
+
+def request_token_payload(request: Request) -> dict | None:
+    """Payload of the request's bearer token, or None without a valid one."""
+    scheme, _, token = request.headers.get("Authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    try:
+        return verify_request_token(request, token)
+    except HTTPException:
+        return None
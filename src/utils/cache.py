@@ -1,4 +1,42 @@
-from fastapi import Request
+import asyncio
+import logging
+import time
+from functools import wraps
+from typing import Any, Callable
+from urllib.parse import urlencode
+
+import anyio.from_thread
+from fastapi import Request, Response
+
+from ..config.settings import settings
+from .responses import ModelResponse, dump_json
+
+logger = logging.getLogger(__name__)
+
+CACHE_PREFIX = "fastapi-cache"
+
+# Namespace versions, kept out of reach of the local tier's LRU eviction
+VERSION_PREFIX = f"{CACHE_PREFIX}:version:"
+
+# Cached responses of /users and /users/profile/{username}
+USERS_NAMESPACE = "users"
+
+
+def todos_namespace(user_id) -> str:
+    """Namespace of one user's cached todo lists."""
+    return f"todos:{user_id}"
+
+
+def _fastapi_cache():
+    # fastapi_cache imports jinja2 through its coders; the lifespan loads it
+    from fastapi_cache import FastAPICache
+
+    return FastAPICache
+
+
+def _current_user(kwargs: dict[str, Any]):
+    user_db = kwargs.get("user_db")
+    return user_db[0] if user_db else None
 
 
 def url_key_builder(func, namespace, request: Request, *args, **kwargs) -> str:
@@ -7,9 +45,185 @@ def url_key_builder(func, namespace, request: Request, *args, **kwargs) -> str:
     return f"{namespace}:{request.url.path}?page={page}&limit={limit}"
 
 
-def user_aware_key_builder(func, namespace, request: Request, *args, **kwargs) -> str:
-    user_id = getattr(getattr(request.state, "user", None), "id", None)
-    base_key = f"{namespace}:{request.url.path}?{request.url.query}"
-    if user_id is not None:
-        base_key += f":user={user_id}"
-    return base_key
+def user_aware_key_builder(
+    func, namespace, request: Request, *args, kwargs: dict | None = None, **_
+) -> str:
+    """
+    Key on the path, the query string with its parameters sorted and the role
+    of the authenticated user, so admins and users never share an entry.
+    """
+    user = _current_user(kwargs or {})
+    role = getattr(user, "role", None) or "anonymous"
+    query = urlencode(sorted(request.query_params.multi_items()))
+    return f"{namespace}:{request.url.path}?{query}:role={role}"
+
+
+class ResponseCache:
+    """
+    Caches serialized GET responses in the FastAPICache backend.
+
+    Every namespace carries a version that is part of the key; writes through
+    the repositories bump it, which orphans all entries of the namespace at
+    once. Versions live next to the entries, so only a backend with a Redis
+    tier shows a bump to every worker. Entries are fresh for ``expire``
+    seconds and served stale for ``stale`` more while a single request
+    refreshes them. Concurrent misses on one key in a worker wait for the
+    first request instead of all hitting the database.
+    """
+
+    # Outlives every entry, so an evicted version cannot resurrect old ones
+    version_ttl = 24 * 60 * 60
+
+    def __init__(self, expire: int, stale: int):
+        self.expire = expire
+        self.stale = stale
+
+        self._inflight: dict[str, asyncio.Future] = {}
+
+    @staticmethod
+    def _backend():
+        FastAPICache = _fastapi_cache()
+        if not FastAPICache.get_enable():
+            return None
+        try:
+            return FastAPICache.get_backend()
+        except AssertionError:
+            # FastAPICache is initialised in the lifespan
+            return None
+
+    @staticmethod
+    def _version_key(namespace: str) -> str:
+        return VERSION_PREFIX + namespace
+
+    async def _version(self, backend, namespace: str) -> str:
+        version = await backend.get(self._version_key(namespace))
+        if isinstance(version, bytes):
+            return version.decode()
+        return version or "0"
+
+    async def invalidate(self, *namespaces: str) -> None:
+        """Drop every cached response of the given namespaces."""
+        backend = self._backend()
+        if backend is None:
+            return
+
+        version = str(time.time_ns())
+        try:
+            for namespace in namespaces:
+                await backend.set(
+                    self._version_key(namespace), version, expire=self.version_ttl
+                )
+        except Exception:
+            logger.warning("Response cache invalidation failed", exc_info=True)
+
+    def invalidate_sync(self, *namespaces: str) -> None:
+        """Drop cached responses; blocking, for the sync repositories."""
+        try:
+            anyio.from_thread.run(self.invalidate, *namespaces)
+        except RuntimeError:
+            # Not called from a threadpool worker of a running event loop
+            logger.warning(
+                "Response cache invalidation skipped for %s", namespaces, exc_info=True
+            )
+
+    async def _load(self, key: str, compute: Callable, backend) -> bytes:
+        future = self._inflight.get(key)
+        if future is not None:
+            await asyncio.wait({future})
+            if not future.cancelled():
+                return future.result()
+            # The leading request failed, let this one try on its own
+            return await compute()
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            body = await compute()
+        except BaseException:
+            future.cancel()
+            raise
+        finally:
+            del self._inflight[key]
+        future.set_result(body)
+
+        entry = f"{time.time():.3f}\n".encode() + body
+        try:
+            await backend.set(key, entry, expire=self.expire + self.stale)
+        except Exception:
+            logger.warning("Response cache store failed", exc_info=True)
+        return body
+
+    @staticmethod
+    def _response(body: bytes, cache_status: str) -> Response:
+        return Response(
+            content=body,
+            media_type="application/json",
+            headers={_fastapi_cache().get_cache_status_header(): cache_status},
+        )
+
+    def __call__(
+        self,
+        *,
+        namespace: str | Callable[[Any], str],
+        response_model: Any,
+        key_builder: Callable[..., str] = user_aware_key_builder,
+    ):
+        """
+        Cache a GET endpoint taking ``request`` (and optionally ``user_db``).
+
+        ``namespace`` is either a name or a callable building it from the
+        authenticated user. The result is validated and serialized with
+        ``response_model``, exactly as FastAPI would have, also when the cache
+        is bypassed.
+        """
+
+        def decorator(func):
+            @wraps(func)
+            async def wrapper(*args, **kwargs):
+                request: Request = kwargs["request"]
+                backend = self._backend()
+                if backend is None or "no-store" in request.headers.get(
+                    "cache-control", ""
+                ):
+                    return ModelResponse(await func(*args, **kwargs), response_model)
+
+                async def compute() -> bytes:
+                    return dump_json(await func(*args, **kwargs), response_model)
+
+                name = (
+                    namespace(_current_user(kwargs))
+                    if callable(namespace)
+                    else namespace
+                )
+                try:
+                    version = await self._version(backend, name)
+                    key = key_builder(
+                        func,
+                        f"{_fastapi_cache().get_prefix()}:{name}:v{version}",
+                        request=request,
+                        kwargs=kwargs,
+                    )
+                    entry = await backend.get(key)
+                except Exception:
+                    logger.warning("Response cache lookup failed", exc_info=True)
+                    return ModelResponse(await func(*args, **kwargs), response_model)
+
+                if entry is not None:
+                    stored_at, body = entry.split(b"\n", 1)
+                    if time.time() - float(stored_at) < self.expire:
+                        return self._response(body, "HIT")
+                    if key in self._inflight:
+                        # Another request is already refreshing this entry
+                        return self._response(body, "STALE")
+
+                return self._response(await self._load(key, compute, backend), "MISS")
+
+            return wrapper
+
+        return decorator
+
+
+response_cache = ResponseCache(
+    expire=settings.RESPONSE_CACHE_TTL,
+    stale=settings.RESPONSE_CACHE_STALE_TTL,
+)
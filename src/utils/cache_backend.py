@@ -0,0 +1,207 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable
+
+import redis
+import redis.asyncio
+
+from ..config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+class LocalCache:
+    """
+    Bounded in-process LRU map whose entries expire after their own TTL.
+    Keys starting with ``pinned_prefix`` are never evicted to make room, only
+    dropped once expired.
+    """
+
+    def __init__(self, maxsize: int, pinned_prefix: str | None = None):
+        self.maxsize = maxsize
+        self.pinned_prefix = pinned_prefix
+
+        self._entries: OrderedDict[str, tuple[float | None, Any]] = OrderedDict()
+        # Sync repositories invalidate from threadpool workers
+        self._lock = threading.Lock()
+
+    def get_with_ttl(self, key: str) -> tuple[float | None, Any]:
+        """Return the remaining TTL (None when unbounded) and value, or (0, None)."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return 0, None
+            expires_at, value = entry
+            if expires_at is None:
+                ttl = None
+            else:
+                ttl = expires_at - time.monotonic()
+                if ttl <= 0:
+                    del self._entries[key]
+                    return 0, None
+            self._entries.move_to_end(key)
+            return ttl, value
+
+    def get(self, key: str) -> Any:
+        return self.get_with_ttl(key)[1]
+
+    def set(self, key: str, value: Any, ttl: float | None = None) -> None:
+        expires_at = None if ttl is None else time.monotonic() + ttl
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.maxsize:
+                self._evict(len(self._entries) - self.maxsize)
+
+    def _evict(self, count: int) -> None:
+        # Least recently used first, skipping pinned entries that are still live
+        if self.pinned_prefix is None:
+            for _ in range(count):
+                self._entries.popitem(last=False)
+            return
+
+        now = time.monotonic()
+        evicted = []
+        for key, (expires_at, _) in self._entries.items():
+            if len(evicted) == count:
+                break
+            if not key.startswith(self.pinned_prefix) or (
+                expires_at is not None and expires_at <= now
+            ):
+                evicted.append(key)
+        for key in evicted:
+            del self._entries[key]
+
+    def pop(self, key: str) -> bool:
+        with self._lock:
+            return self._entries.pop(key, None) is not None
+
+    def clear(self, prefix: str | None = None) -> int:
+        with self._lock:
+            keys = [
+                key for key in self._entries if prefix is None or key.startswith(prefix)
+            ]
+            for key in keys:
+                del self._entries[key]
+            return len(keys)
+
+
+class RedisTier:
+    """
+    The shared Redis client as seen by the caches. After a failed command
+    Redis is skipped for ``retry_interval`` seconds, so an outage costs one
+    timeout instead of one per request while the caches fall back to their
+    in-process tier.
+    """
+
+    def __init__(self, retry_interval: float):
+        self.retry_interval = retry_interval
+        self.client: redis.asyncio.Redis | None = None
+
+        self._down_until = 0.0
+
+    @property
+    def available(self) -> bool:
+        return self.client is not None and time.monotonic() >= self._down_until
+
+    def mark_down(self) -> None:
+        """Skip Redis for the next ``retry_interval`` seconds."""
+        self._down_until = time.monotonic() + self.retry_interval
+
+    async def run(
+        self, description: str, command: Callable[[redis.asyncio.Redis], Awaitable]
+    ) -> Any:
+        """Run ``command`` against the client, returning None when Redis is down."""
+        if not self.available:
+            return None
+        try:
+            return await command(self.client)
+        except (redis.RedisError, OSError):
+            self.mark_down()
+            logger.warning(
+                "%s failed, skipping Redis for %ss",
+                description,
+                self.retry_interval,
+                exc_info=True,
+            )
+            return None
+
+
+class TieredBackend:
+    """
+    FastAPICache backend keeping a bounded local copy of entries in front of
+    Redis. Local copies of shared entries live at most ``local_ttl`` seconds,
+    which bounds how long a write on another worker can go unnoticed. Without
+    a Redis tier (or while it is down) the local tier is the cache.
+
+    It implements ``fastapi_cache.types.Backend`` without subclassing it:
+    importing fastapi_cache loads its coders, and with them jinja2.
+    """
+
+    def __init__(self, local: LocalCache, shared: RedisTier | None, local_ttl: int):
+        self.local = local
+        self.shared = shared
+        self.local_ttl = local_ttl
+
+    def _local_ttl(self, ttl: float | None) -> float | None:
+        if self.shared is None or not self.shared.available:
+            return ttl
+        return self.local_ttl if ttl is None else min(ttl, self.local_ttl)
+
+    @staticmethod
+    async def _fetch(client: redis.asyncio.Redis, key: str) -> tuple[int, bytes]:
+        async with client.pipeline(transaction=True) as pipe:
+            return await pipe.ttl(key).get(key).execute()
+
+    async def get_with_ttl(self, key: str) -> tuple[int, bytes | None]:
+        ttl, value = self.local.get_with_ttl(key)
+        if value is not None or self.shared is None:
+            return int(ttl or -1), value
+
+        result = await self.shared.run(
+            "Cache lookup", lambda client: self._fetch(client, key)
+        )
+        if result is None or result[1] is None:
+            return 0, None
+        ttl, value = result
+        # TTL is -1 for keys stored without expiry
+        self.local.set(key, value, self._local_ttl(ttl if ttl >= 0 else None))
+        return ttl, value
+
+    async def get(self, key: str) -> bytes | None:
+        return (await self.get_with_ttl(key))[1]
+
+    async def set(self, key: str, value: bytes, expire: int | None = None) -> None:
+        self.local.set(key, value, self._local_ttl(expire))
+        if self.shared is not None:
+            await self.shared.run(
+                "Cache store", lambda client: client.set(key, value, ex=expire)
+            )
+
+    async def clear(self, namespace: str | None = None, key: str | None = None) -> int:
+        if namespace:
+            count = self.local.clear(namespace)
+            if self.shared is not None:
+
+                async def delete_namespace(client: redis.asyncio.Redis) -> int:
+                    keys = [k async for k in client.scan_iter(match=f"{namespace}:*")]
+                    return await client.delete(*keys) if keys else 0
+
+                count = await self.shared.run("Cache clear", delete_namespace) or count
+            return count
+        if key:
+            count = int(self.local.pop(key))
+            if self.shared is not None:
+                count = (
+                    await self.shared.run(
+                        "Cache clear", lambda client: client.delete(key)
+                    )
+                    or count
+                )
+            return count
+        return 0
+
+
+redis_tier = RedisTier(retry_interval=settings.REDIS_RETRY_INTERVAL)
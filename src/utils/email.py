@@ -1,18 +1,27 @@
-from fastapi_mail import FastMail, MessageSchema
 from pydantic import EmailStr
 
-from ..config.email_config import conf
 from ..config.settings import settings
-from .template_engine import templates
+from .email_queue import email_queue
 
+WELCOME_TEMPLATE = "email/welcome_email.html"
 
-async def send_welcome_email(to_email: EmailStr, username: str):
-    message = MessageSchema(
-        subject=f"Welcome to FastAPI Project, {username}",
-        recipients=[to_email],
-        template_body={"username": username, "domain": settings.PROJECT_DOMAIN},
-        subtype="html",
+
+def _welcome_message(to_email: EmailStr, username: str) -> tuple[str, str, str, dict]:
+    return (
+        to_email,
+        f"Welcome to FastAPI Project, {username}",
+        WELCOME_TEMPLATE,
+        {"username": username, "domain": settings.PROJECT_DOMAIN},
     )
 
-    fm = FastMail(conf)
-    await fm.send_message(message, template_name="email/welcome_email.html")
+
+def send_welcome_email(to_email: EmailStr, username: str):
+    """Queue a welcome email; the delivery worker sends it."""
+    email_queue.enqueue(*_welcome_message(to_email, username))
+
+
+def send_welcome_emails(recipients: list[tuple[EmailStr, str]]):
+    """Queue welcome emails for many (email, username) pairs in one transaction."""
+    email_queue.enqueue_many(
+        [_welcome_message(email, username) for email, username in recipients]
+    )
@@ -0,0 +1,329 @@
+import json
+import logging
+import smtplib
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from dataclasses import dataclass
+from email.message import EmailMessage
+from pathlib import Path
+
+from prometheus_client import Counter
+
+from ..config.settings import settings
+from .template_engine import template_env
+
+logger = logging.getLogger(__name__)
+
+EMAIL_MESSAGES = Counter(
+    "email_messages_total",
+    "Outbox messages handled by the delivery worker, by result.",
+    ["result"],
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS email_outbox (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    recipient TEXT NOT NULL,
+    subject TEXT NOT NULL,
+    template TEXT NOT NULL,
+    context TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at REAL NOT NULL,
+    locked_until REAL NOT NULL DEFAULT 0,
+    last_error TEXT,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_email_outbox_due
+    ON email_outbox (status, next_attempt_at);
+"""
+
+
+@dataclass(frozen=True)
+class OutboxMessage:
+    id: int
+    recipient: str
+    subject: str
+    template: str
+    context: dict
+    attempts: int
+
+
+class EmailQueue:
+    """
+    Durable outbox for emails. Requests only insert a row into a local SQLite
+    file; a background thread per worker claims due rows in batches, renders
+    them and sends them over one SMTP connection that is kept open between
+    batches. Several workers (and the import CLI) can share the file: a
+    claimed row is leased to one of them for ``lease`` seconds.
+
+    Failed deliveries are retried with exponential backoff, up to
+    ``max_attempts``, after which the row stays in the outbox as ``failed``.
+    Recipients the server refuses outright are not retried.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        batch_size: int,
+        poll_interval: float,
+        lease: float,
+        max_attempts: int,
+        retry_base: float,
+        retry_max: float,
+    ):
+        self.path = path
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.lease = lease
+        self.max_attempts = max_attempts
+        self.retry_base = retry_base
+        self.retry_max = retry_max
+
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._smtp: smtplib.SMTP | None = None
+        self._smtp_used_at = 0.0
+        self._schema_ready = False
+
+    def _connect(self) -> sqlite3.Connection:
+        # Autocommit, so that claims can take the write lock up front
+        db = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        if not self._schema_ready:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.executescript(SCHEMA)
+            self._schema_ready = True
+        return db
+
+    def enqueue(self, recipient: str, subject: str, template: str, context: dict):
+        """Store one message for delivery."""
+        self.enqueue_many([(recipient, subject, template, context)])
+
+    def enqueue_many(self, messages: list[tuple[str, str, str, dict]]) -> None:
+        """Store (recipient, subject, template, context) messages in one transaction."""
+        now = time.time()
+        with closing(self._connect()) as db:
+            db.execute("BEGIN")
+            db.executemany(
+                "INSERT INTO email_outbox"
+                " (recipient, subject, template, context, next_attempt_at, created_at)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                [
+                    (recipient, subject, template, json.dumps(context), now, now)
+                    for recipient, subject, template, context in messages
+                ],
+            )
+            db.execute("COMMIT")
+        self._wake.set()
+
+    def _claim(self) -> list[OutboxMessage]:
+        """Lease up to ``batch_size`` due messages to this worker."""
+        now = time.time()
+        with closing(self._connect()) as db:
+            db.execute("BEGIN IMMEDIATE")
+            rows = db.execute(
+                "SELECT id, recipient, subject, template, context, attempts"
+                " FROM email_outbox"
+                " WHERE status = 'pending' AND next_attempt_at <= ? AND locked_until <= ?"
+                " ORDER BY id LIMIT ?",
+                (now, now, self.batch_size),
+            ).fetchall()
+            db.executemany(
+                "UPDATE email_outbox SET locked_until = ? WHERE id = ?",
+                [(now + self.lease, row[0]) for row in rows],
+            )
+            db.execute("COMMIT")
+        return [
+            OutboxMessage(_id, recipient, subject, template, json.loads(context), attempts)
+            for _id, recipient, subject, template, context, attempts in rows
+        ]
+
+    def _finish(
+        self,
+        sent: list[int],
+        retried: list[tuple[OutboxMessage, str]],
+        failed: list[tuple[OutboxMessage, str]],
+        released: list[int],
+    ) -> None:
+        now = time.time()
+        with closing(self._connect()) as db:
+            db.execute("BEGIN")
+            db.executemany(
+                "DELETE FROM email_outbox WHERE id = ?", [(_id,) for _id in sent]
+            )
+            db.executemany(
+                "UPDATE email_outbox SET attempts = attempts + 1, locked_until = 0,"
+                " next_attempt_at = ?, last_error = ? WHERE id = ?",
+                [
+                    (now + self._backoff(message.attempts), error, message.id)
+                    for message, error in retried
+                ],
+            )
+            db.executemany(
+                "UPDATE email_outbox SET attempts = attempts + 1, locked_until = 0,"
+                " status = 'failed', last_error = ? WHERE id = ?",
+                [(error, message.id) for message, error in failed],
+            )
+            db.executemany(
+                "UPDATE email_outbox SET locked_until = 0 WHERE id = ?",
+                [(_id,) for _id in released],
+            )
+            db.execute("COMMIT")
+        EMAIL_MESSAGES.labels("sent").inc(len(sent))
+        EMAIL_MESSAGES.labels("retried").inc(len(retried))
+        EMAIL_MESSAGES.labels("failed").inc(len(failed))
+
+    def _backoff(self, attempts: int) -> float:
+        return min(self.retry_base * 2**attempts, self.retry_max)
+
+    def _connection(self) -> smtplib.SMTP:
+        """The open SMTP connection, or a new one when there is none."""
+        if self._smtp is None:
+            smtp_class = smtplib.SMTP_SSL if settings.MAIL_SSL else smtplib.SMTP
+            smtp = smtp_class(
+                settings.MAIL_SERVER,
+                settings.MAIL_PORT,
+                timeout=settings.EMAIL_SMTP_TIMEOUT,
+            )
+            try:
+                if settings.MAIL_TLS and not settings.MAIL_SSL:
+                    smtp.starttls()
+                smtp.login(settings.MAIL_USERNAME, settings.MAIL_PASSWORD)
+            except BaseException:
+                smtp.close()
+                raise
+            self._smtp = smtp
+        self._smtp_used_at = time.monotonic()
+        return self._smtp
+
+    def _disconnect(self) -> None:
+        if self._smtp is None:
+            return
+        try:
+            self._smtp.quit()
+        except (smtplib.SMTPException, OSError):
+            self._smtp.close()
+        self._smtp = None
+
+    @staticmethod
+    def _render(message: OutboxMessage) -> EmailMessage:
+        email = EmailMessage()
+        email["From"] = settings.MAIL_FROM
+        email["To"] = message.recipient
+        email["Subject"] = message.subject
+        email.set_content(
+            template_env().get_template(message.template).render(message.context),
+            subtype="html",
+        )
+        return email
+
+    def _send(self, email: EmailMessage) -> None:
+        reused = self._smtp is not None
+        try:
+            self._connection().send_message(email)
+        except smtplib.SMTPServerDisconnected:
+            if not reused:
+                raise
+            # The server dropped the kept-open connection; retry on a new one
+            self._disconnect()
+            self._connection().send_message(email)
+
+    def process_batch(self) -> bool:
+        """
+        Deliver one batch of due messages. After a connection error the rest
+        of the batch is released untried. Returns whether another batch is
+        worth trying right away.
+        """
+        messages = self._claim()
+        sent, retried, failed, released = [], [], [], []
+        connection_error = False
+        for position, message in enumerate(messages):
+            try:
+                email = self._render(message)
+            except Exception as exc:
+                # Rendering errors will not go away by retrying
+                logger.exception("Email %s could not be built", message.id)
+                failed.append((message, repr(exc)))
+                continue
+            try:
+                self._send(email)
+            except smtplib.SMTPRecipientsRefused as exc:
+                failed.append((message, str(exc.recipients)))
+            except (smtplib.SMTPException, OSError) as exc:
+                self._disconnect()
+                if message.attempts + 1 >= self.max_attempts:
+                    failed.append((message, repr(exc)))
+                else:
+                    retried.append((message, repr(exc)))
+                # The server is likely down; the rest of the batch is not tried
+                released = [pending.id for pending in messages[position + 1 :]]
+                connection_error = True
+                break
+            else:
+                sent.append(message.id)
+
+        if messages:
+            self._finish(sent, retried, failed, released)
+        for message, error in retried + failed:
+            logger.warning("Email %s to %s failed: %s", message.id, message.recipient, error)
+        return bool(messages) and not connection_error
+
+    def drain(self) -> None:
+        """Deliver due messages until a batch fails, then close the connection."""
+        try:
+            while self.process_batch():
+                pass
+        finally:
+            self._disconnect()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                if self.process_batch():
+                    continue
+            except Exception:
+                logger.exception("Email delivery round failed")
+                self._disconnect()
+
+            if (
+                self._smtp is not None
+                and time.monotonic() - self._smtp_used_at
+                > settings.EMAIL_SMTP_IDLE_TIMEOUT
+            ):
+                self._disconnect()
+            self._wake.wait(self.poll_interval)
+            self._wake.clear()
+        self._disconnect()
+
+    def start(self) -> None:
+        """Start the delivery thread of this worker."""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="email-delivery", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop after the batch in flight; undelivered messages stay queued."""
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._wake.set()
+        self._thread.join()
+        self._thread = None
+
+
+email_queue = EmailQueue(
+    path=settings.EMAIL_QUEUE_PATH or settings.BASE_DIR / "email_outbox.db",
+    batch_size=settings.EMAIL_BATCH_SIZE,
+    poll_interval=settings.EMAIL_POLL_INTERVAL,
+    lease=settings.EMAIL_LEASE,
+    max_attempts=settings.EMAIL_MAX_ATTEMPTS,
+    retry_base=settings.EMAIL_RETRY_BASE,
+    retry_max=settings.EMAIL_RETRY_MAX,
+)
@@ -0,0 +1,96 @@
+import csv
+import io
+from typing import AsyncIterable, AsyncIterator, Sequence
+
+import orjson
+
+from ..config.constant import ExportFormat
+
+EXPORT_MEDIA_TYPES = {
+    ExportFormat.json: "application/json",
+    ExportFormat.ndjson: "application/x-ndjson",
+    ExportFormat.csv: "text/csv",
+}
+
+ACCEPTED_MEDIA_TYPES = {
+    "application/json": ExportFormat.json,
+    "application/x-ndjson": ExportFormat.ndjson,
+    "application/ndjson": ExportFormat.ndjson,
+    "text/csv": ExportFormat.csv,
+}
+
+Batches = AsyncIterable[Sequence[tuple]]
+
+
+def negotiate_export_format(accept: str | None) -> ExportFormat:
+    """
+    Pick the export format from an Accept header: the first listed media type
+    that is supported wins, anything else gets the JSON array.
+    """
+    for media_range in (accept or "").split(","):
+        media_type = media_range.split(";", 1)[0].strip().lower()
+        if media_type in ACCEPTED_MEDIA_TYPES:
+            return ACCEPTED_MEDIA_TYPES[media_type]
+    return ExportFormat.json
+
+
+async def _json_array(columns: Sequence[str], batches: Batches) -> AsyncIterator[bytes]:
+    yield b"["
+    first = True
+    async for rows in batches:
+        if not rows:
+            continue
+        if not first:
+            yield b","
+        # One dumps call per batch; strip its brackets to splice into the array
+        yield orjson.dumps([dict(zip(columns, row)) for row in rows])[1:-1]
+        first = False
+    yield b"]"
+
+
+async def _ndjson(columns: Sequence[str], batches: Batches) -> AsyncIterator[bytes]:
+    async for rows in batches:
+        yield b"".join(
+            orjson.dumps(dict(zip(columns, row)), option=orjson.OPT_APPEND_NEWLINE)
+            for row in rows
+        )
+
+
+async def _csv(columns: Sequence[str], batches: Batches) -> AsyncIterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    async for rows in batches:
+        writer.writerows(rows)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    yield buffer.getvalue().encode()
+
+
+ENCODERS = {
+    ExportFormat.json: _json_array,
+    ExportFormat.ndjson: _ndjson,
+    ExportFormat.csv: _csv,
+}
+
+
+async def encode_export(
+    export_format: ExportFormat,
+    columns: Sequence[str],
+    batches: Batches,
+    chunk_size: int,
+) -> AsyncIterator[bytes]:
+    """
+    Serialize batches of row tuples in the requested format, coalescing the
+    output into chunks of at least ``chunk_size`` bytes so a large export costs
+    a handful of ASGI sends rather than several per row.
+    """
+    buffer = bytearray()
+    async for piece in ENCODERS[export_format](columns, batches):
+        buffer += piece
+        if len(buffer) >= chunk_size:
+            yield bytes(buffer)
+            buffer.clear()
+    if buffer:
+        yield bytes(buffer)
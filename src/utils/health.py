@@ -0,0 +1,180 @@
+import asyncio
+import logging
+import socket
+import time
+
+import anyio
+import anyio.to_thread
+import orjson
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import NullPool
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from ..config.settings import settings
+from .cache_backend import redis_tier
+
+logger = logging.getLogger(__name__)
+
+LIVENESS_BODY = orjson.dumps({"status": "ok"})
+
+
+class Readiness:
+    """
+    Checks the database, Redis and SMTP server every ``interval`` seconds on
+    a background task and keeps the outcome as a pre-encoded response, so a
+    probe is answered without touching any of them.
+
+    Only the database is required; the caches fall back to their local tier
+    without Redis and queued emails wait for the SMTP server, so those two
+    are reported without failing readiness. Until the first round has
+    finished the application is not ready.
+    """
+
+    def __init__(self, interval: float, timeout: float):
+        self.interval = interval
+        self.timeout = timeout
+
+        self.ready = False
+        self.body = orjson.dumps({"status": "starting", "checks": {}})
+        self._engine = None
+        self._limiter: anyio.CapacityLimiter | None = None
+        self._task: asyncio.Task | None = None
+
+    def _check_database(self) -> None:
+        if self._engine is None:
+            # Its own unpooled engine: the check never waits for, nor holds, a
+            # connection the requests need
+            self._engine = create_engine(settings.DATABASE_URL, poolclass=NullPool)
+        with self._engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+
+    async def _check_redis(self) -> None:
+        if redis_tier.client is None:
+            raise RuntimeError("Redis client not started")
+        await redis_tier.client.ping()
+
+    def _check_smtp(self) -> None:
+        # Reachability only, the delivery worker keeps its own connection
+        socket.create_connection(
+            (settings.MAIL_SERVER, settings.MAIL_PORT), timeout=self.timeout
+        ).close()
+
+    async def _in_thread(self, check) -> None:
+        # Own threads, not the request threadpool; a hung check is abandoned
+        # when it times out
+        await anyio.to_thread.run_sync(
+            check, abandon_on_cancel=True, limiter=self._limiter
+        )
+
+    def _checks(self) -> dict:
+        checks = {
+            "database": (True, lambda: self._in_thread(self._check_database)),
+            "smtp": (False, lambda: self._in_thread(self._check_smtp)),
+        }
+        if (
+            settings.RESPONSE_CACHE_REDIS
+            or settings.USER_CACHE_REDIS
+            or settings.RATE_LIMIT_REDIS
+            or settings.TOKEN_REVOCATION_REDIS
+        ):
+            checks["redis"] = (False, self._check_redis)
+        return checks
+
+    async def _run_check(self, check) -> dict:
+        started = time.perf_counter()
+        try:
+            with anyio.fail_after(self.timeout):
+                await check()
+        except Exception as exc:
+            return {"ok": False, "error": repr(exc)}
+        latency = (time.perf_counter() - started) * 1000
+        return {"ok": True, "latency_ms": round(latency, 2)}
+
+    async def check(self) -> None:
+        """Run every check concurrently and store the outcome."""
+        checks = self._checks()
+        results = await asyncio.gather(
+            *(self._run_check(check) for _, check in checks.values())
+        )
+        outcome = dict(zip(checks, results))
+        self.ready = all(
+            result["ok"]
+            for (required, _), result in zip(checks.values(), results)
+            if required
+        )
+        if not self.ready:
+            status = "unavailable"
+        elif all(result["ok"] for result in results):
+            status = "ready"
+        else:
+            status = "degraded"
+        self.body = orjson.dumps(
+            {"status": status, "checked_at": time.time(), "checks": outcome}
+        )
+
+    async def _loop(self) -> None:
+        while True:
+            try:
+                await self.check()
+            except Exception:
+                logger.exception("Readiness check failed")
+                self.ready = False
+            await asyncio.sleep(self.interval)
+
+    async def start(self) -> None:
+        """Run a first round, then keep checking in the background."""
+        self._limiter = anyio.CapacityLimiter(2)
+        await self.check()
+        self._task = asyncio.create_task(self._loop())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._engine is not None:
+            self._engine.dispose()
+            self._engine = None
+
+
+readiness = Readiness(
+    interval=settings.HEALTH_CHECK_INTERVAL,
+    timeout=settings.HEALTH_CHECK_TIMEOUT,
+)
+
+
+class HealthMiddleware:
+    """
+    Answers GET /health (liveness) and GET /ready (readiness) before any
+    other middleware, so probes are neither rate limited, measured nor
+    logged, and never reach the database.
+    """
+
+    def __init__(self, app: ASGIApp, readiness: Readiness = readiness):
+        self.app = app
+        self.readiness = readiness
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or scope["path"] not in ("/health", "/ready"):
+            return await self.app(scope, receive, send)
+
+        if scope["path"] == "/health":
+            status_code, body = 200, LIVENESS_BODY
+        else:
+            status_code = 200 if self.readiness.ready else 503
+            body = self.readiness.body
+        await send(
+            {
+                "type": "http.response.start",
+                "status": status_code,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode()),
+                    (b"cache-control", b"no-store"),
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
@@ -1,15 +1,116 @@
-import redis
-from fastapi_cache import FastAPICache
-from fastapi_cache.backends.redis import RedisBackend
+import logging
+
+import redis.asyncio
+from redis.asyncio.connection import Connection, SSLConnection
 
 from ..config.settings import settings
+from .cache import CACHE_PREFIX, VERSION_PREFIX
+from .cache_backend import LocalCache, TieredBackend, redis_tier
+from .rate_limiter import limiter
+from .token_store import refresh_tokens
+from .user_cache import user_cache
 
+logger = logging.getLogger(__name__)
 
-async def startup():
-    redis_client = redis.Redis(
+redis_client: redis.asyncio.Redis | None = None
+
+
+def shared_between_workers(use_redis: bool) -> bool:
+    """
+    Whether state kept behind a ``*_REDIS`` setting is seen by every worker:
+    Redis is on for it, and it is a real server rather than an in-process
+    fakeredis. A single worker needs no sharing.
+    """
+    if settings.WEB_CONCURRENCY <= 1:
+        return True
+    return use_redis and not settings.REDIS_FAKE
+
+
+def create_redis_client() -> redis.asyncio.Redis:
+    """
+    Build the asyncio client over a bounded connection pool, or an in-process
+    fakeredis server when REDIS_FAKE is set. No connection is opened here.
+    """
+    if settings.REDIS_FAKE:
+        try:
+            import fakeredis
+        except ImportError as exc:
+            raise RuntimeError(
+                "REDIS_FAKE requires fakeredis, install the dev dependencies"
+            ) from exc
+        return fakeredis.FakeAsyncRedis()
+
+    # Callers wait up to REDIS_POOL_TIMEOUT for a connection once the pool is full
+    pool = redis.asyncio.BlockingConnectionPool(
         host=settings.REDIS_HOST,
         port=settings.REDIS_PORT,
         password=settings.REDIS_PASSWORD,
-        ssl=True,
+        connection_class=SSLConnection if settings.REDIS_SSL else Connection,
+        max_connections=settings.REDIS_MAX_CONNECTIONS,
+        timeout=settings.REDIS_POOL_TIMEOUT,
+        socket_timeout=settings.REDIS_SOCKET_TIMEOUT,
+        socket_connect_timeout=settings.REDIS_CONNECT_TIMEOUT,
+        health_check_interval=settings.REDIS_HEALTH_CHECK_INTERVAL,
     )
-    FastAPICache.init(RedisBackend(redis_client), prefix="fastapi-cache")
+    return redis.asyncio.Redis(connection_pool=pool)
+
+
+async def startup():
+    global redis_client
+
+    if not shared_between_workers(settings.TOKEN_REVOCATION_REDIS):
+        # A used refresh token would be revoked on one worker only, and could
+        # be replayed once on every other
+        raise RuntimeError(
+            f"{settings.WEB_CONCURRENCY} workers need TOKEN_REVOCATION_REDIS "
+            "and a Redis server to share revoked refresh tokens"
+        )
+
+    redis_client = create_redis_client()
+    redis_tier.client = redis_client
+
+    backend = TieredBackend(
+        LocalCache(settings.RESPONSE_CACHE_LOCAL_SIZE, pinned_prefix=VERSION_PREFIX),
+        redis_tier if settings.RESPONSE_CACHE_REDIS else None,
+        local_ttl=settings.RESPONSE_CACHE_LOCAL_TTL,
+    )
+    enable = settings.RESPONSE_CACHE_ENABLED
+    if enable and not shared_between_workers(settings.RESPONSE_CACHE_REDIS):
+        # A write would only invalidate the cache of the worker serving it
+        logger.warning(
+            "Response cache disabled: %s workers without RESPONSE_CACHE_REDIS",
+            settings.WEB_CONCURRENCY,
+        )
+        enable = False
+    # Imported here, fastapi_cache loads jinja2 through its coders
+    from fastapi_cache import FastAPICache
+
+    FastAPICache.init(backend, prefix=CACHE_PREFIX, enable=enable)
+
+    if settings.USER_CACHE_REDIS:
+        user_cache.redis = redis_tier
+        user_cache.start()
+    if not shared_between_workers(settings.USER_CACHE_REDIS):
+        # Other workers only notice a deleted or demoted user once their copy
+        # expires, so keep that window short
+        user_cache.ttl = min(user_cache.ttl, settings.USER_CACHE_UNSHARED_TTL)
+    if settings.RATE_LIMIT_REDIS:
+        limiter.redis = redis_tier
+    if limiter.enabled and not shared_between_workers(settings.RATE_LIMIT_REDIS):
+        # Each worker admits the full limit, so clients get WEB_CONCURRENCY times it
+        logger.warning(
+            "Rate limits are per worker: %s workers without RATE_LIMIT_REDIS",
+            settings.WEB_CONCURRENCY,
+        )
+    if settings.TOKEN_REVOCATION_REDIS:
+        refresh_tokens.redis = redis_tier
+
+
+async def shutdown():
+    global redis_client
+
+    await user_cache.stop()
+    if redis_client is not None:
+        redis_tier.client = None
+        await redis_client.close(close_connection_pool=True)
+        redis_client = None
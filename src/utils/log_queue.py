@@ -0,0 +1,59 @@
+import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
+
+
+class DeferredQueueHandler(QueueHandler):
+    """
+    QueueHandler that enqueues records as they are. The stock prepare()
+    formats the message (and any traceback) on the calling thread; here the
+    listener's handler does it. Records never leave the process, so nothing
+    has to be made picklable, but arguments are formatted late: log values,
+    not objects that are mutated afterwards.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+class QueueLogging:
+    """
+    Hands the records of the given loggers to a background thread, so that
+    formatting and stream writes never run on the event loop.
+    """
+
+    def __init__(self, *names: str, level: int = logging.INFO):
+        self.loggers = [logging.getLogger(name) for name in names]
+        self.level = level
+
+        self._handler: DeferredQueueHandler | None = None
+        self._listener: QueueListener | None = None
+
+    def start(self) -> None:
+        records = queue.SimpleQueue()
+        stream = logging.StreamHandler()
+        stream.setFormatter(
+            logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s")
+        )
+        self._handler = DeferredQueueHandler(records)
+        self._listener = QueueListener(records, stream)
+        self._listener.start()
+
+        for logger in self.loggers:
+            logger.setLevel(self.level)
+            logger.addHandler(self._handler)
+            logger.propagate = False
+
+    def stop(self) -> None:
+        """Flush the pending records and detach the handler."""
+        if self._listener is None:
+            return
+
+        for logger in self.loggers:
+            logger.removeHandler(self._handler)
+            logger.propagate = True
+        self._listener.stop()
+        self._handler = self._listener = None
+
+
+access_log = QueueLogging("access", "sql")
@@ -0,0 +1,79 @@
+import logging
+import time
+
+from prometheus_client import Gauge, Histogram
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "Time until the response headers were sent, by route template.",
+    ["method", "route", "status"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+HTTP_REQUESTS_IN_PROGRESS = Gauge(
+    "http_requests_in_progress",
+    "Requests currently being served.",
+    ["method"],
+    multiprocess_mode="livesum",
+)
+
+logger = logging.getLogger("access")
+
+# Label of requests that matched no route, so 404 scans cannot blow up cardinality
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+def route_template(scope: Scope) -> str:
+    """The path template of the route that served the request, e.g. /todo/{id}."""
+    route = scope.get("route")
+    if route is not None:
+        return route.path
+    if "app_root_path" in scope:
+        # Mounted apps (static files) only leave their prefix in root_path
+        return scope["root_path"][len(scope["app_root_path"]) :] + "/{path}"
+    return UNMATCHED_ROUTE
+
+
+class MetricsMiddleware:
+    """
+    Records the latency, status and in-flight count of every HTTP request by
+    route template, adds the X-Process-Time header and writes the access log.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        method = scope["method"]
+        start = time.perf_counter()
+        status_code = 500
+        duration = None
+
+        async def send_wrapper(message: Message):
+            nonlocal status_code, duration
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                duration = time.perf_counter() - start
+                MutableHeaders(scope=message).append(
+                    "X-Process-Time", f"{duration * 1000:.2f} ms"
+                )
+            await send(message)
+
+        in_progress = HTTP_REQUESTS_IN_PROGRESS.labels(method)
+        in_progress.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            in_progress.dec()
+            if duration is None:
+                duration = time.perf_counter() - start
+            HTTP_REQUEST_DURATION.labels(
+                method, route_template(scope), status_code
+            ).observe(duration)
+            logger.info(
+                "%s %s %s %.2f ms", method, scope["path"], status_code, duration * 1000
+            )
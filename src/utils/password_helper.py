@@ -1,6 +1,6 @@
 import re
+from functools import cache
 
-from passlib.context import CryptContext
 from pydantic import BaseModel
 
 REG = "^(?=.*[a-z])(?=.*[A-Z])(?=.*\d)(?=.*[@$!%*#?&])[A-Za-z\d@$!#%*?&]{6,20}$"
@@ -15,15 +15,21 @@ class HashPasswordOut(BaseModel):
     hash_password: str
 
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+@cache
+def pwd_context():
+    # Built on first use: hashing runs in the password pool processes, so the
+    # web workers need not import passlib and bcrypt at all
+    from passlib.context import CryptContext
+
+    return CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 
 def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+    return pwd_context().hash(password)
 
 
 def verify_password(plain_password: str, hash_password: str) -> bool:
-    return pwd_context.verify(plain_password, hash_password)
+    return pwd_context().verify(plain_password, hash_password)
 
 
 def validate_password(password: str) -> bool:
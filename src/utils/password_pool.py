@@ -0,0 +1,142 @@
+import asyncio
+import multiprocessing
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+
+from fastapi import HTTPException, status
+from prometheus_client import Histogram
+
+from ..config.settings import settings
+from .password_helper import get_password_hash, verify_password
+
+PASSWORD_QUEUE_WAIT = Histogram(
+    "password_hash_queue_wait_seconds",
+    "Time a bcrypt job waited for a free worker process.",
+    ["operation"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5),
+)
+
+# Passwords per bulk hashing job, about a second of bcrypt
+HASH_CHUNK_SIZE = 4
+
+
+def _hash_job(password: str) -> tuple[float, str]:
+    return time.monotonic(), get_password_hash(password)
+
+
+def _hash_many_job(passwords: list[str]) -> tuple[float, list[str]]:
+    return time.monotonic(), [get_password_hash(password) for password in passwords]
+
+
+def _verify_job(plain_password: str, hash_password: str) -> tuple[float, bool]:
+    return time.monotonic(), verify_password(plain_password, hash_password)
+
+
+class PasswordPool:
+    """
+    Runs bcrypt hashing and verification on a dedicated process pool, so a
+    login storm neither holds the GIL nor occupies request threads.
+
+    At most ``workers + queue_size`` jobs are admitted at once; callers beyond
+    that get a 503 instead of queueing without bound.
+    """
+
+    def __init__(self, workers: int, queue_size: int):
+        self.workers = workers
+        self.queue_size = queue_size
+
+        self._slots = threading.BoundedSemaphore(workers + queue_size)
+        self._executor: ProcessPoolExecutor | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    # forkserver: forking the multi-threaded server is unsafe
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.workers,
+                        mp_context=multiprocessing.get_context("forkserver"),
+                    )
+        return self._executor
+
+    def _submit(self, job, *args) -> tuple[Future, float]:
+        if not self._slots.acquire(blocking=False):
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Server is busy, please retry shortly.",
+                headers={"Retry-After": "1"},
+            )
+
+        submitted_at = time.monotonic()
+        try:
+            future = self.executor.submit(job, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future, submitted_at
+
+    @staticmethod
+    def _observe(operation: str, submitted_at: float, result: tuple):
+        started_at, value = result
+        PASSWORD_QUEUE_WAIT.labels(operation).observe(max(started_at - submitted_at, 0))
+        return value
+
+    async def ahash(self, password: str) -> str:
+        """Hash a password without blocking the event loop."""
+        future, submitted_at = self._submit(_hash_job, password)
+        return self._observe("hash", submitted_at, await asyncio.wrap_future(future))
+
+    async def ahash_many(self, passwords: list[str]) -> list[str]:
+        """
+        Hash a batch of passwords without blocking the loop, in chunks of
+        HASH_CHUNK_SIZE with at most one chunk per worker in flight. A login
+        arriving mid-import waits for one chunk, not the whole batch.
+        """
+        in_flight = asyncio.Semaphore(self.workers)
+
+        async def hash_chunk(chunk: list[str]) -> list[str]:
+            async with in_flight:
+                future, submitted_at = self._submit(_hash_many_job, chunk)
+                return self._observe(
+                    "hash", submitted_at, await asyncio.wrap_future(future)
+                )
+
+        chunks = [
+            asyncio.ensure_future(
+                hash_chunk(passwords[start : start + HASH_CHUNK_SIZE])
+            )
+            for start in range(0, len(passwords), HASH_CHUNK_SIZE)
+        ]
+        try:
+            results = await asyncio.gather(*chunks)
+        except BaseException:
+            # The batch failed (e.g. a 503), do not submit its remaining chunks
+            for chunk in chunks:
+                chunk.cancel()
+            raise
+        return [password_hash for result in results for password_hash in result]
+
+    async def averify(self, plain_password: str, hash_password: str) -> bool:
+        """Verify a password without blocking the event loop."""
+        future, submitted_at = self._submit(_verify_job, plain_password, hash_password)
+        return self._observe("verify", submitted_at, await asyncio.wrap_future(future))
+
+    def start(self) -> None:
+        """Spawn the worker processes ahead of the first login."""
+        for _ in range(self.workers):
+            self.executor.submit(time.monotonic)
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+password_pool = PasswordPool(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    queue_size=settings.PASSWORD_HASH_QUEUE_SIZE,
+)
@@ -0,0 +1,57 @@
+import time
+
+from prometheus_client import Gauge, Histogram
+from sqlalchemy import event
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+DB_POOL_CHECKOUT_WAIT = Histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time spent waiting for a pooled connection, opening it included.",
+    ["pool"],
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+DB_POOL_CHECKED_OUT = Gauge(
+    "db_pool_checked_out",
+    "Connections currently checked out of the pool.",
+    ["pool"],
+    multiprocess_mode="livesum",
+)
+DB_POOL_CAPACITY = Gauge(
+    "db_pool_capacity",
+    "Connections the pool may hand out at once (pool_size + max_overflow).",
+    ["pool"],
+    multiprocess_mode="livesum",
+)
+
+
+class InstrumentedQueuePool(QueuePool):
+    """
+    QueuePool reporting how long checkouts wait and how many connections are
+    in use, labelled with the engine's ``pool_logging_name``.
+    """
+
+    def __init__(self, creator, pool_size=5, max_overflow=10, **kw):
+        super().__init__(creator, pool_size=pool_size, max_overflow=max_overflow, **kw)
+        self._metrics_label = kw.get("logging_name") or "default"
+        DB_POOL_CAPACITY.labels(self._metrics_label).set(pool_size + max_overflow)
+
+        # recreate() (on dispose or invalidation) hands the new pool the old
+        # one's listeners through _dispatch; adding them again would count
+        # every checkout twice
+        if kw.get("_dispatch") is None:
+            checked_out = DB_POOL_CHECKED_OUT.labels(self._metrics_label)
+            event.listen(self, "checkout", lambda *_: checked_out.inc())
+            event.listen(self, "checkin", lambda *_: checked_out.dec())
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            DB_POOL_CHECKOUT_WAIT.labels(self._metrics_label).observe(
+                time.perf_counter() - started
+            )
+
+
+class InstrumentedAsyncAdaptedQueuePool(InstrumentedQueuePool, AsyncAdaptedQueuePool):
+    """InstrumentedQueuePool for AsyncEngine."""
@@ -1,29 +1,177 @@
-import jwt
-from fastapi import Request
-from slowapi import Limiter
+import math
+import time
+from functools import wraps
+from typing import NamedTuple
+
+import redis.asyncio
+from fastapi import HTTPException, Request, status
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
 
 from ..config.settings import settings
+from .auth import request_token_payload
+from .cache_backend import LocalCache, RedisTier
+
+PERIODS = {"second": 1, "minute": 60, "hour": 60 * 60, "day": 24 * 60 * 60}
+
+# GCRA: each key holds the theoretical arrival time (TAT) of the next request,
+# in milliseconds of the Redis clock. A request is allowed when it does not
+# push the TAT more than one period ahead. Returns {allowed, retry_after_ms}.
+GCRA_SCRIPT = """
+local period = tonumber(ARGV[1])
+local interval = tonumber(ARGV[2])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) * 1000 + math.floor(tonumber(clock[2]) / 1000)
+local tat = math.max(tonumber(redis.call('GET', KEYS[1]) or now), now)
+local new_tat = tat + interval
+if new_tat - now > period then
+    return {0, new_tat - period - now}
+end
+redis.call('SET', KEYS[1], new_tat, 'PX', new_tat - now)
+return {1, 0}
+"""
+
+
+class RateLimit(NamedTuple):
+    amount: int
+    period: int  # Seconds
+
+    @classmethod
+    def parse(cls, value: str) -> "RateLimit":
+        """Parse limits written as "20/minute" or "1000/hour"."""
+        amount, _, period = value.partition("/")
+        return cls(int(amount), PERIODS[period.strip().rstrip("s")])
+
+    def __str__(self) -> str:
+        period = next(
+            name for name, seconds in PERIODS.items() if seconds == self.period
+        )
+        return f"{self.amount} per {period}"
+
+
+class RateLimiter:
+    """
+    GCRA rate limiter keyed by token subject (or client IP for anonymous
+    requests), with limits picked by the role claim of the access token.
+
+    Counters live in Redis when a Redis tier is attached, so every worker
+    shares them; otherwise, or while Redis is down, they are kept per worker.
+    """
+
+    key_prefix = "ratelimit:"
+
+    def __init__(
+        self, default: str, roles: dict[str, str], local_size: int, enabled: bool
+    ):
+        self.enabled = enabled
+        self.default = RateLimit.parse(default)
+        self.roles = {role: RateLimit.parse(value) for role, value in roles.items()}
+        self.redis: RedisTier | None = None
+
+        self._local = LocalCache(local_size)
+        self._script = None
+
+    @staticmethod
+    def identify(request: Request) -> tuple[str, str]:
+        """Return the limiter key and role of the client sending ``request``."""
+        payload = request_token_payload(request)
+        if payload and payload.get("sub"):
+            return f"user:{payload['sub']}", payload.get("role", "user")
+        host = request.client.host if request.client else "unknown"
+        return f"ip:{host}", "anonymous"
+
+    def _gcra(self, client: redis.asyncio.Redis, key: str, limit: RateLimit):
+        if self._script is None or self._script.registered_client is not client:
+            self._script = client.register_script(GCRA_SCRIPT)
+        period = limit.period * 1000
+        return self._script(keys=[key], args=[period, -(-period // limit.amount)])
+
+    def _hit_local(self, key: str, limit: RateLimit) -> float:
+        # Same algorithm as GCRA_SCRIPT, on the monotonic clock in seconds
+        now = time.monotonic()
+        tat = max(self._local.get(key) or now, now)
+        new_tat = tat + limit.period / limit.amount
+        if new_tat - now > limit.period:
+            return new_tat - limit.period - now
+        self._local.set(key, new_tat, new_tat - now)
+        return 0
+
+    async def hit(self, name: str, client_key: str, limit: RateLimit) -> float:
+        """Count a request, returning 0 when allowed or the seconds to wait."""
+        key = f"{self.key_prefix}{name}:{client_key}"
+        if self.redis is not None:
+            result = await self.redis.run(
+                "Rate limit check", lambda client: self._gcra(client, key, limit)
+            )
+            if result is not None:
+                allowed, retry_after = result
+                return 0 if allowed else retry_after / 1000
+        return self._hit_local(key, limit)
+
+    @staticmethod
+    def exceeded(limit: RateLimit, retry_after: float) -> HTTPException:
+        return HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=f"Rate limit exceeded: {limit}",
+            headers={"Retry-After": str(math.ceil(retry_after))},
+        )
+
+    def limit(self, default: str, **roles: str):
+        """
+        Give an endpoint its own limit on top of the global one, optionally per
+        role: ``@limiter.limit("20/minute", admin="200/minute")``. The endpoint
+        must take a ``request`` parameter.
+        """
+        default_limit = RateLimit.parse(default)
+        role_limits = {role: RateLimit.parse(value) for role, value in roles.items()}
+
+        def decorator(func):
+            name = f"{func.__module__}.{func.__name__}"
+
+            @wraps(func)
+            async def wrapper(*args, **kwargs):
+                if self.enabled:
+                    client_key, role = self.identify(kwargs["request"])
+                    limit = role_limits.get(role, default_limit)
+                    retry_after = await self.hit(name, client_key, limit)
+                    if retry_after:
+                        raise self.exceeded(limit, retry_after)
+                return await func(*args, **kwargs)
+
+            return wrapper
+
+        return decorator
+
+
+class RateLimitMiddleware:
+    """
+    Applies the global per-role limit to every HTTP request, before routing.
+    """
+
+    def __init__(self, app: ASGIApp, limiter: RateLimiter):
+        self.app = app
+        self.limiter = limiter
 
-SECRET_KEY = settings.SECRET_KEY
-ALGORITHM = settings.ALGORITHM
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or not self.limiter.enabled:
+            return await self.app(scope, receive, send)
 
+        client_key, role = self.limiter.identify(Request(scope))
+        limit = self.limiter.roles.get(role, self.limiter.default)
+        retry_after = await self.limiter.hit("global", client_key, limit)
+        if retry_after:
+            exc = self.limiter.exceeded(limit, retry_after)
+            response = JSONResponse(
+                {"detail": exc.detail}, exc.status_code, headers=exc.headers
+            )
+            return await response(scope, receive, send)
 
-def hybrid_key_func(request: Request):
-    auth_header = request.headers.get("Authorization")
-    if auth_header and auth_header.startswith("Bearer "):
-        token = auth_header.split(" ")[1]
-        try:
-            payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-            user_id = payload.get("sub")
-            if user_id:
-                return f"user:{user_id}"
-        except Exception:
-            pass  # fall back to IP
-    return f"ip:{request.client.host}"
+        await self.app(scope, receive, send)
 
 
-# Initialize limiter with custom key function
-limiter = Limiter(
-    key_func=hybrid_key_func,
-    default_limits=["100/minute"],
+limiter = RateLimiter(
+    default=settings.RATE_LIMIT_DEFAULT,
+    roles=settings.RATE_LIMIT_ROLES,
+    local_size=settings.RATE_LIMIT_LOCAL_SIZE,
+    enabled=settings.RATE_LIMIT_ENABLED,
 )
@@ -0,0 +1,49 @@
+from functools import cache
+from typing import Any
+
+import orjson
+from fastapi.responses import Response
+from pydantic import TypeAdapter
+from pydantic_core import to_jsonable_python
+
+
+@cache
+def type_adapter(response_model: Any) -> TypeAdapter:
+    """One TypeAdapter per response model; building them is costly."""
+    return TypeAdapter(response_model)
+
+
+def dump_json(content: Any, response_model: Any) -> bytes:
+    """
+    Validate ``content`` against ``response_model`` (ORM objects included) and
+    serialize it to JSON. Models the services already built as
+    ``response_model`` are not validated again.
+
+    The Python-mode dump leaves datetimes, UUIDs and enums for orjson, which
+    encodes them about twice as fast as pydantic's own dump_json.
+    """
+    adapter = type_adapter(response_model)
+    content = adapter.validate_python(content, from_attributes=True)
+    return orjson.dumps(
+        adapter.dump_python(content, by_alias=True), default=to_jsonable_python
+    )
+
+
+class ModelResponse(Response):
+    """
+    JSON response validated and serialized once, by ``dump_json``. Returning it
+    skips FastAPI's own validate / dump / json.dumps pass over
+    ``response_model``, which stays declared on the route for the OpenAPI
+    schema.
+    """
+
+    media_type = "application/json"
+
+    def __init__(
+        self,
+        content: Any,
+        response_model: Any,
+        status_code: int = 200,
+        headers: dict[str, str] | None = None,
+    ):
+        super().__init__(dump_json(content, response_model), status_code, headers)
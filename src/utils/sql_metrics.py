@@ -0,0 +1,165 @@
+import logging
+import random
+import time
+from collections import Counter
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+from prometheus_client import Counter as PrometheusCounter
+from prometheus_client import Histogram
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.engine.interfaces import ExecuteStyle
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from ..config.settings import settings
+from .metrics import route_template
+
+DB_STATEMENT_DURATION = Histogram(
+    "db_statement_duration_seconds",
+    "Execution time of SQL statements, by operation.",
+    ["operation"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1),
+)
+DB_STATEMENTS_PER_REQUEST = Histogram(
+    "db_statements_per_request",
+    "SQL statements executed while serving a request, by route template.",
+    ["route"],
+    buckets=(0, 1, 2, 3, 5, 10, 25, 50, 100),
+)
+DB_TIME_PER_REQUEST = Histogram(
+    "db_time_per_request_seconds",
+    "Time spent in SQL statements while serving a request, by route template.",
+    ["route"],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5),
+)
+DB_N_PLUS_ONE = PrometheusCounter(
+    "db_n_plus_one_requests",
+    "Requests that ran one statement SQL_N_PLUS_ONE_THRESHOLD times or more.",
+    ["route"],
+)
+
+logger = logging.getLogger("sql")
+
+# (route, statement) pairs already reported as N+1, logged once per process
+_reported_n_plus_one: set[tuple[str, str]] = set()
+
+
+@dataclass
+class QueryStats:
+    """The SQL statements run on behalf of one request."""
+
+    count: int = 0
+    total: float = 0.0  # Seconds
+    slowest: float = 0.0  # Seconds
+    slowest_statement: str | None = None
+    statements: Counter = field(default_factory=Counter)
+
+    def record(self, statement: str, duration: float, batch: bool = False) -> None:
+        """``batch``: one round trip of a statement split by the driver."""
+        self.count += 1
+        self.total += duration
+        if not batch:
+            # Batches repeat by design, they are never an N+1 suspect
+            self.statements[statement] += 1
+        if duration > self.slowest:
+            self.slowest = duration
+            self.slowest_statement = statement
+
+    def repeated(self, threshold: int) -> list[tuple[str, int]]:
+        """Statements run at least ``threshold`` times, the N+1 suspects."""
+        return [(stmt, n) for stmt, n in self.statements.items() if n >= threshold]
+
+    def server_timing(self) -> str:
+        return (
+            f'db;dur={self.total * 1000:.2f};desc="{self.count} queries", '
+            f"db-slowest;dur={self.slowest * 1000:.2f}"
+        )
+
+
+# Set per request; run_in_threadpool and SQLAlchemy's greenlets both carry it
+# over to where the statements actually execute.
+current_query_stats: ContextVar[QueryStats | None] = ContextVar(
+    "current_query_stats", default=None
+)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._query_started = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    duration = time.perf_counter() - context._query_started
+    operation = statement.lstrip().split(None, 1)[0].upper() if statement else ""
+    DB_STATEMENT_DURATION.labels(operation).observe(duration)
+
+    stats = current_query_stats.get()
+    if stats is not None:
+        # A bulk INSERT ... RETURNING runs once per row on SQLite
+        batch = context.execute_style is ExecuteStyle.INSERTMANYVALUES
+        stats.record(statement, duration, batch)
+
+    if (
+        duration * 1000 >= settings.SQL_SLOW_QUERY_MS
+        and random.random() < settings.SQL_SLOW_QUERY_SAMPLE_RATE
+    ):
+        logger.warning("Slow query (%.2f ms): %s", duration * 1000, statement)
+
+
+class QueryStatsMiddleware:
+    """
+    Collects the SQL statements of every HTTP request: sends the totals as a
+    Server-Timing header, records them per route template and reports
+    statements repeated often enough to look like an N+1 query.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        stats = QueryStats()
+        token = current_query_stats.set(stats)
+
+        async def send_wrapper(message: Message):
+            if (
+                message["type"] == "http.response.start"
+                and stats.count
+                and settings.SQL_SERVER_TIMING
+            ):
+                MutableHeaders(scope=message).append(
+                    "Server-Timing", stats.server_timing()
+                )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            current_query_stats.reset(token)
+            self._observe(route_template(scope), stats)
+
+    @staticmethod
+    def _observe(route: str, stats: QueryStats) -> None:
+        DB_STATEMENTS_PER_REQUEST.labels(route).observe(stats.count)
+        DB_TIME_PER_REQUEST.labels(route).observe(stats.total)
+
+        repeated = stats.repeated(settings.SQL_N_PLUS_ONE_THRESHOLD)
+        if not repeated:
+            return
+        DB_N_PLUS_ONE.labels(route).inc()
+        for statement, count in repeated:
+            if (route, statement) in _reported_n_plus_one:
+                continue
+            if len(_reported_n_plus_one) < 1000:
+                _reported_n_plus_one.add((route, statement))
+            logger.warning(
+                "Possible N+1 on %s: statement ran %d times: %s",
+                route,
+                count,
+                statement,
+            )
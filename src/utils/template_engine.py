@@ -1,10 +1,105 @@
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from functools import cache
 from pathlib import Path
+from typing import TYPE_CHECKING
 
-from fastapi.templating import Jinja2Templates
+from fastapi import Request, Response, status
+from fastapi.responses import HTMLResponse
 
-from src.config.settings import TEMPLATES_DIR
+from src.config.settings import TEMPLATES_DIR, settings
 
-if not Path(TEMPLATES_DIR).exists():
-    raise RuntimeError(f"Templates directory not found: {TEMPLATES_DIR}")
+if TYPE_CHECKING:
+    from jinja2 import Environment, Template
 
-templates = Jinja2Templates(directory=str(TEMPLATES_DIR))
+
+@cache
+def template_env() -> "Environment":
+    """
+    The Jinja environment, built on first use (jinja2 is only imported then).
+    Compiled templates are kept in memory for the life of the worker, and as
+    bytecode on disk so that other workers and restarts skip the compilation.
+    """
+    from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader
+
+    if not Path(TEMPLATES_DIR).exists():
+        raise RuntimeError(f"Templates directory not found: {TEMPLATES_DIR}")
+
+    if settings.TEMPLATE_CACHE_DIR is None:
+        bytecode_cache = FileSystemBytecodeCache()
+    else:
+        settings.TEMPLATE_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        bytecode_cache = FileSystemBytecodeCache(str(settings.TEMPLATE_CACHE_DIR))
+
+    return Environment(
+        loader=FileSystemLoader(str(TEMPLATES_DIR)),
+        autoescape=True,
+        auto_reload=settings.TEMPLATE_AUTO_RELOAD,
+        bytecode_cache=bytecode_cache,
+        cache_size=-1,
+    )
+
+
+def precompile_templates() -> int:
+    """Compile every template under TEMPLATES_DIR ahead of the first render."""
+    env = template_env()
+    names = env.list_templates(extensions=["html", "txt"])
+    for name in names:
+        env.get_template(name)
+    return len(names)
+
+
+class StaticPage:
+    """
+    A page whose context never changes between requests. It is rendered once
+    and served with an ETag and Last-Modified, answering conditional requests
+    with a 304. With TEMPLATE_AUTO_RELOAD, an edited template is rendered anew.
+    """
+
+    def __init__(self, name: str, **context):
+        self.name = name
+        self.context = context
+        self._template: "Template | None" = None
+        self._body = b""
+        self._headers: dict[str, str] = {}
+        self._last_modified: datetime | None = None
+
+    def _render(self) -> None:
+        self._template = template_env().get_template(self.name)
+        self._body = self._template.render(self.context).encode()
+        # HTTP dates have a one second resolution
+        self._last_modified = datetime.fromtimestamp(
+            int(Path(self._template.filename).stat().st_mtime), timezone.utc
+        )
+        self._headers = {
+            "ETag": f'"{hashlib.blake2b(self._body, digest_size=16).hexdigest()}"',
+            "Last-Modified": format_datetime(self._last_modified, usegmt=True),
+            "Cache-Control": "no-cache",
+        }
+
+    def _not_modified(self, request: Request) -> bool:
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match is not None:
+            etags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+            return "*" in etags or self._headers["ETag"] in etags
+
+        if_modified_since = request.headers.get("if-modified-since")
+        if if_modified_since is None:
+            return False
+        try:
+            return parsedate_to_datetime(if_modified_since) >= self._last_modified
+        except (TypeError, ValueError):
+            return False
+
+    def response(self, request: Request) -> Response:
+        """The page, or an empty 304 when the client's copy is current."""
+        if self._template is None or (
+            settings.TEMPLATE_AUTO_RELOAD and not self._template.is_up_to_date
+        ):
+            self._render()
+        if self._not_modified(request):
+            return Response(
+                status_code=status.HTTP_304_NOT_MODIFIED, headers=self._headers
+            )
+        return HTMLResponse(self._body, headers=self._headers)
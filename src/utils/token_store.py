@@ -0,0 +1,78 @@
+import threading
+import time
+
+import redis.asyncio
+
+from ..config.settings import settings
+from .cache_backend import RedisTier
+
+
+class RefreshTokenStore:
+    """
+    Revocation set of refresh tokens, by ``jti``. A refresh token is revoked
+    when it is used (rotation) or on logout, and stays in the set until it
+    would have expired anyway.
+
+    Using a token is a single atomic "add if absent" on the set, in Redis when
+    a Redis tier is attached (so every worker sees it) and in process
+    otherwise, or while Redis is down. Redis drops entries by their own TTL;
+    the local set is swept of expired entries every ``sweep_interval``
+    seconds. Entries are never evicted early, which would let a revoked token
+    through.
+    """
+
+    key_prefix = "revoked-refresh:"
+
+    def __init__(self, sweep_interval: int):
+        self.sweep_interval = sweep_interval
+        self.redis: RedisTier | None = None
+
+        self._revoked: dict[str, float] = {}  # jti -> expiry (Unix time)
+        self._lock = threading.Lock()
+        self._next_sweep = 0.0
+
+    def _sweep(self, now: float) -> None:
+        self._revoked = {
+            jti: expires_at
+            for jti, expires_at in self._revoked.items()
+            if expires_at > now
+        }
+        self._next_sweep = now + self.sweep_interval
+
+    def _revoke_local(self, jti: str, expires_at: float) -> bool:
+        now = time.time()
+        with self._lock:
+            if now >= self._next_sweep:
+                self._sweep(now)
+            if self._revoked.get(jti, 0) > now:
+                return False
+            self._revoked[jti] = expires_at
+            return True
+
+    @staticmethod
+    async def _revoke_shared(
+        client: redis.asyncio.Redis, key: str, ttl_ms: int
+    ) -> bool:
+        return bool(await client.set(key, b"1", nx=True, px=ttl_ms))
+
+    async def revoke(self, jti: str, expires_at: float) -> bool:
+        """
+        Revoke a refresh token. Returns False when it already was, i.e. the
+        token has been used before and must be rejected.
+        """
+        ttl_ms = max(int((expires_at - time.time()) * 1000), 1)
+        if self.redis is not None:
+            revoked = await self.redis.run(
+                "Refresh token revocation",
+                lambda client: self._revoke_shared(
+                    client, self.key_prefix + jti, ttl_ms
+                ),
+            )
+            if revoked is not None:
+                return revoked
+        return self._revoke_local(jti, expires_at)
+
+
+refresh_tokens = RefreshTokenStore(
+    sweep_interval=settings.TOKEN_REVOCATION_SWEEP_INTERVAL,
+)
@@ -0,0 +1,152 @@
+import asyncio
+import logging
+
+import anyio.from_thread
+import redis
+import redis.asyncio
+
+from ..config.settings import settings
+from ..schemas.user_schema import UserDetailedOutput
+from .cache_backend import LocalCache, RedisTier
+
+logger = logging.getLogger(__name__)
+
+
+class PrincipalCache:
+    """
+    Cache of authenticated users keyed by username.
+
+    Lookups hit a bounded in-process TTL/LRU map first and, when a Redis tier
+    is attached, the shared Redis tier second. Entries are dropped whenever
+    the user is updated or deleted through the repositories: from Redis, and
+    from the in-process map of every worker through a pub/sub channel each
+    worker listens on. An invalidation missed while Redis is down lasts at
+    most ``ttl`` seconds. Without Redis, other workers only notice once
+    their entry expires.
+    """
+
+    key_prefix = "principal:"
+    channel = "principal-invalidations"
+
+    def __init__(self, maxsize: int, ttl: int, redis_ttl: int):
+        self.ttl = ttl
+        self.redis_ttl = redis_ttl
+        self.redis: RedisTier | None = None
+
+        self._local = LocalCache(maxsize)
+        self._listener: asyncio.Task | None = None
+
+    async def get(self, username: str) -> UserDetailedOutput | None:
+        """Return the cached user, or None on a miss in every tier."""
+        user = self._local.get(username)
+        if user is not None or self.redis is None:
+            return user
+
+        raw = await self.redis.run(
+            "Principal cache lookup",
+            lambda client: client.get(self.key_prefix + username),
+        )
+        if raw is None:
+            return None
+
+        user = UserDetailedOutput.model_validate_json(raw)
+        self._local.set(username, user, self.ttl)
+        return user
+
+    async def set(self, user: UserDetailedOutput) -> None:
+        """Store a user in every tier."""
+        self._local.set(user.username, user, self.ttl)
+        if self.redis is None:
+            return
+
+        await self.redis.run(
+            "Principal cache store",
+            lambda client: client.set(
+                self.key_prefix + user.username,
+                user.model_dump_json(),
+                ex=self.redis_ttl,
+            ),
+        )
+
+    async def invalidate(self, username: str) -> None:
+        """Drop a user from every tier, and from the other workers."""
+        self._local.pop(username)
+        if self.redis is None:
+            return
+
+        async def delete_and_publish(client: redis.asyncio.Redis) -> None:
+            async with client.pipeline(transaction=False) as pipe:
+                await pipe.delete(self.key_prefix + username).publish(
+                    self.channel, username
+                ).execute()
+
+        await self.redis.run("Principal cache invalidation", delete_and_publish)
+
+    def invalidate_sync(self, username: str) -> None:
+        """Drop a user from every tier; blocking, for the sync repositories."""
+        self._local.pop(username)
+        if self.redis is None:
+            return
+
+        try:
+            anyio.from_thread.run(self.invalidate, username)
+        except RuntimeError:
+            # Not called from a threadpool worker of a running event loop
+            logger.warning(
+                "Principal cache invalidation skipped for %s", username, exc_info=True
+            )
+
+    async def _listen(self) -> None:
+        # Drops the local copies of users invalidated on any worker
+        connected = True
+        while True:
+            if not self.redis.available:
+                # Down after a failure here or in another Redis command
+                await asyncio.sleep(self.redis.retry_interval)
+                continue
+            try:
+                async with self.redis.client.pubsub(
+                    ignore_subscribe_messages=True
+                ) as pubsub:
+                    await pubsub.subscribe(self.channel)
+                    if not connected:
+                        logger.info("Principal invalidation listener reconnected")
+                        connected = True
+                    while True:
+                        # An explicit timeout, the pool's socket timeout is
+                        # meant for commands
+                        message = await pubsub.get_message(timeout=1.0)
+                        if message is not None:
+                            self._local.pop(message["data"].decode())
+            except (redis.RedisError, OSError):
+                self.redis.mark_down()
+                if connected:
+                    # Only once per outage, retries while Redis stays down are quiet
+                    logger.warning(
+                        "Principal invalidation listener disconnected, retrying "
+                        "every %ss",
+                        self.redis.retry_interval,
+                        exc_info=True,
+                    )
+                    connected = False
+
+    def start(self) -> None:
+        """Listen for invalidations from other workers, once a Redis tier is attached."""
+        if self.redis is not None and self._listener is None:
+            self._listener = asyncio.create_task(self._listen())
+
+    async def stop(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+
+
+user_cache = PrincipalCache(
+    maxsize=settings.USER_CACHE_SIZE,
+    ttl=settings.USER_CACHE_TTL,
+    redis_ttl=settings.USER_CACHE_REDIS_TTL,
+)
@@ -0,0 +1,78 @@
+import csv
+import io
+import json
+
+from fastapi import HTTPException, status
+from fastapi.exceptions import RequestValidationError
+from pydantic import TypeAdapter, ValidationError
+
+from ..config.settings import settings
+from ..schemas.user_schema import UserInput
+
+USER_ROWS_ADAPTER = TypeAdapter(list[UserInput])
+
+
+def _csv_rows(text: str) -> list[dict]:
+    rows = []
+    for row in csv.DictReader(io.StringIO(text)):
+        # Blank cells fall back to the schema defaults
+        row = {
+            key.strip(): value.strip()
+            for key, value in row.items()
+            if key and value and value.strip()
+        }
+        # A CSV export rarely carries the confirmation column
+        if "password" in row:
+            row.setdefault("confirm_password", row["password"])
+        rows.append(row)
+    return rows
+
+
+def read_user_rows(
+    content: bytes, filename: str | None = None, content_type: str | None = None
+) -> list[dict]:
+    """
+    Parse a users file into row dicts. CSV is detected from the content type
+    or the file extension, anything else is read as JSON: either a list of
+    users or an object with a ``users`` list.
+    """
+    try:
+        text = content.decode("utf-8-sig")
+        if (content_type or "").startswith("text/csv") or (
+            filename or ""
+        ).lower().endswith(".csv"):
+            return _csv_rows(text)
+
+        rows = json.loads(text)
+        if isinstance(rows, dict):
+            rows = rows.get("users")
+        if not isinstance(rows, list):
+            raise ValueError("Expected a list of users")
+        return rows
+    except (UnicodeDecodeError, ValueError, csv.Error):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Import file must be a UTF-8 CSV or a JSON list of users",
+        )
+
+
+def validate_user_rows(rows: list[dict]) -> list[UserInput]:
+    """
+    Validate every row in one pass. Any invalid row rejects the whole import
+    with the usual 422 body, located by row index.
+    """
+    if not rows:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Import file is empty"
+        )
+    if len(rows) > settings.USER_IMPORT_MAX_ROWS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"At most {settings.USER_IMPORT_MAX_ROWS} users per import",
+        )
+    try:
+        return USER_ROWS_ADAPTER.validate_python(rows)
+    except ValidationError as exc:
+        raise RequestValidationError(
+            exc.errors(include_url=False, include_context=False)
+        )
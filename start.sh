@@ -4,4 +4,10 @@ echo "🔁 Running Alembic migrations..."
 uv run alembic upgrade head
 
 echo "🚀 Starting FastAPI server..."
-uv run uvicorn src.main:app --host 0.0.0.0 --port 8000 --reload
+# One worker per CPU available to the container, unless WEB_CONCURRENCY is set
+# in the environment or in .env, the two places the settings read it from
+if [ -z "${WEB_CONCURRENCY:-}" ] &&
+    ! grep -Eiqs '^[[:space:]]*(export[[:space:]]+)?WEB_CONCURRENCY[[:space:]]*=' .env; then
+    export WEB_CONCURRENCY="$(nproc)"
+fi
+uv run gunicorn src.main:app -c gunicorn.conf.py